@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import threading
+import zlib
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("thread", "process")
+
+
+class FrameExecutor:
+    """
+    Runs frame analysis off the event loop.
+
+    Work is split into shards, each backed by a single-worker thread or process
+    pool. A camera is always routed to the same shard, so its frames run in
+    submission order against the state held by that worker, while different
+    cameras spread across shards and run in parallel.
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 4,
+                 initializer: Optional[Callable] = None, initargs: Tuple = ()):
+        """
+        Initialize frame executor
+
+        Args:
+            mode: 'thread' (OpenCV releases the GIL) or 'process'
+            workers: Number of shards / worker threads or processes
+            initializer: Called once in every worker before it runs tasks
+            initargs: Arguments for the initializer
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+
+        self.mode = mode
+        self.workers = max(1, int(workers))
+
+        self._shards: List[Executor] = []
+        for index in range(self.workers):
+            if mode == "process":
+                shard = ProcessPoolExecutor(max_workers=1, initializer=initializer, initargs=initargs)
+            else:
+                shard = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"frame-shard-{index}")
+            self._shards.append(shard)
+
+        # Threads share this process' state, so the initializer only runs once
+        if mode == "thread" and initializer is not None:
+            initializer(*initargs)
+
+        self._pending = [0] * self.workers
+        self._completed = [0] * self.workers
+        self._lock = threading.Lock()
+
+        logger.info(f"FrameExecutor started: {self.workers} {mode} worker(s)")
+
+    def shard_for(self, camera_id: str) -> int:
+        return zlib.crc32(camera_id.encode("utf-8")) % self.workers
+
+    def submit(self, camera_id: str, fn: Callable, *args) -> Future:
+        """Queue a task on the camera's shard and return a concurrent future"""
+        index = self.shard_for(camera_id)
+        return self._submit_to(index, fn, *args)
+
+    async def run(self, camera_id: str, fn: Callable, *args) -> Any:
+        """Run a task on the camera's shard and await its result"""
+        return await asyncio.wrap_future(self.submit(camera_id, fn, *args))
+
+    async def broadcast(self, fn: Callable, *args) -> List[Any]:
+        """Run a task once on every shard and collect the results"""
+        futures = [asyncio.wrap_future(self._submit_to(index, fn, *args))
+                   for index in range(self.workers)]
+        return await asyncio.gather(*futures)
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(self._pending)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'workers': self.workers,
+                'queue_depth': sum(self._pending),
+                'shards': [
+                    {'queue_depth': pending, 'completed': completed}
+                    for pending, completed in zip(self._pending, self._completed)
+                ]
+            }
+
+    def shutdown(self, wait: bool = True):
+        for shard in self._shards:
+            shard.shutdown(wait=wait)
+        logger.info("FrameExecutor stopped")
+
+    def _submit_to(self, index: int, fn: Callable, *args) -> Future:
+        with self._lock:
+            self._pending[index] += 1
+
+        future = self._shards[index].submit(fn, *args)
+        future.add_done_callback(lambda _: self._task_done(index))
+        return future
+
+    def _task_done(self, index: int):
+        with self._lock:
+            self._pending[index] -= 1
+            self._completed[index] += 1
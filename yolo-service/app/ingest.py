@@ -0,0 +1,145 @@
+"""
+Frame ingestion formats.
+
+Frames arrive either as encoded images (JPEG/PNG, decoded with cv2.imdecode)
+or as raw pixel buffers prefixed with a small binary header:
+
+    magic      4s   b"BLTR"
+    width      uint32
+    height     uint32
+    channels   uint8   1 (gray), 3 (BGR) or 4 (BGRA)
+    dtype      uint8   1 = uint8, 2 = uint16
+    reserved   2 bytes
+    timestamp  float64 capture time in seconds (0 = unknown)
+
+followed by height * width * channels pixels in row-major order. Raw pixels
+are wrapped with np.frombuffer without copying.
+
+With an analysis scale above 1, JPEGs are decoded straight to a reduced
+grayscale image (IMREAD_REDUCED_GRAYSCALE_n) and raw frames are area-resized,
+so both paths hand the analyzers the same resolution.
+"""
+import math
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+RAW_MAGIC = b"BLTR"
+RAW_HEADER = struct.Struct("<4sIIBB2xd")
+RAW_DTYPES = {1: np.uint8, 2: np.uint16}
+RAW_CHANNELS = (1, 3, 4)
+
+ANALYSIS_SCALES = (1, 2, 4, 8)
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+class InvalidFrameError(ValueError):
+    """Raised when an uploaded frame cannot be decoded"""
+
+
+@dataclass
+class Frame:
+    """Decoded frame ready for analysis"""
+    image: np.ndarray
+    capture_ts: Optional[float] = None
+    raw: bool = False
+    scale: int = 1
+
+
+def is_raw_frame(data: bytes) -> bool:
+    return data[:4] == RAW_MAGIC
+
+
+def decode_frame(data: bytes, analysis_scale: int = 1) -> Frame:
+    """
+    Decode an encoded image or wrap a raw pixel buffer
+
+    Args:
+        data: JPEG/PNG bytes or a raw frame
+        analysis_scale: Downscale factor (1, 2, 4 or 8); above 1 the frame is
+            returned as grayscale at 1/analysis_scale resolution
+    """
+    if analysis_scale not in ANALYSIS_SCALES:
+        raise ValueError(f"Unsupported analysis scale: {analysis_scale}")
+
+    if is_raw_frame(data):
+        frame = parse_raw_frame(data)
+        frame.image = reduce_for_analysis(frame.image, analysis_scale)
+        frame.scale = analysis_scale
+        return frame
+
+    flag = REDUCED_DECODE_FLAGS.get(analysis_scale, cv2.IMREAD_COLOR)
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if image is None:
+        raise InvalidFrameError("Invalid image file")
+    return Frame(image=image, scale=analysis_scale)
+
+
+def reduce_for_analysis(image: np.ndarray, analysis_scale: int) -> np.ndarray:
+    """Downscale a decoded frame the same way the reduced JPEG decoder does"""
+    if analysis_scale == 1:
+        return image
+
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    size = (math.ceil(width / analysis_scale), math.ceil(height / analysis_scale))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def raw_capture_ts(data: bytes) -> Optional[float]:
+    """Capture time from a raw frame's header without parsing the pixels"""
+    if not is_raw_frame(data) or len(data) < RAW_HEADER.size:
+        return None
+    return RAW_HEADER.unpack_from(data)[5] or None
+
+
+def parse_raw_frame(data: bytes) -> Frame:
+    if len(data) < RAW_HEADER.size:
+        raise InvalidFrameError("Raw frame shorter than its header")
+
+    magic, width, height, channels, dtype_code, timestamp = RAW_HEADER.unpack_from(data)
+    if magic != RAW_MAGIC:
+        raise InvalidFrameError("Raw frame has an invalid magic number")
+    if channels not in RAW_CHANNELS:
+        raise InvalidFrameError(f"Unsupported channel count: {channels}")
+    if dtype_code not in RAW_DTYPES:
+        raise InvalidFrameError(f"Unsupported dtype code: {dtype_code}")
+
+    dtype = np.dtype(RAW_DTYPES[dtype_code])
+    count = width * height * channels
+    if len(data) - RAW_HEADER.size != count * dtype.itemsize:
+        raise InvalidFrameError(
+            f"Raw frame payload does not match {width}x{height}x{channels} {dtype.name}"
+        )
+
+    # Zero-copy view over the request body
+    pixels = np.frombuffer(data, dtype=dtype, count=count, offset=RAW_HEADER.size)
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    image = pixels.reshape(shape)
+
+    if dtype != np.uint8:
+        # Analyzers work on 8-bit images
+        image = cv2.convertScaleAbs(image, alpha=1 / 256)
+    if channels == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+
+    return Frame(image=image, capture_ts=timestamp or None, raw=True)
+
+
+def encode_raw_frame(image: np.ndarray, capture_ts: Optional[float] = None) -> bytes:
+    """Pack an image into the raw ingestion format (used by capture agents and tools)"""
+    dtype_code = {np.dtype(v): k for k, v in RAW_DTYPES.items()}.get(image.dtype)
+    if dtype_code is None:
+        raise ValueError(f"Unsupported dtype: {image.dtype}")
+
+    height, width = image.shape[:2]
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    header = RAW_HEADER.pack(RAW_MAGIC, width, height, channels, dtype_code, capture_ts or 0.0)
+    return header + np.ascontiguousarray(image).tobytes()
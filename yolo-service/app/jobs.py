@@ -0,0 +1,367 @@
+"""
+Asynchronous whole-video analysis jobs.
+
+A job splits a recorded video into time chunks that worker processes analyze
+in parallel, each with its own BeltMonitor and BeltTearDetector, set up with
+the speed mode and belt orientation of the camera the video came from. The
+merged per-frame timeline is written to a CSV file in the job output
+directory. Workers report analyzed frames as they go, so a job's progress
+moves within chunks; finished jobs are forgotten after a retention period.
+"""
+import csv
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+
+from app.ingest import ANALYSIS_SCALES, reduce_for_analysis
+from app.media import MediaAccess
+from app.models.belt_monitor import BeltMonitor
+from app.models.belt_roi import BeltROITracker
+from app.models.belt_tear import BeltTearDetector
+
+logger = logging.getLogger(__name__)
+
+# Analyzed frames between progress reports of a chunk worker
+PROGRESS_FRAMES = 25
+
+# Set in each worker process by _init_worker
+_progress: Optional[multiprocessing.Queue] = None
+
+
+def _init_worker(progress: multiprocessing.Queue):
+    global _progress
+    _progress = progress
+
+
+def _report_progress(job_id: Optional[str], frames: int):
+    if _progress is not None and job_id is not None and frames:
+        _progress.put((job_id, frames))
+
+
+TIMELINE_COLUMNS = [
+    'frame', 'time_s',
+    'alignment_percentage', 'alignment_direction', 'alignment_severity',
+    'speed_mps', 'is_moving', 'speed_severity',
+    'tear_count', 'max_tear_length_mm', 'tear_severity'
+]
+
+
+@dataclass
+class VideoJob:
+    """Progress and result of one video analysis job"""
+    job_id: str
+    video_path: str
+    frame_stride: int
+    chunk_seconds: float
+    analysis_scale: int
+    include_tears: bool
+    speed_mode: str = 'flow'
+    belt_orientation: str = 'horizontal'
+    status: str = 'queued'  # 'queued', 'running', 'completed', 'failed'
+    total_frames: int = 0
+    fps: float = 0.0
+    total_chunks: int = 0
+    completed_chunks: int = 0
+    frames_analyzed: int = 0
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == 'completed':
+            return 1.0
+        # The container's frame count is an estimate; the last chunk settles it
+        expected = -(-self.total_frames // self.frame_stride)
+        return min(self.frames_analyzed / expected, 0.999) if expected else 0.0
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result['progress'] = round(self.progress, 3)
+        return result
+
+
+def analyze_video_chunk(video_path: str, start_frame: int, end_frame: int, frame_stride: int,
+                        fps: float, monitor_kwargs: Dict, analysis_scale: int,
+                        include_tears: bool, pixel_to_mm: float, job_id: Optional[str] = None) -> List[Tuple]:
+    """
+    Analyze frames [start_frame, end_frame) of a video in a worker process
+
+    Frames between strides are skipped with grab() so they are never decoded.
+    One stride before the chunk is analyzed but not reported, so the speed
+    estimate of the first reported frame has a previous frame to compare to.
+    Every PROGRESS_FRAMES reported frames are counted towards job_id's progress.
+    """
+    monitor = BeltMonitor(analysis_scale=analysis_scale, **monitor_kwargs)
+    tear_detector = BeltTearDetector(pixel_to_mm=pixel_to_mm * analysis_scale) if include_tears else None
+
+    # The tear search follows the belt band found by the monitor
+    monitor.roi = BeltROITracker()
+    if tear_detector is not None:
+        tear_detector.roi = monitor.roi
+
+    first_frame = max(0, start_frame - frame_stride)
+    capture = cv2.VideoCapture(video_path)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+
+    rows = []
+    reported = 0
+    try:
+        for frame_index in range(first_frame, end_frame):
+            if (frame_index - start_frame) % frame_stride:
+                if not capture.grab():
+                    break
+                continue
+
+            ok, image = capture.read()
+            if not ok:
+                break
+
+            analysis_image = reduce_for_analysis(image, analysis_scale)
+            time_s = frame_index / fps
+            status = monitor.analyze_frame(analysis_image, time_s)
+            if frame_index < start_frame:
+                continue
+
+            if tear_detector is not None:
+                tears = tear_detector.analyze_tears(analysis_image)
+                tear_values = (tears.tear_count, tears.max_tear_length_mm, tears.severity)
+            else:
+                tear_values = (0, 0.0, 'skipped')
+
+            rows.append((
+                frame_index, round(time_s, 3),
+                status.alignment_percentage, status.alignment_direction, status.alignment_severity,
+                status.speed_mps, status.is_moving, status.speed_severity,
+                *tear_values
+            ))
+            if len(rows) - reported >= PROGRESS_FRAMES:
+                _report_progress(job_id, len(rows) - reported)
+                reported = len(rows)
+    finally:
+        capture.release()
+    _report_progress(job_id, len(rows) - reported)
+
+    return rows
+
+
+class VideoJobManager:
+    """Runs video analysis jobs on a dedicated process pool"""
+
+    def __init__(self, output_dir: str, workers: int = 2, monitor_kwargs: Optional[Dict] = None,
+                 pixel_to_mm: float = 0.5, access: Optional[MediaAccess] = None,
+                 retention_seconds: float = 3600, max_finished: int = 100):
+        """
+        Initialize video job manager
+
+        Args:
+            output_dir: Directory receiving one timeline CSV per job
+            workers: Number of worker processes analyzing chunks
+            monitor_kwargs: BeltMonitor settings (belt width, nominal speed)
+            pixel_to_mm: Tear detector scale at full resolution
+            access: Directories videos may be read from; without it every path is refused
+            retention_seconds: Finished jobs are forgotten this long after they end (0 keeps them)
+            max_finished: Most finished jobs kept; the oldest are forgotten first
+        """
+        self.output_dir = output_dir
+        self.workers = max(1, int(workers))
+        self.monitor_kwargs = monitor_kwargs or {}
+        self.pixel_to_mm = pixel_to_mm
+        self.access = access or MediaAccess()
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._progress: Optional[multiprocessing.Queue] = None
+        self._jobs: Dict[str, VideoJob] = {}
+        self._chunk_rows: Dict[str, Dict[int, List[Tuple]]] = {}
+        self._futures: Dict[str, List[Future]] = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use so idle services do not keep worker processes around
+        if self._pool is None:
+            self._progress = multiprocessing.Queue()
+            threading.Thread(target=self._collect_progress, args=(self._progress,),
+                             name="video-job-progress", daemon=True).start()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self._progress,))
+        return self._pool
+
+    def _collect_progress(self, progress: multiprocessing.Queue):
+        while True:
+            message = progress.get()
+            if message is None:
+                return
+            job_id, frames = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                # Reports still queued when the job finished are already in its total
+                if job is not None and job.status == 'running':
+                    job.frames_analyzed += frames
+
+    def _prune(self, now: float):
+        """Forget finished jobs past their retention and beyond the cap; their CSV files stay"""
+        finished = sorted((job for job in self._jobs.values() if job.finished_at is not None),
+                          key=lambda job: job.finished_at)
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            if index < excess or (self.retention_seconds and now - job.finished_at > self.retention_seconds):
+                del self._jobs[job.job_id]
+
+    def submit(self, video_path: str, frame_stride: int = 1, chunk_seconds: float = 30,
+               analysis_scale: int = 1, include_tears: bool = True, speed_mode: str = 'flow',
+               belt_orientation: str = 'horizontal') -> VideoJob:
+        self.access.check_path(video_path)
+        if not os.path.isfile(video_path):
+            raise FileNotFoundError(f"Video not found: {video_path}")
+        if frame_stride < 1:
+            raise ValueError("frame_stride must be at least 1")
+        if chunk_seconds <= 0:
+            raise ValueError("chunk_seconds must be positive")
+        if analysis_scale not in ANALYSIS_SCALES:
+            raise ValueError(f"analysis_scale must be one of {ANALYSIS_SCALES}")
+
+        capture = cv2.VideoCapture(video_path)
+        try:
+            if not capture.isOpened():
+                raise ValueError(f"Could not open video: {video_path}")
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            capture.release()
+
+        if total_frames <= 0:
+            raise ValueError(f"Video has no frames: {video_path}")
+
+        job = VideoJob(
+            job_id=uuid.uuid4().hex,
+            video_path=video_path,
+            frame_stride=frame_stride,
+            chunk_seconds=chunk_seconds,
+            analysis_scale=analysis_scale,
+            include_tears=include_tears,
+            speed_mode=speed_mode,
+            belt_orientation=belt_orientation,
+            total_frames=total_frames,
+            fps=fps
+        )
+
+        # Chunk boundaries fall on stride multiples so the timeline has no gaps or overlaps
+        chunk_frames = max(frame_stride, int(chunk_seconds * fps) // frame_stride * frame_stride)
+        starts = list(range(0, total_frames, chunk_frames))
+        job.total_chunks = len(starts)
+
+        pool = self._get_pool()
+        job.status = 'running'
+        monitor_kwargs = {**self.monitor_kwargs, 'speed_mode': speed_mode, 'belt_orientation': belt_orientation}
+        futures = [
+            pool.submit(
+                analyze_video_chunk, video_path, start, min(start + chunk_frames, total_frames),
+                frame_stride, fps, monitor_kwargs, analysis_scale, include_tears, self.pixel_to_mm,
+                job.job_id
+            )
+            for start in starts
+        ]
+
+        with self._lock:
+            self._prune(time.time())
+            self._jobs[job.job_id] = job
+            self._chunk_rows[job.job_id] = {}
+            self._futures[job.job_id] = futures
+
+        # Callbacks are added once the job is registered, so even chunks that already finished find it
+        for chunk_index, future in enumerate(futures):
+            future.add_done_callback(
+                lambda f, job_id=job.job_id, index=chunk_index: self._chunk_done(job_id, index, f)
+            )
+
+        logger.info(f"Video job {job.job_id} started: {total_frames} frames in "
+                    f"{job.total_chunks} chunk(s) of {chunk_frames}")
+        return job
+
+    def _chunk_done(self, job_id: str, chunk_index: int, future: Future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != 'running':
+                return
+
+            try:
+                rows = future.result()
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+                job.finished_at = time.time()
+                self._chunk_rows.pop(job_id, None)
+                siblings = self._futures.pop(job_id, [])
+                logger.error(f"Video job {job_id} failed: {e}")
+            else:
+                self._chunk_rows[job_id][chunk_index] = rows
+                job.completed_chunks += 1
+
+                if job.completed_chunks < job.total_chunks:
+                    return
+
+                chunks = self._chunk_rows.pop(job_id)
+                self._futures.pop(job_id, None)
+                job.frames_analyzed = sum(len(rows) for rows in chunks.values())
+                siblings = None
+
+        if siblings is not None:
+            # Cancelling runs their callbacks, which take the lock, so it happens outside it.
+            # Chunks already running finish and are ignored.
+            for sibling in siblings:
+                sibling.cancel()
+            return
+
+        # Last chunk: merge in frame order and write the timeline outside the lock
+        try:
+            output_path = self._write_timeline(job_id, chunks)
+        except Exception as e:
+            status, error, output_path = 'failed', str(e), None
+            logger.error(f"Video job {job_id} failed writing its timeline: {e}")
+        else:
+            status, error = 'completed', None
+
+        with self._lock:
+            job.output_path = output_path
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+        logger.info(f"Video job {job_id} {status}")
+
+    def _write_timeline(self, job_id: str, chunks: Dict[int, List[Tuple]]) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_path = os.path.join(self.output_dir, f"{job_id}.csv")
+
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(TIMELINE_COLUMNS)
+            for chunk_index in sorted(chunks):
+                writer.writerows(chunks[chunk_index])
+
+        return output_path
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        with self._lock:
+            self._prune(time.time())
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[VideoJob]:
+        with self._lock:
+            self._prune(time.time())
+            return list(self._jobs.values())
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._progress.put(None)
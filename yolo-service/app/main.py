@@ -1,31 +1,155 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
-import cv2
-import numpy as np
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+import asyncio
 import io
+import json
+import os
 import logging
+import time
 from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional
 
-from app.models.belt_monitor import BeltMonitor
+from app import metrics, tasks
+from app.executor import FrameExecutor
+from app.ingest import InvalidFrameError, is_raw_frame, raw_capture_ts
+from app.jobs import VideoJobManager
+from app.media import MediaAccess
+from app.pipeline import ANALYZERS, default_analyzer_factories
+from app.recorder import FrameRecorder
+from app.reorder import StaleFrameError, capture_order
+from app.models.belt_monitor import BeltMonitor, BeltStatus
+from app.sessions import DEFAULT_CAMERA_ID, CameraConfig
+from app.sources import FrameSourceManager, FrameSourceSpec
+from app.streaming import LatestFrameSlot
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Conveyor Belt Monitoring System")
 
-# Initialize belt monitor
-belt_monitor = BeltMonitor(
-    belt_width_mm=1200,
-    nominal_speed_mps=1.5
+BELT_WIDTH_MM = float(os.getenv("BELT_WIDTH_MM", "1200"))
+BELT_NOMINAL_SPEED = float(os.getenv("BELT_NOMINAL_SPEED", "1.5"))
+PIXEL_TO_MM = float(os.getenv("PIXEL_TO_MM", "0.5"))
+
+# partial keeps the factory picklable for process workers
+create_monitor = partial(
+    BeltMonitor,
+    belt_width_mm=BELT_WIDTH_MM,
+    nominal_speed_mps=BELT_NOMINAL_SPEED
+)
+
+EXECUTOR_MODE = os.getenv("EXECUTOR_MODE", "thread")
+EXECUTOR_WORKERS = max(1, int(os.getenv("EXECUTOR_WORKERS", str(os.cpu_count() or 1))))
+# Threads share one session registry; each worker process holds its own cameras'
+# sessions, so the service-wide caps are divided between them
+SESSION_REGISTRIES = EXECUTOR_WORKERS if EXECUTOR_MODE == "process" else 1
+
+# Analysis runs off the event loop; every worker holds one BeltMonitor per camera
+# so optical-flow state is never shared between belts
+executor = FrameExecutor(
+    mode=EXECUTOR_MODE,
+    workers=EXECUTOR_WORKERS,
+    initializer=tasks.init_sessions,
+    initargs=(
+        create_monitor,
+        max(1, int(os.getenv("MAX_SESSIONS", "64")) // SESSION_REGISTRIES),
+        float(os.getenv("SESSION_IDLE_TTL", "600")),
+        float(os.getenv("SESSION_MAX_MEMORY_MB", "512")) / SESSION_REGISTRIES,
+        CameraConfig(
+            analysis_scale=int(os.getenv("ANALYSIS_SCALE", "1")),
+            alignment_backend=os.getenv("ALIGNMENT_BACKEND", "hough"),
+            speed_mode=os.getenv("SPEED_MODE", "flow"),
+            belt_orientation=os.getenv("BELT_ORIENTATION", "horizontal"),
+            tear_profile=os.getenv("TEAR_PROFILE", "quality"),
+            tear_mosaic=os.getenv("TEAR_MOSAIC", "false").lower() == "true",
+            change_gate=os.getenv("CHANGE_GATE", "false").lower() == "true",
+            reorder_window_s=float(os.getenv("REORDER_WINDOW_S", "0.25"))
+        ),
+        default_analyzer_factories(BELT_WIDTH_MM, BELT_NOMINAL_SPEED, PIXEL_TO_MM),
+        os.getenv("METRICS_ENABLED", "true").lower() == "true",
+        partial(
+            FrameRecorder,
+            directory=os.getenv("RECORDING_DIR", "/app/logs/recordings"),
+            max_bytes=int(float(os.getenv("RECORDING_MAX_MB", "1024")) * 1024 * 1024),
+            segment_bytes=int(float(os.getenv("RECORDING_SEGMENT_MB", "64")) * 1024 * 1024)
+        )
+    )
+)
+
+# Reader threads for cameras whose frames are pulled by the service itself
+# Files, devices and stream URLs clients may ask the service to open
+media_access = MediaAccess(
+    roots=tuple(r.strip() for r in os.getenv("MEDIA_ROOTS", "/app/videos").split(",") if r.strip()),
+    schemes=tuple(s.strip().lower() for s in os.getenv("SOURCE_SCHEMES", "rtsp,rtsps").split(",") if s.strip())
 )
 
+frame_sources = FrameSourceManager(executor, media_access)
+
+# Recorded videos are analyzed in chunks on their own process pool
+video_jobs = VideoJobManager(
+    output_dir=os.getenv("JOB_OUTPUT_DIR", "/app/logs/jobs"),
+    workers=int(os.getenv("JOB_WORKERS", str(os.cpu_count() or 1))),
+    monitor_kwargs={"belt_width_mm": BELT_WIDTH_MM, "nominal_speed_mps": BELT_NOMINAL_SPEED},
+    pixel_to_mm=PIXEL_TO_MM,
+    access=media_access,
+    retention_seconds=float(os.getenv("JOB_RETENTION_S", "3600")),
+    max_finished=int(os.getenv("JOB_MAX_FINISHED", "100"))
+)
+
+
+class CameraConfigUpdate(BaseModel):
+    """Fields of CameraConfig to change; omitted fields keep their value"""
+    analysis_scale: Optional[int] = None
+    roi_enabled: Optional[bool] = None
+    edge_tracking: Optional[bool] = None
+    alignment_backend: Optional[str] = None
+    speed_mode: Optional[str] = None
+    belt_orientation: Optional[str] = None
+    tear_profile: Optional[str] = None
+    tear_mosaic: Optional[bool] = None
+    change_gate: Optional[bool] = None
+    reorder_window_s: Optional[float] = None
+
+
+class RecordingRequest(BaseModel):
+    """Turn recording of a camera's frames and results on or off"""
+    enabled: bool
+
+
+class FrameSourceRequest(BaseModel):
+    """Camera source to pull frames from (fields of Camera.get_source_info)"""
+    camera_id: str
+    source: str
+    target_fps: float = 5.0
+    loop: bool = False
+    realtime: bool = True
+
+
+class VideoJobRequest(BaseModel):
+    """Recorded video to analyze"""
+    video_path: str
+    frame_stride: int = 1
+    chunk_seconds: float = 30
+    analysis_scale: int = 1
+    include_tears: bool = True
+    camera_id: str = DEFAULT_CAMERA_ID  # Camera whose speed mode and belt orientation apply
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    await asyncio.get_running_loop().run_in_executor(None, frame_sources.stop_all)
+    video_jobs.shutdown()
+    executor.shutdown(wait=False)
+
 
 @app.get("/")
 async def root():
     return {
         "message": "Conveyor Belt Monitoring System",
         "version": "1.0",
-        "features": ["belt_alignment", "belt_speed"],
+        "features": ["belt_alignment", "belt_speed", "belt_tear"],
         "status": "active"
     }
 
@@ -35,75 +159,442 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "belt_monitor": "initialized"
+        "belt_monitor": "initialized",
+        "executor": executor.stats()
     }
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency histograms, frame counters and resource gauges"""
+    snapshots = [metrics.REGISTRY.snapshot()]
+    gauges = [("process_resident_memory_bytes", (("process", "api"),), metrics.resident_memory_bytes())]
+
+    # Thread workers record into this process' registry; worker processes report their own
+    if executor.mode == "process":
+        for index, snapshot in enumerate(await executor.broadcast(tasks.metrics_snapshot)):
+            snapshots.append(snapshot)
+            gauges.append(("process_resident_memory_bytes", (("process", f"worker-{index}"),),
+                           snapshot["rss_bytes"]))
+
+    for index, shard in enumerate(executor.stats()["shards"]):
+        gauges.append(("belt_executor_queue_depth", (("shard", str(index)),), shard["queue_depth"]))
+    sessions = _merge_session_stats(await executor.broadcast(tasks.session_stats))
+    gauges.append(("belt_sessions", (), sessions["sessions"]))
+
+    text = metrics.render(metrics.merge_snapshots(snapshots), [g for g in gauges if g[2] is not None])
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/sessions")
+async def list_sessions():
+    return _merge_session_stats(await executor.broadcast(tasks.session_stats))
+
+
+@app.get("/sessions/{camera_id}/config")
+async def get_camera_config(camera_id: str):
+    return await executor.run(camera_id, tasks.get_config, camera_id)
+
+
+@app.post("/sessions/{camera_id}/config")
+async def configure_camera(camera_id: str, update: CameraConfigUpdate):
+    changes = {k: v for k, v in update.dict().items() if v is not None}
+    try:
+        return await executor.run(camera_id, tasks.configure, camera_id, changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/sessions/{camera_id}/recording")
+async def get_recording(camera_id: str):
+    stats = await executor.run(camera_id, tasks.recording_stats, camera_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Camera '{camera_id}' has not been recorded")
+    return stats
+
+
+@app.post("/sessions/{camera_id}/recording")
+async def set_recording(camera_id: str, request: RecordingRequest):
+    """
+    Record the camera's frames, timestamps and results for benchmarks.replay
+
+    Segments go to RECORDING_DIR/<camera_id>, capped at RECORDING_MAX_MB per camera.
+    Recording ends when the camera's session is evicted.
+    """
+    try:
+        return await executor.run(camera_id, tasks.set_recording, camera_id, request.enabled)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError as e:
+        raise HTTPException(status_code=503, detail=f"Could not start recording: {e}")
+
+
+@app.get("/sources")
+async def list_frame_sources():
+    return frame_sources.stats()
+
+
+@app.post("/sources")
+async def start_frame_source(request: FrameSourceRequest):
+    """Start (or restart) pulling frames from a camera's RTSP URL, device or video file"""
+    try:
+        # A replaced source's reader is joined first, which may take a moment
+        worker = await asyncio.get_running_loop().run_in_executor(
+            None, frame_sources.start, FrameSourceSpec(**request.dict()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"camera_id": request.camera_id, **worker.stats()}
+
+
+@app.delete("/sources/{camera_id}")
+async def stop_frame_source(camera_id: str):
+    if not frame_sources.stop(camera_id):
+        raise HTTPException(status_code=404, detail=f"No frame source for camera '{camera_id}'")
+    return {"message": f"Frame source for camera '{camera_id}' stopped"}
+
+
+@app.post("/jobs")
+async def submit_video_job(request: VideoJobRequest):
+    """Analyze a whole video file in parallel chunks; poll GET /jobs/{job_id} for progress"""
+    params = request.dict()
+    camera_id = params.pop('camera_id')
+    config = await executor.run(camera_id, tasks.get_config, camera_id)
+    submit = partial(video_jobs.submit, **params, speed_mode=config['speed_mode'],
+                     belt_orientation=config['belt_orientation'])
+    try:
+        # Probing the video opens it with VideoCapture, which blocks
+        job = await asyncio.get_running_loop().run_in_executor(None, submit)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_dict()
+
+
+@app.get("/jobs")
+async def list_video_jobs():
+    return [job.to_dict() for job in video_jobs.list()]
+
+
+@app.get("/jobs/{job_id}")
+async def get_video_job(job_id: str):
+    job = video_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job.to_dict()
+
+
 @app.post("/analyze")
-async def analyze_belt(file: UploadFile = File(...)):
+async def analyze_belt(file: UploadFile = File(...),
+                       capture_ts: Optional[float] = Form(None),
+                       camera_id: str = Query(DEFAULT_CAMERA_ID),
+                       timings: bool = Query(False)):
+    """
+    Analyze one frame
+
+    capture_ts is the capture time in seconds on the client's clock. Speed is
+    measured between capture times, so frames can be queued or sent late
+    without corrupting it; without it the arrival time is used.
+
+    With timings=true the response breaks the frame's processing time down
+    per stage and lists the fast paths it took.
+    """
+    try:
+        contents = await file.read()
+        status = await executor.run(camera_id, tasks.analyze_frame, camera_id, contents, capture_ts, timings)
+
+        return _timed_response(partial(_status_payload, status, camera_id, file.filename))
+
+    except StaleFrameError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except InvalidFrameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Analysis error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/analyze/raw")
+async def analyze_raw(request: Request,
+                      camera_id: str = Query(DEFAULT_CAMERA_ID),
+                      timings: bool = Query(False)):
+    """
+    Analyze a raw pixel buffer (see app.ingest for the header layout)
+
+    The body is the frame itself, so there is no multipart parsing and no JPEG
+    decode; grayscale frames also skip colour conversion.
+    """
+    contents = await request.body()
+    if not is_raw_frame(contents):
+        raise HTTPException(status_code=400, detail="Body is not a raw frame")
+
     try:
+        status = await executor.run(camera_id, tasks.analyze_frame, camera_id, contents, None, timings)
+        return _timed_response(partial(_status_payload, status, camera_id, None))
+
+    except StaleFrameError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except InvalidFrameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Raw analysis error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(files: List[UploadFile] = File(...),
+                        camera_ids: Optional[List[str]] = Form(None),
+                        capture_ts: Optional[List[float]] = Form(None),
+                        camera_id: str = Query(DEFAULT_CAMERA_ID)):
+    """
+    Analyze many frames from one request, streaming one NDJSON line per frame
+
+    camera_ids is either omitted (all frames belong to camera_id), a single id
+    for every frame, or one id per file in upload order. capture_ts holds one
+    capture time per file; frames are then analyzed in capture order whatever
+    their upload order, so a batch can hold frames collected over any span.
+    """
+    if camera_ids and len(camera_ids) not in (1, len(files)):
+        raise HTTPException(status_code=400,
+                            detail="camera_ids must contain one id or one id per file")
+    if capture_ts and len(capture_ts) != len(files):
+        raise HTTPException(status_code=400, detail="capture_ts must contain one time per file")
+
+    if not camera_ids:
+        frame_cameras = [camera_id] * len(files)
+    elif len(camera_ids) == 1:
+        frame_cameras = camera_ids * len(files)
+    else:
+        frame_cameras = camera_ids
+
+    timestamps = capture_ts or [None] * len(files)
+
+    # Submitting in capture order keeps each camera's frames ordered on its shard,
+    # while frames of different cameras are analyzed in parallel
+    pending = {}
+    for index in capture_order(timestamps):
+        file, frame_camera = files[index], frame_cameras[index]
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        future = asyncio.wrap_future(
+            executor.submit(frame_camera, tasks.analyze_frame, frame_camera, contents, timestamps[index])
+        )
+        pending[future] = (index, frame_camera, file.filename)
+
+    async def stream_results():
+        remaining = set(pending)
+        while remaining:
+            done, remaining = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                index, frame_camera, filename = pending[future]
+                try:
+                    result = _status_payload(future.result(), frame_camera, filename)
+                except (InvalidFrameError, StaleFrameError) as e:
+                    result = {"camera_id": frame_camera, "filename": filename, "error": str(e)}
+                except Exception as e:
+                    logger.error(f"Batch analysis error: {e}")
+                    result = {"camera_id": frame_camera, "filename": filename, "error": str(e)}
+                result["index"] = index
+                yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 
-        if image is None:
-            raise HTTPException(status_code=400, detail="Invalid image file")
+@app.websocket("/stream/{camera_id}")
+async def stream_belt(websocket: WebSocket, camera_id: str):
+    """
+    Continuous ingestion: the client pushes binary frames and receives one JSON
+    status per analyzed frame on the same socket. Frames arriving while the
+    analyzer is busy replace each other, so only the newest one is analyzed.
 
-        status = belt_monitor.analyze_frame(image)
+    A text message {"capture_ts": seconds} stamps the next binary frame with
+    its capture time (raw frames may carry it in their header instead). A
+    waiting frame is only replaced by one captured later.
+    """
+    await websocket.accept()
+    slot = LatestFrameSlot()
 
-        return JSONResponse({
+    async def analyze_latest():
+        while True:
+            frame = await slot.get()
+            if frame is None:
+                return
+            contents, capture_ts = frame
+            try:
+                status = await executor.run(camera_id, tasks.analyze_frame, camera_id, contents, capture_ts)
+                result = _status_payload(status, camera_id, None)
+            except (InvalidFrameError, StaleFrameError) as e:
+                result = {"camera_id": camera_id, "error": str(e)}
+            except Exception as e:
+                logger.error(f"Stream analysis error: {e}")
+                result = {"camera_id": camera_id, "error": str(e)}
+
+            result["frames_received"] = slot.received
+            result["frames_dropped"] = slot.dropped
+            await websocket.send_json(result)
+
+    analyzer = asyncio.create_task(analyze_latest())
+    capture_ts = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                try:
+                    capture_ts = float(json.loads(message["text"])["capture_ts"])
+                except (ValueError, KeyError, TypeError):
+                    await websocket.send_json({"camera_id": camera_id, "error": "Expected {\"capture_ts\": seconds}"})
+            elif message.get("bytes") is not None:
+                contents = message["bytes"]
+                dropped = slot.dropped
+                slot.put(contents, capture_ts if capture_ts is not None else raw_capture_ts(contents))
+                if slot.dropped > dropped:
+                    metrics.REGISTRY.inc("belt_frames_dropped_total", camera=camera_id, reason="stream_replaced")
+                capture_ts = None
+    except WebSocketDisconnect:
+        pass
+    finally:
+        slot.close()
+        analyzer.cancel()
+        logger.info(f"Stream for camera '{camera_id}' closed "
+                    f"({slot.received} frames received, {slot.dropped} dropped)")
+
+
+@app.post("/pipeline")
+async def analyze_pipeline(file: UploadFile = File(...),
+                           capture_ts: Optional[float] = Form(None),
+                           camera_id: str = Query(DEFAULT_CAMERA_ID),
+                           analyzers: str = Query("alignment,speed,tears"),
+                           timings: bool = Query(False)):
+    """
+    Run several analyzers on one upload and return a combined result
+
+    analyzers is a comma-separated subset of monitor, alignment, speed and tears.
+    Shared intermediates are computed once and independent analyzers run in parallel.
+    With timings=true each analyzer is also broken down into its stages.
+    """
+    selected = [name.strip() for name in analyzers.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in ANALYZERS]
+    if not selected or unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"analyzers must be a subset of {', '.join(ANALYZERS)}")
+
+    try:
+        contents = await file.read()
+        result = await executor.run(camera_id, tasks.analyze_pipeline, camera_id, contents, selected,
+                                    capture_ts, timings)
+
+        return _timed_response(lambda: {
             "timestamp": datetime.now().isoformat(),
+            "camera_id": camera_id,
             "filename": file.filename,
-            "alignment": {
-                "deviation_percentage": status.alignment_percentage,
-                "direction": status.alignment_direction,
-                "severity": status.alignment_severity
-            },
-            "speed": {
-                "meters_per_second": status.speed_mps,
-                "percentage_of_nominal": status.speed_percentage,
-                "is_moving": status.is_moving,
-                "severity": status.speed_severity
-            },
-            "alert": status.alert
+            **result
         })
 
+    except StaleFrameError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except InvalidFrameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Analysis error: {e}")
+        logger.error(f"Pipeline error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/visualize")
-async def visualize_belt(file: UploadFile = File(...)):
+async def visualize_belt(file: UploadFile = File(...),
+                         capture_ts: Optional[float] = Form(None),
+                         camera_id: str = Query(DEFAULT_CAMERA_ID)):
     try:
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if image is None:
-            raise HTTPException(status_code=400, detail="Invalid image file")
-
-        status = belt_monitor.analyze_frame(image)
-        annotated = belt_monitor.visualize(image, status)
-
-        _, buffer = cv2.imencode('.jpg', annotated)
+        status, jpeg = await executor.run(camera_id, tasks.visualize_frame, camera_id, contents, capture_ts)
 
         return StreamingResponse(
-            io.BytesIO(buffer.tobytes()),
+            io.BytesIO(jpeg),
             media_type="image/jpeg",
             headers={
+                "X-Camera-Id": camera_id,
                 "X-Alignment": f"{status.alignment_percentage}% {status.alignment_direction}",
                 "X-Speed": f"{status.speed_mps} m/s",
-                "X-Alert": status.alert or "none"
+                "X-Alert": status.alert or "none",
+                "X-Gate": status.gate
             }
         )
 
+    except StaleFrameError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except InvalidFrameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Visualization error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/reset")
-async def reset_monitor():
-    belt_monitor.reset()
-    return {"message": "Belt monitor reset successfully"}
\ No newline at end of file
+async def reset_monitor(camera_id: Optional[str] = Query(None)):
+    """Reset one camera's monitor, or all of them when no camera_id is given"""
+    if camera_id is None:
+        count = sum(await executor.broadcast(tasks.reset))
+    else:
+        count = await executor.run(camera_id, tasks.reset, camera_id)
+        if count == 0:
+            raise HTTPException(status_code=404, detail=f"Unknown camera '{camera_id}'")
+    return {"message": "Belt monitor reset successfully", "sessions_reset": count}
+
+
+def _status_payload(status: BeltStatus, camera_id: str, filename: Optional[str]) -> Dict:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "camera_id": camera_id,
+        "filename": filename,
+        "alignment": {
+            "deviation_percentage": status.alignment_percentage,
+            "direction": status.alignment_direction,
+            "severity": status.alignment_severity,
+            "belt_center": status.belt_center,
+            **({"confidence": status.alignment_confidence}
+               if status.alignment_confidence is not None else {})
+        },
+        "speed": {
+            "meters_per_second": status.speed_mps,
+            "percentage_of_nominal": status.speed_percentage,
+            "is_moving": status.is_moving,
+            "severity": status.speed_severity
+        },
+        "alert": status.alert,
+        "gate": status.gate,
+        "frame_timestamp": status.timestamp,
+        "late": status.late,
+        **({"timings": status.timings} if status.timings is not None else {})
+    }
+
+
+def _timed_response(build_payload) -> JSONResponse:
+    """
+    Build a response payload, adding its own serialization time to a requested breakdown
+
+    The payload is serialized once to time it; that only happens when timings were asked for.
+    """
+    start = time.perf_counter()
+    payload = build_payload()
+    timings = payload.get("timings")
+    if timings is not None:
+        json.dumps(payload)
+        timings["steps_ms"]["api"] = {"serialize": round((time.perf_counter() - start) * 1000, 3)}
+    return JSONResponse(payload)
+
+
+def _merge_session_stats(shard_stats: List[Dict]) -> Dict:
+    # Thread workers share one registry; process workers each report their own
+    if executor.mode == "thread":
+        return shard_stats[0]
+
+    # Each process enforces its share of the caps; the sums are the service-wide caps
+    merged = {'sessions': 0, 'max_sessions': 0, 'memory_bytes': 0, 'max_memory_bytes': 0,
+              'evictions': 0, 'cameras': {}}
+    for stats in shard_stats:
+        for key in ('sessions', 'max_sessions', 'memory_bytes', 'max_memory_bytes', 'evictions'):
+            merged[key] += stats[key]
+        merged['cameras'].update(stats['cameras'])
+    return merged
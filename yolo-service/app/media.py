@@ -0,0 +1,42 @@
+"""
+Which videos and streams the service opens on a client's behalf.
+
+POST /sources and POST /jobs name a file, device or URL that the service
+opens with cv2.VideoCapture. Files must lie under one of the configured
+media roots, stream URLs must use an allowed scheme, and devices are
+accepted as an index or a /dev/video* path. Anything else is rejected
+before it is opened.
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Tuple
+
+_DEVICE = re.compile(r'^(\d+|/dev/video\d+)$')
+
+
+@dataclass(frozen=True)
+class MediaAccess:
+    """Allow-list for client-supplied video paths and source URLs"""
+    roots: Tuple[str, ...] = ()  # Directories video files may be read from
+    schemes: Tuple[str, ...] = ('rtsp', 'rtsps')  # URL schemes streams may use
+
+    def check_path(self, path: str):
+        """Raise ValueError unless path resolves inside one of the media roots"""
+        resolved = os.path.realpath(path)
+        for root in self.roots:
+            root = os.path.realpath(root)
+            if os.path.commonpath([resolved, root]) == root:
+                return
+        raise ValueError(f"'{path}' is outside the allowed media directories")
+
+    def check_source(self, source: str):
+        """Raise ValueError unless source is a device, an allowed stream URL or an allowed file"""
+        if _DEVICE.match(source):
+            return
+        if '://' in source:
+            scheme = source.split('://', 1)[0].lower()
+            if scheme not in self.schemes:
+                raise ValueError(f"Stream scheme '{scheme}' is not allowed, expected one of {self.schemes}")
+            return
+        self.check_path(source)
@@ -0,0 +1,218 @@
+"""
+Prometheus metrics for the analysis service.
+
+Every process keeps its own MetricsRegistry: the API process counts what it
+drops, and workers record per-stage latencies while they analyze frames. On
+a scrape the API process merges its registry with snapshots from the worker
+processes and renders the Prometheus text format, so there is no metrics
+dependency and recording a sample is one bisect and a locked increment.
+
+Stage latencies are grouped by camera and analyzer (monitor, alignment,
+speed, tears, or shared for intermediates computed once per frame), so slow
+belts and slow analyzers can be told apart.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Upper bounds in seconds; a frame budget is tens of milliseconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGE_METRIC = "belt_stage_duration_seconds"
+
+HELP = {
+    STAGE_METRIC: "Time spent in one analysis stage of a frame",
+    "belt_frames_processed_total": "Frames analyzed per camera",
+    "belt_frames_dropped_total": "Frames dropped before analysis per camera and reason",
+    "belt_executor_queue_depth": "Frames queued or running per executor shard",
+    "belt_sessions": "Live camera sessions",
+    "process_resident_memory_bytes": "Resident memory of the API and worker processes",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Counters and latency histograms of one process"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, camera_id: str, analyzer: str):
+        """Record one stage latency"""
+        key = (STAGE_METRIC, (('camera', camera_id), ('analyzer', analyzer), ('stage', stage)))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            # Per-bucket counts followed by the sum
+            values = self._histograms.get(key)
+            if values is None:
+                values = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            values[index] += 1
+            values[-1] += seconds
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self) -> Dict:
+        """Picklable copy of all samples, for sending from a worker process"""
+        with self._lock:
+            return {
+                'histograms': {key: list(values) for key, values in self._histograms.items()},
+                'counters': dict(self._counters),
+            }
+
+
+def merge_snapshots(snapshots: Iterable[Dict]) -> Dict:
+    merged = {'histograms': {}, 'counters': {}}
+    for snapshot in snapshots:
+        for key, values in snapshot['histograms'].items():
+            current = merged['histograms'].get(key)
+            merged['histograms'][key] = list(values) if current is None else [a + b for a, b in zip(current, values)]
+        for key, value in snapshot['counters'].items():
+            merged['counters'][key] = merged['counters'].get(key, 0) + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(snapshot: Dict, gauges: Iterable[Tuple[str, Labels, float]] = (),
+           buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> str:
+    """Prometheus text exposition of a merged snapshot plus scrape-time gauges"""
+    lines: List[str] = []
+
+    def header(name: str, kind: str):
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    histograms = snapshot['histograms']
+    for name in sorted({key[0] for key in histograms}):
+        header(name, 'histogram')
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + (float('inf'),), values[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-1]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+    counters = snapshot['counters']
+    for name in sorted({key[0] for key in counters}):
+        header(name, 'counter')
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    gauges = list(gauges)
+    for name in sorted({gauge[0] for gauge in gauges}):
+        header(name, 'gauge')
+        for metric, labels, value in gauges:
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """RSS of this process from /proc, None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StageTimer:
+    """
+    Stage timer for one camera's frame.
+
+    Samples go to a metrics registry, to a per-request breakdown, or both;
+    frames needing neither get the FrameContext NullTimer instead. The
+    analyzer label is per thread, so pipeline stages running concurrently on
+    a shared FrameContext attribute their samples to their own analyzer.
+    """
+
+    def __init__(self, camera_id: str, analyzer: str, registry: Optional[MetricsRegistry] = None,
+                 breakdown: bool = False):
+        """
+        Initialize stage timer
+
+        Args:
+            camera_id: Camera label of every sample
+            analyzer: Analyzer label outside analyzer() blocks
+            registry: Registry receiving the samples, if metrics are enabled
+            breakdown: Also collect per-stage times and fast paths of this frame
+        """
+        self.registry = registry
+        self.camera_id = camera_id
+        self.default_analyzer = analyzer
+        self.steps: Optional[Dict[Tuple[str, str], float]] = {} if breakdown else None
+        self.fast_paths: Optional[Set[str]] = set() if breakdown else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def current_analyzer(self) -> str:
+        return getattr(self._local, 'analyzer', self.default_analyzer)
+
+    @contextmanager
+    def analyzer(self, name: str):
+        previous = self.current_analyzer
+        self._local.analyzer = name
+        try:
+            yield
+        finally:
+            self._local.analyzer = previous
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            analyzer = self.current_analyzer
+            if self.registry is not None:
+                self.registry.observe(name, elapsed, self.camera_id, analyzer)
+            if self.steps is not None:
+                with self._lock:
+                    key = (analyzer, name)
+                    self.steps[key] = self.steps.get(key, 0.0) + elapsed
+
+    def fast_path(self, name: str):
+        """Note that a shortcut was taken for this frame"""
+        if self.fast_paths is not None:
+            self.fast_paths.add(name)
+
+    def breakdown(self) -> Dict[str, Dict[str, float]]:
+        """Milliseconds per analyzer and stage; nested stages are also part of their parent"""
+        result: Dict[str, Dict[str, float]] = {}
+        for (analyzer, stage), seconds in sorted((self.steps or {}).items()):
+            result.setdefault(analyzer, {})[stage] = round(seconds * 1000, 3)
+        return result
+
+
+# Registry of this process (the API process, or one worker process)
+REGISTRY = MetricsRegistry()
@@ -5,6 +5,11 @@ import logging
 from dataclasses import dataclass
 import math
 
+from app.models.belt_roi import BeltROITracker, match_edge_lines
+from app.models.edge_projection import find_edges_by_projection
+from app.models.edge_tracking import BeltEdgeTracker, EdgeLine
+from app.models.frame_context import FrameContext, FrameLike
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,18 +23,26 @@ class BeltAlignmentStatus:
     severity: str  # 'normal', 'warning', 'critical'
     confidence: float
     timestamp: float
+    belt_center: Optional[float] = None  # Belt centre x in full-resolution pixels, when detected
 
 
 class BeltAlignmentDetector:
     """Detect conveyor belt alignment/misalignment"""
 
-    def __init__(self, belt_width_mm: float = 1200, camera_fov_degrees: float = 60):
+    def __init__(self, belt_width_mm: float = 1200, camera_fov_degrees: float = 60,
+                 edge_tracking: bool = True, alignment_backend: str = 'hough',
+                 analysis_scale: int = 1):
         """
         Initialize belt alignment detector
 
         Args:
             belt_width_mm: Actual belt width in millimeters
             camera_fov_degrees: Camera field of view in degrees
+            edge_tracking: Follow known edges with gradient profiles instead of
+                running Hough on every frame
+            alignment_backend: Edge acquisition, 'hough' or 'projection'
+            analysis_scale: Frames are analyzed at 1/analysis_scale of the camera
+                resolution; pixel thresholds are defined at full resolution
         """
         self.belt_width_mm = belt_width_mm
         self.camera_fov = camera_fov_degrees
@@ -37,11 +50,22 @@ class BeltAlignmentDetector:
         self.reference_edges = None
         self.belt_center_line = None
 
+        # Belt band shared with the camera's other analyzers; None analyzes full frames
+        self.roi: Optional[BeltROITracker] = None
+
+        self.edge_tracking = edge_tracking
+        self.edge_tracker = BeltEdgeTracker()
+        self.alignment_backend = alignment_backend
+        self.analysis_scale = analysis_scale
+
+        # Confidence of the projection profile or edge track behind the last edges
+        self.edge_confidence: Optional[float] = None
+
         # Alignment thresholds
         self.warning_threshold = 5.0  # 5% deviation warning
         self.critical_threshold = 10.0  # 10% deviation critical
 
-    def detect_belt_edges(self, image: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    def detect_belt_edges(self, image: FrameLike) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
         """
         Detect left and right edges of the conveyor belt
 
@@ -49,59 +73,136 @@ class BeltAlignmentDetector:
             Tuple of (left_edge_points, right_edge_points)
         """
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            ctx = FrameContext.wrap(image)
 
-            # Apply Gaussian blur to reduce noise
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+            left_edge = right_edge = None
+            if self.edge_tracking:
+                tracked = self.edge_tracker.track(ctx)
+                if tracked is not None:
+                    left_edge, right_edge = tracked[0].points(), tracked[1].points()
+                    self.edge_confidence = self.edge_tracker.confidence
+                    ctx.timer.fast_path('edge_tracking')
+
+            if left_edge is None or right_edge is None:
+                left_edge, right_edge = self._acquire_edges(ctx)
+                if self.edge_tracking and left_edge is not None and right_edge is not None:
+                    self.edge_tracker.acquire(EdgeLine.from_points(left_edge, ctx.height),
+                                              EdgeLine.from_points(right_edge, ctx.height), ctx.shape)
+
+            if self.roi is not None:
+                if left_edge is not None and right_edge is not None:
+                    self.roi.confirm((left_edge[0] + left_edge[2]) / 2,
+                                     (right_edge[0] + right_edge[2]) / 2, ctx.width)
+                else:
+                    self.roi.miss()
+
+            return left_edge, right_edge
+
+        except Exception as e:
+            logger.error(f"Error detecting belt edges: {e}")
+            return None, None
+
+    def _acquire_edges(self, ctx: FrameContext) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Full search for both edges, within the belt band first if one is known"""
+        belt = self.roi.edges(ctx.width) if self.roi is not None else None
+        if self.alignment_backend == 'projection':
+            ctx.timer.fast_path('projection')
+            return self._find_edges_by_projection(ctx, belt)
+
+        left_edge = right_edge = None
+        if belt is not None:
+            left_edge, right_edge = self._find_edges_in_band(ctx, belt)
+        if left_edge is not None and right_edge is not None:
+            ctx.timer.fast_path('roi_band')
+        else:
+            # No band yet, or the belt left it: search the whole frame
+            left_edge, right_edge = self._find_edges(ctx)
+        return left_edge, right_edge
+
+    def _find_edges_by_projection(self, ctx: FrameContext,
+                                  belt: Optional[Tuple[float, float]]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        search_px = max(3, 12 // self.analysis_scale)
+        found = None
+        if belt is not None:
+            # The belt fills most of its band, so the edges are far apart
+            x0, x1 = self.roi.band(ctx.width, belt)
+            found = find_edges_by_projection(ctx.region(x0, x1), min_belt_ratio=0.5,
+                                             search_px=search_px, x_offset=x0)
+        if found is None:
+            found = find_edges_by_projection(ctx, search_px=search_px)
+        if found is None:
+            return None, None
+        self.edge_confidence = found.confidence
+        return found.left.points(), found.right.points()
 
-            # Use Canny edge detection
-            edges = cv2.Canny(blurred, 50, 150)
+    def _hough_lines(self, ctx: FrameContext) -> Optional[np.ndarray]:
+        # Gray -> Gaussian blur -> Canny, shared with other analyzers of this frame
+        edges = ctx.canny(50, 150)
 
-            # Use Hough transform to find lines
-            lines = cv2.HoughLinesP(
+        # Use Hough transform to find lines; pixel parameters are defined at full resolution
+        scale = self.analysis_scale
+        with ctx.timer.stage('hough'):
+            return cv2.HoughLinesP(
                 edges,
                 rho=1,
                 theta=np.pi / 180,
-                threshold=100,
-                minLineLength=100,
-                maxLineGap=50
+                threshold=max(20, 100 // scale),
+                minLineLength=max(10, 100 // scale),
+                maxLineGap=max(1, 50 // scale)
             )
 
-            if lines is None:
-                return None, None
+    def _find_edges_in_band(self, ctx: FrameContext, belt: Tuple[float, float]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Edge search confined to the belt band around the last confirmed edges"""
+        x0, x1 = self.roi.band(ctx.width, belt)
+        lines = self._hough_lines(ctx.region(x0, x1))
+        if lines is None:
+            return None, None
 
-            # Separate lines into left and right edges based on slope and position
-            left_edges = []
-            right_edges = []
-            height, width = image.shape[:2]
-            center_x = width // 2
+        left_edge, right_edge = match_edge_lines(
+            lines, (belt[0] - x0, belt[1] - x0), self.roi.margin(*belt)
+        )
+        if left_edge is None or right_edge is None:
+            return None, None
 
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
+        # Back to full-frame coordinates
+        offset = np.array([x0, 0, x0, 0])
+        return left_edge + offset, right_edge + offset
 
-                # Calculate line slope
-                if x2 - x1 != 0:
-                    slope = (y2 - y1) / (x2 - x1)
+    def _find_edges(self, ctx: FrameContext) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Full-frame edge search"""
+        lines = self._hough_lines(ctx)
 
-                    # Filter for near-vertical lines (belt edges)
-                    if abs(slope) > 2:  # Near vertical
-                        line_center_x = (x1 + x2) / 2
+        if lines is None:
+            return None, None
 
-                        if line_center_x < center_x - 50:  # Left side
-                            left_edges.append(line[0])
-                        elif line_center_x > center_x + 50:  # Right side
-                            right_edges.append(line[0])
+        # Separate lines into left and right edges based on slope and position
+        left_edges = []
+        right_edges = []
+        height, width = ctx.height, ctx.width
+        center_x = width // 2
+        margin = 50 / self.analysis_scale
 
-            # Average the edges
-            left_edge = np.mean(left_edges, axis=0) if left_edges else None
-            right_edge = np.mean(right_edges, axis=0) if right_edges else None
+        for line in lines:
+            x1, y1, x2, y2 = line[0]
 
-            return left_edge, right_edge
+            # Calculate line slope
+            if x2 - x1 != 0:
+                slope = (y2 - y1) / (x2 - x1)
 
-        except Exception as e:
-            logger.error(f"Error detecting belt edges: {e}")
-            return None, None
+                # Filter for near-vertical lines (belt edges)
+                if abs(slope) > 2:  # Near vertical
+                    line_center_x = (x1 + x2) / 2
+
+                    if line_center_x < center_x - margin:  # Left side
+                        left_edges.append(line[0])
+                    elif line_center_x > center_x + margin:  # Right side
+                        right_edges.append(line[0])
+
+        # Average the edges
+        left_edge = np.mean(left_edges, axis=0) if left_edges else None
+        right_edge = np.mean(right_edges, axis=0) if right_edges else None
+
+        return left_edge, right_edge
 
     def calculate_belt_center(self, left_edge: np.ndarray, right_edge: np.ndarray) -> Optional[float]:
         """
@@ -139,10 +240,11 @@ class BeltAlignmentDetector:
         pixel_to_mm = self.belt_width_mm / image_width
         deviation_mm = pixel_deviation * pixel_to_mm
 
-        # Determine direction
-        if pixel_deviation < -5:
+        # Determine direction; the deadband is 5 full-resolution pixels
+        deadband = 5 / self.analysis_scale
+        if pixel_deviation < -deadband:
             direction = "left"
-        elif pixel_deviation > 5:
+        elif pixel_deviation > deadband:
             direction = "right"
         else:
             direction = "center"
@@ -163,7 +265,7 @@ class BeltAlignmentDetector:
             'severity': severity
         }
 
-    def detect_misalignment_cause(self, image: np.ndarray, edges: Tuple) -> List[str]:
+    def detect_misalignment_cause(self, image: FrameLike, edges: Tuple) -> List[str]:
         """
         Detect potential causes of misalignment
         """
@@ -174,10 +276,11 @@ class BeltAlignmentDetector:
             return ["Edge detection failed"]
 
         # Check for stuck material on edges
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        ctx = FrameContext.wrap(image)
+        gray = ctx.gray()
 
         # Sample regions near edges
-        height, width = image.shape[:2]
+        height, width = ctx.height, ctx.width
 
         # Check left edge region
         left_region = gray[:, :50]
@@ -201,13 +304,17 @@ class BeltAlignmentDetector:
 
         return causes
 
-    def analyze_alignment(self, image: np.ndarray) -> BeltAlignmentStatus:
+    def analyze_alignment(self, image: FrameLike) -> BeltAlignmentStatus:
         """
         Main method to analyze belt alignment
         """
         try:
+            ctx = FrameContext.wrap(image)
+
             # Detect belt edges
-            left_edge, right_edge = self.detect_belt_edges(image)
+            self.edge_confidence = None
+            with ctx.timer.stage('edges'):
+                left_edge, right_edge = self.detect_belt_edges(ctx)
 
             if left_edge is None or right_edge is None:
                 return BeltAlignmentStatus(
@@ -222,7 +329,7 @@ class BeltAlignmentDetector:
 
             # Calculate belt center
             belt_center = self.calculate_belt_center(left_edge, right_edge)
-            image_height, image_width = image.shape[:2]
+            image_height, image_width = ctx.height, ctx.width
 
             # Calculate deviation
             deviation = self.calculate_deviation(belt_center, image_width)
@@ -230,8 +337,11 @@ class BeltAlignmentDetector:
             # Determine if aligned (deviation < warning threshold)
             is_aligned = deviation['deviation_percentage'] < self.warning_threshold
 
-            # Calculate confidence based on edge detection quality
-            confidence = self._calculate_confidence(left_edge, right_edge)
+            # The projection profile rates its own edges; Hough lines are rated by their angle
+            if self.alignment_backend == 'projection' and self.edge_confidence is not None:
+                confidence = self.edge_confidence
+            else:
+                confidence = self._calculate_confidence(left_edge, right_edge)
 
             return BeltAlignmentStatus(
                 is_aligned=is_aligned,
@@ -240,7 +350,8 @@ class BeltAlignmentDetector:
                 direction=deviation['direction'],
                 severity=deviation['severity'],
                 confidence=confidence,
-                timestamp=cv2.getTickCount() / cv2.getTickFrequency()
+                timestamp=cv2.getTickCount() / cv2.getTickFrequency(),
+                belt_center=float(belt_center) * self.analysis_scale
             )
 
         except Exception as e:
@@ -275,12 +386,13 @@ class BeltAlignmentDetector:
 
         return (left_quality + right_quality) / 2
 
-    def visualize_alignment(self, image: np.ndarray, status: BeltAlignmentStatus) -> np.ndarray:
+    def visualize_alignment(self, image: FrameLike, status: BeltAlignmentStatus) -> np.ndarray:
         """
         Draw alignment visualization on image
         """
-        result = image.copy()
-        height, width = image.shape[:2]
+        ctx = FrameContext.wrap(image)
+        result = ctx.color().copy()
+        height, width = ctx.height, ctx.width
 
         # Draw center line
         center_x = width // 2
@@ -6,6 +6,13 @@ from typing import Dict, Tuple, Optional
 from collections import deque
 import time
 
+from app.models.belt_roi import BeltROITracker, match_edge_lines
+from app.models.edge_projection import find_edges_by_projection
+from app.models.edge_tracking import BeltEdgeTracker, EdgeLine
+from app.models.feature_speed import FeatureDisplacementTracker
+from app.models.frame_context import FrameContext, FrameLike
+from app.models.strip_speed import StripDisplacementEstimator
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,13 +28,27 @@ class BeltStatus:
     speed_severity: str
     timestamp: float
     alert: Optional[str] = None
+    left_edge: Optional[int] = None
+    right_edge: Optional[int] = None
+    belt_center: Optional[int] = None
+    alignment_confidence: Optional[float] = None  # Edge confidence, projection backend only
+    gate: str = 'full'  # 'full', or the change-gate action that served this frame
+    late: bool = False  # Arrived after a newer frame; speed is the previous measurement
+    timings: Optional[Dict] = None  # Per-stage breakdown, when the request asked for it
 
 
 class BeltMonitor:
-    def __init__(self, belt_width_mm: float = 1200, nominal_speed_mps: float = 1.5):
+    def __init__(self, belt_width_mm: float = 1200, nominal_speed_mps: float = 1.5,
+                 analysis_scale: int = 1, edge_tracking: bool = True,
+                 alignment_backend: str = 'hough', speed_mode: str = 'flow',
+                 belt_orientation: str = 'horizontal'):
         self.belt_width_mm = belt_width_mm
         self.nominal_speed = nominal_speed_mps
 
+        # Frames are analyzed at 1/analysis_scale of the camera resolution;
+        # edges, deviations and pixels_per_meter are reported at full resolution
+        self.analysis_scale = analysis_scale
+
         # Thresholds
         self.alignment_warning = 5.0
         self.alignment_critical = 10.0
@@ -42,58 +63,158 @@ class BeltMonitor:
         self.speed_history = deque(maxlen=30)
         self.pixels_per_meter = None
         self.belt_edges_detected = False
+        self.last_alignment: Optional[Dict] = None
+
+        # Belt band shared with the camera's other analyzers; None analyzes full frames
+        self.roi: Optional[BeltROITracker] = None
+
+        # Follow known edges with gradient profiles, re-acquiring with Hough when lost
+        self.edge_tracking = edge_tracking
+        self.edge_tracker = BeltEdgeTracker()
+
+        # Edge acquisition: 'hough' (Canny + HoughLinesP) or 'projection' (gradient profiles)
+        self.alignment_backend = alignment_backend
+        # Confidence of the projection profile or edge track behind the last edges
+        self.edge_confidence: Optional[float] = None
+
+        # Speed: 'flow' (dense Farneback), 'phase' (phase correlation of a thin belt strip)
+        # or 'features' (sparse Lucas-Kanade tracking)
+        self.set_speed_mode(speed_mode, belt_orientation)
 
         logger.info(f"BeltMonitor initialized")
 
-    def detect_belt_edges(self, image: np.ndarray) -> Tuple[Optional[int], Optional[int]]:
-        """Detect left and right edges of the belt"""
+    def detect_belt_edges(self, image: FrameLike) -> Tuple[Optional[int], Optional[int]]:
+        """Detect left and right edges of the belt (full-resolution x coordinates)"""
         try:
-            height, width = image.shape[:2]
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-            edges = cv2.Canny(blurred, 50, 150)
-
-            lines = cv2.HoughLinesP(
-                edges, rho=1, theta=np.pi / 180, threshold=100,
-                minLineLength=height // 3, maxLineGap=50
-            )
-
-            if lines is None:
+            scale = self.analysis_scale
+            ctx = FrameContext.wrap(image)
+
+            edges = None
+            if self.edge_tracking:
+                tracked = self.edge_tracker.track(ctx)
+                if tracked is not None:
+                    edges = tracked[0].center_x, tracked[1].center_x
+                    self.edge_confidence = self.edge_tracker.confidence
+                    ctx.timer.fast_path('edge_tracking')
+
+            if edges is None:
+                lines = self._acquire_edges(ctx)
+                if lines is not None:
+                    left_line, right_line = lines
+                    edges = (left_line[0] + left_line[2]) / 2, (right_line[0] + right_line[2]) / 2
+                    if self.edge_tracking:
+                        self.edge_tracker.acquire(EdgeLine.from_points(left_line, ctx.height),
+                                                  EdgeLine.from_points(right_line, ctx.height), ctx.shape)
+
+            if edges is None:
+                if self.roi is not None:
+                    self.roi.miss()
                 return None, None
 
-            left_candidates = []
-            right_candidates = []
-            center_x = width // 2
-
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                if x2 - x1 != 0:
-                    slope = (y2 - y1) / (x2 - x1)
-                    if abs(slope) > 2:
-                        line_x = (x1 + x2) / 2
-                        if line_x < center_x - 50:
-                            left_candidates.append(line_x)
-                        elif line_x > center_x + 50:
-                            right_candidates.append(line_x)
-
-            left_edge = int(np.mean(left_candidates)) if left_candidates else None
-            right_edge = int(np.mean(right_candidates)) if right_candidates else None
-
-            if left_edge and right_edge:
-                self.belt_edges_detected = True
-                belt_width_pixels = right_edge - left_edge
-                self.pixels_per_meter = belt_width_pixels / (self.belt_width_mm / 1000)
+            left, right = edges
+            if self.roi is not None:
+                self.roi.confirm(left, right, ctx.width)
 
+            left_edge = int(left * scale)
+            right_edge = int(right * scale)
+            self.belt_edges_detected = True
+            belt_width_pixels = right_edge - left_edge
+            self.pixels_per_meter = belt_width_pixels / (self.belt_width_mm / 1000)
             return left_edge, right_edge
 
         except Exception as e:
             logger.error(f"Edge detection error: {e}")
             return None, None
 
-    def analyze_alignment(self, image: np.ndarray) -> Dict:
-        height, width = image.shape[:2]
+    def _acquire_edges(self, ctx: FrameContext) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Full search for both edges, within the belt band first if one is known"""
+        belt = self.roi.edges(ctx.width) if self.roi is not None else None
+        if self.alignment_backend == 'projection':
+            ctx.timer.fast_path('projection')
+            return self._find_edges_by_projection(ctx, belt)
+
+        lines = self._find_edges_in_band(ctx, belt) if belt is not None else None
+        if lines is not None:
+            ctx.timer.fast_path('roi_band')
+        else:
+            # No band yet, or the belt left it: search the whole frame
+            lines = self._find_edges(ctx)
+        return lines
+
+    def _find_edges_by_projection(self, ctx: FrameContext,
+                                  belt: Optional[Tuple[float, float]]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        search_px = max(3, 12 // self.analysis_scale)
+        found = None
+        if belt is not None:
+            # The belt fills most of its band, so the edges are far apart
+            x0, x1 = self.roi.band(ctx.width, belt)
+            found = find_edges_by_projection(ctx.region(x0, x1), min_belt_ratio=0.5,
+                                             search_px=search_px, x_offset=x0)
+        if found is None:
+            found = find_edges_by_projection(ctx, search_px=search_px)
+        if found is None:
+            return None
+        self.edge_confidence = found.confidence
+        return found.left.points(), found.right.points()
+
+    def _hough_lines(self, ctx: FrameContext) -> Optional[np.ndarray]:
+        # Pixel-based parameters are defined at full resolution
+        scale = self.analysis_scale
+        edges = ctx.canny(50, 150)
+        with ctx.timer.stage('hough'):
+            return cv2.HoughLinesP(
+                edges, rho=1, theta=np.pi / 180, threshold=max(20, 100 // scale),
+                minLineLength=ctx.height // 3, maxLineGap=max(1, 50 // scale)
+            )
+
+    def _find_edges(self, ctx: FrameContext) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Full-frame edge search; returns the averaged left and right line segments"""
+        lines = self._hough_lines(ctx)
+        if lines is None:
+            return None
+
+        left_candidates = []
+        right_candidates = []
+        center_x = ctx.width // 2
+        margin = 50 / self.analysis_scale
+
+        for line in lines:
+            x1, y1, x2, y2 = line[0]
+            if x2 - x1 != 0:
+                slope = (y2 - y1) / (x2 - x1)
+                if abs(slope) > 2:
+                    line_x = (x1 + x2) / 2
+                    if line_x < center_x - margin:
+                        left_candidates.append(line[0])
+                    elif line_x > center_x + margin:
+                        right_candidates.append(line[0])
+
+        if not left_candidates or not right_candidates:
+            return None
+        return np.mean(left_candidates, axis=0), np.mean(right_candidates, axis=0)
+
+    def _find_edges_in_band(self, ctx: FrameContext, belt: Tuple[float, float]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Edge search confined to the belt band around the last confirmed edges"""
+        x0, x1 = self.roi.band(ctx.width, belt)
+        lines = self._hough_lines(ctx.region(x0, x1))
+        if lines is None:
+            return None
+
+        left_line, right_line = match_edge_lines(
+            lines, (belt[0] - x0, belt[1] - x0), self.roi.margin(*belt)
+        )
+        if left_line is None or right_line is None:
+            return None
+        offset = np.array([x0, 0, x0, 0])
+        return left_line + offset, right_line + offset
+
+    def analyze_alignment(self, image: FrameLike) -> Dict:
+        ctx = FrameContext.wrap(image)
+        width = ctx.width * self.analysis_scale
         center_x = width // 2
-        left_edge, right_edge = self.detect_belt_edges(image)
+        self.edge_confidence = None
+        with ctx.timer.stage('edges'):
+            left_edge, right_edge = self.detect_belt_edges(ctx)
 
         if left_edge is None or right_edge is None:
             return {'detected': False, 'percentage': 0, 'direction': 'unknown', 'severity': 'unknown'}
@@ -116,7 +237,7 @@ class BeltMonitor:
         else:
             severity = 'critical'
 
-        return {
+        result = {
             'detected': True,
             'percentage': round(deviation_percentage, 1),
             'direction': direction,
@@ -125,42 +246,81 @@ class BeltMonitor:
             'right_edge': right_edge,
             'belt_center': belt_center
         }
+        if self.alignment_backend == 'projection' and self.edge_confidence is not None:
+            result['confidence'] = round(self.edge_confidence, 3)
+        return result
 
-    def calculate_speed(self, image: np.ndarray) -> float:
+    def calculate_speed(self, image: FrameLike, timestamp: Optional[float] = None) -> float:
         if self.pixels_per_meter is None:
             return 0.0
 
-        current_time = time.time()
+        current_time = timestamp if timestamp is not None else time.time()
         time_delta = current_time - self.prev_time
-        current_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        ctx = FrameContext.wrap(image)
+        current_gray = ctx.gray()
+
+        # Displacement outside the belt band is structure and floor, not belt motion
+        band = self.roi.band(current_gray.shape[1]) if self.roi is not None else None
+        if band is not None:
+            ctx.timer.fast_path('roi_band')
+        if self.speed_estimator is not None:
+            ctx.timer.fast_path(f"speed_{self.speed_mode}")
+        with ctx.timer.stage('flow'):
+            if self.speed_estimator is not None:
+                shift = self.speed_estimator.displacement(current_gray, band)
+            else:
+                shift = self._flow_displacement(current_gray, band)
+        self.prev_time = current_time
+
+        if shift is None:
+            return 0.0
+
+        # Displacement is measured in analysis pixels; convert to full-resolution pixels
+        shift *= self.analysis_scale
+        if time_delta > 0:
+            pixels_per_sec = shift / time_delta
+            speed_mps = float(abs(pixels_per_sec / self.pixels_per_meter))
+        else:
+            speed_mps = 0
 
+        self.speed_history.append(speed_mps)
+
+        return speed_mps
+
+    def _flow_displacement(self, current_gray: np.ndarray, band: Optional[Tuple[int, int]]) -> Optional[float]:
+        """Mean dense-flow displacement of the moving pixels along the travel axis"""
         if self.prev_gray is None:
             self.prev_gray = current_gray
-            self.prev_time = current_time
-            return 0.0
+            return None
+
+        prev_gray, gray = self.prev_gray, current_gray
+        if band is not None and prev_gray.shape == gray.shape:
+            prev_gray, gray = prev_gray[:, band[0]:band[1]], gray[:, band[0]:band[1]]
 
         flow = cv2.calcOpticalFlowFarneback(
-            self.prev_gray, current_gray, None,
+            prev_gray, gray, None,
             pyr_scale=0.5, levels=3, winsize=15,
             iterations=3, poly_n=5, poly_sigma=1.2,
             flags=0
         )
+        self.prev_gray = current_gray
 
-        h_flow = flow[..., 0]
-        mask = np.abs(h_flow) > 0.5
-        avg_flow = np.mean(h_flow[mask]) if np.sum(mask) > 0 else 0
+        axis_flow = flow[..., 0 if self.belt_orientation == 'horizontal' else 1]
+        mask = np.abs(axis_flow) > 0.5 / self.analysis_scale
+        return float(np.mean(axis_flow[mask])) if np.sum(mask) > 0 else 0.0
 
-        if time_delta > 0:
-            pixels_per_sec = avg_flow / time_delta
-            speed_mps = abs(pixels_per_sec / self.pixels_per_meter)
+    def set_speed_mode(self, speed_mode: str, belt_orientation: str):
+        """Switch the speed estimator; previous frame state is discarded"""
+        self.speed_mode = speed_mode
+        self.belt_orientation = belt_orientation
+        self.prev_gray = None
+        # Dense flow runs here; the other modes keep their own frame state
+        if speed_mode == 'phase':
+            self.speed_estimator = StripDisplacementEstimator(orientation=belt_orientation)
+        elif speed_mode == 'features':
+            self.speed_estimator = FeatureDisplacementTracker(orientation=belt_orientation)
         else:
-            speed_mps = 0
-
-        self.prev_gray = current_gray
-        self.prev_time = current_time
-        self.speed_history.append(speed_mps)
-
-        return speed_mps
+            self.speed_estimator = None
 
     def analyze_speed(self, speed_mps: float) -> Dict:
         speed_percentage = (speed_mps / self.nominal_speed) * 100 if self.nominal_speed > 0 else 0
@@ -180,47 +340,90 @@ class BeltMonitor:
             'severity': severity
         }
 
-    def analyze_frame(self, image: np.ndarray) -> BeltStatus:
-        timestamp = time.time()
-        alert = None
-
-        alignment = self.analyze_alignment(image)
-        speed_mps = self.calculate_speed(image)
-        speed = self.analyze_speed(speed_mps)
+    def analyze_frame(self, image: FrameLike, timestamp: Optional[float] = None,
+                      gate: str = 'full', late: bool = False) -> BeltStatus:
+        """
+        Analyze one frame (BGR or grayscale)
+
+        Args:
+            image: Frame to analyze, or a FrameContext shared with other analyzers
+            timestamp: Capture time in seconds; arrival time is used when omitted
+            gate: Change-gate action: 'cached' treats the frame as unchanged since the
+                last analyzed one (alignment kept, belt not moving), 'reuse_alignment'
+                only measures speed. Without a previous alignment the frame is analyzed fully
+            late: The frame was captured before the last analyzed one; its alignment is
+                analyzed but speed keeps the previous measurement
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if self.last_alignment is None or late:
+            gate = 'full'
+
+        ctx = FrameContext.wrap(image)
+        if late:
+            # Speed state already holds a newer frame; measuring against it would run time backwards
+            alignment = self.analyze_alignment(ctx)
+            self.last_alignment = alignment
+            speed_mps = self.speed_history[-1] if self.speed_history else 0.0
+        elif gate == 'cached':
+            # Nothing moved: the last analyzed frame and its time stay the speed reference,
+            # so the next measured shift is divided by the time it actually covers
+            self.speed_history.append(0.0)
+            alignment = self.last_alignment
+            speed_mps = 0.0
+        else:
+            if gate == 'reuse_alignment':
+                alignment = self.last_alignment
+            else:
+                alignment = self.analyze_alignment(ctx)
+                self.last_alignment = alignment
+            speed_mps = self.calculate_speed(ctx, timestamp)
+
+        with ctx.timer.stage('classify'):
+            speed = self.analyze_speed(speed_mps)
+            return BeltStatus(
+                alignment_percentage=alignment.get('percentage', 0),
+                alignment_direction=alignment.get('direction', 'unknown'),
+                alignment_severity=alignment.get('severity', 'unknown'),
+                speed_mps=speed['speed_mps'],
+                speed_percentage=speed['percentage'],
+                is_moving=speed['is_moving'],
+                speed_severity=speed['severity'],
+                timestamp=timestamp,
+                alert=self._alert(alignment, speed),
+                left_edge=alignment.get('left_edge'),
+                right_edge=alignment.get('right_edge'),
+                belt_center=alignment.get('belt_center'),
+                alignment_confidence=alignment.get('confidence'),
+                gate=gate,
+                late=late
+            )
 
+    def _alert(self, alignment: Dict, speed: Dict) -> Optional[str]:
         if alignment.get('severity') == 'critical':
-            alert = f"CRITICAL: Belt misaligned {alignment['percentage']}% to the {alignment['direction']}"
-        elif alignment.get('severity') == 'warning':
-            alert = f"WARNING: Belt drifting {alignment['direction']} ({alignment['percentage']}% deviation)"
-        elif speed['severity'] == 'critical':
-            alert = f"CRITICAL: Belt speed {speed['percentage']}% of nominal"
-        elif speed['severity'] == 'warning' and speed['is_moving']:
-            alert = f"WARNING: Speed variation ({speed['percentage']}% of nominal)"
-        elif not speed['is_moving'] and self.belt_edges_detected:
-            alert = "ALERT: Belt stopped"
-
-        return BeltStatus(
-            alignment_percentage=alignment.get('percentage', 0),
-            alignment_direction=alignment.get('direction', 'unknown'),
-            alignment_severity=alignment.get('severity', 'unknown'),
-            speed_mps=speed['speed_mps'],
-            speed_percentage=speed['percentage'],
-            is_moving=speed['is_moving'],
-            speed_severity=speed['severity'],
-            timestamp=timestamp,
-            alert=alert
-        )
-
-    def visualize(self, image: np.ndarray, status: BeltStatus) -> np.ndarray:
-        result = image.copy()
-        height, width = image.shape[:2]
+            return f"CRITICAL: Belt misaligned {alignment['percentage']}% to the {alignment['direction']}"
+        if alignment.get('severity') == 'warning':
+            return f"WARNING: Belt drifting {alignment['direction']} ({alignment['percentage']}% deviation)"
+        if speed['severity'] == 'critical':
+            return f"CRITICAL: Belt speed {speed['percentage']}% of nominal"
+        if speed['severity'] == 'warning' and speed['is_moving']:
+            return f"WARNING: Speed variation ({speed['percentage']}% of nominal)"
+        if not speed['is_moving'] and self.belt_edges_detected:
+            return "ALERT: Belt stopped"
+        return None
+
+    def visualize(self, image: FrameLike, status: BeltStatus) -> np.ndarray:
+        """Draw the status on a full-resolution frame"""
+        ctx = FrameContext.wrap(image)
+        result = ctx.color().copy()
+        height, width = ctx.height, ctx.width
         center_x = width // 2
 
         # Draw center line
         cv2.line(result, (center_x, 0), (center_x, height), (255, 255, 255), 2)
 
-        # Draw belt edges if detected
-        left_edge, right_edge = self.detect_belt_edges(image)
+        # Draw belt edges found during analysis
+        left_edge, right_edge = status.left_edge, status.right_edge
         if left_edge and right_edge:
             cv2.line(result, (left_edge, 0), (left_edge, height), (0, 255, 0), 2)
             cv2.line(result, (right_edge, 0), (right_edge, height), (0, 255, 0), 2)
@@ -255,7 +458,20 @@ class BeltMonitor:
 
         return result
 
+    def memory_bytes(self) -> int:
+        """Approximate size of the per-camera frame state"""
+        size = self.prev_gray.nbytes if self.prev_gray is not None else 0
+        if self.speed_estimator is not None:
+            size += self.speed_estimator.memory_bytes()
+        return size + len(self.speed_history) * 8
+
     def reset(self):
         self.prev_gray = None
         self.speed_history.clear()
+        self.last_alignment = None
+        if self.speed_estimator is not None:
+            self.speed_estimator.reset()
+        self.edge_tracker.clear()
+        if self.roi is not None:
+            self.roi.clear()
         logger.info("BeltMonitor reset")
\ No newline at end of file
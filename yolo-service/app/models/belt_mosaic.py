@@ -0,0 +1,187 @@
+"""
+Rolling image of the belt surface in belt coordinates.
+
+A camera over a slow belt sees the same stretch of rubber in dozens of
+consecutive frames. BeltMosaic measures how far the belt moved since the
+previous frame (phase correlation of a belt strip, as the 'phase' speed
+mode does) and appends only the newly revealed rows to an image whose rows
+run along the belt: row r is r pixels of travel after the first row. Once
+enough new rows have accumulated they are handed out for inspection as a
+MosaicWindow, together with the last rows of the previous window so that
+defects crossing the boundary are seen whole. Inspection cost then follows
+belt travel instead of frame rate.
+
+With known belt edges only the belt's columns go into the mosaic, without
+the edge lines or the floor beside the belt. With vertical travel every
+strip is cut to the same width around the current belt centre, which
+follows lateral drift. With horizontal travel the frame is cut to the
+band the belt filled when the mosaic started, and new belt enters at the
+band's edge. Frames further apart than a frame length of
+travel leave a gap; the rows in between were never seen and the mosaic
+restarts after them.
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.models.strip_speed import BELT_ORIENTATIONS, StripDisplacementEstimator
+
+
+@dataclass
+class MosaicWindow:
+    """Belt rows to inspect"""
+    image: np.ndarray  # Rows along the belt, oldest first
+    start_px: int  # Belt position of the first row
+    new_from: int  # Row from which a defect's trailing end has not been reported yet
+
+
+class BeltMosaic:
+    """Newly revealed belt surface of each frame, stitched along the belt"""
+
+    def __init__(self, orientation: str = 'horizontal', window_px: int = 256, overlap_px: int = 128,
+                 max_length_px: int = 4096, min_shift_px: float = 0.5):
+        """
+        Initialize belt mosaic
+
+        Args:
+            orientation: Belt travel direction in the image, 'horizontal' or 'vertical'
+            window_px: New rows collected before they are handed out for inspection
+            overlap_px: Rows of the previous window repeated in the next; defects
+                longer than this along the belt are cut at window boundaries
+            max_length_px: Rows of belt kept in the rolling image
+            min_shift_px: Travel below which the belt counts as standing while
+                its direction is not known yet
+        """
+        if orientation not in BELT_ORIENTATIONS:
+            raise ValueError(f"orientation must be one of {BELT_ORIENTATIONS}")
+        self.orientation = orientation
+        self.window_px = window_px
+        self.overlap_px = overlap_px
+        self.max_length_px = max(max_length_px, window_px + overlap_px)
+        self.min_shift_px = min_shift_px
+
+        self.estimator = StripDisplacementEstimator(orientation=orientation)
+        self.gaps = 0
+        self.reset()
+
+    def reset(self):
+        self.estimator.reset()
+        self.direction = 0  # +1 or -1 along the image axis once the belt has moved
+        self.position_px = 0.0  # Belt travel up to the frame's leading row
+        self.length_px = 0  # Belt rows appended so far
+        self.inspected_px = 0  # Rows handed out for inspection
+        self.reported_px = 0  # Defects ending before this row were reported
+        self.width: Optional[int] = None  # Columns cut from each frame, fixed when the mosaic starts
+        self.center: Optional[float] = None  # Column the cut is centred on
+        self.frame_shape: Optional[Tuple[int, int]] = None
+        # Rows are written into a preallocated buffer; the first _held hold belt
+        # rows [length_px - _held, length_px)
+        self._buffer: Optional[np.ndarray] = None
+        self._held = 0
+
+    def memory_bytes(self) -> int:
+        return (self._buffer.nbytes if self._buffer is not None else 0) + self.estimator.memory_bytes()
+
+    @property
+    def start_px(self) -> int:
+        """Belt position of the oldest row still held"""
+        return self.length_px - self._held
+
+    def image(self) -> Optional[np.ndarray]:
+        """The rolling belt image, rows along the belt and oldest first"""
+        return self._buffer[:self._held] if self._buffer is not None else None
+
+    def advance(self, gray: np.ndarray, span: Optional[Tuple[float, float]] = None) -> Optional[MosaicWindow]:
+        """
+        Add the belt revealed by a frame
+
+        Args:
+            gray: Grayscale analysis image
+            span: Column range of the belt surface, if known
+
+        Returns:
+            Rows to inspect once window_px new rows have accumulated, else None
+        """
+        if gray.shape != self.frame_shape:
+            self.reset()
+            self.frame_shape = gray.shape
+
+        band = (int(span[0]), int(np.ceil(span[1]))) if span is not None else None
+        if self.orientation == 'vertical' and span is not None:
+            self.center = (span[0] + span[1]) / 2
+
+        shift = self.estimator.displacement(gray, band)
+        if shift is None:
+            return None
+
+        if self.direction == 0:
+            if abs(shift) < self.min_shift_px:
+                return None
+            # The first frame of a moving belt starts the mosaic whole
+            self.direction = 1 if shift > 0 else -1
+            if span is not None:
+                self.width = max(1, int(span[1] - span[0]))
+                self.center = (span[0] + span[1]) / 2
+            rows = self._oriented(gray)
+            self._append(rows)
+            self.position_px = float(len(rows))
+            return self._window()
+
+        self.position_px += shift * self.direction
+        new = int(self.position_px) - self.length_px
+        if new <= 0:
+            # Standing or running backwards over belt already seen
+            return None
+
+        rows = self._oriented(gray)
+        if new > len(rows):
+            self.gaps += 1
+            self._held = 0
+            self.length_px = self.inspected_px = self.reported_px = int(self.position_px) - len(rows)
+            new = len(rows)
+        self._append(rows[len(rows) - new:])
+        return self._window()
+
+    def _oriented(self, gray: np.ndarray) -> np.ndarray:
+        """The frame as belt rows, oldest first"""
+        along = gray
+        if self.width is not None:
+            x0 = int(np.clip(round(self.center - self.width / 2), 0, max(gray.shape[1] - self.width, 0)))
+            along = gray[:, x0:x0 + self.width]
+        if self.orientation == 'horizontal':
+            along = along.T
+        # New belt enters on the side the surface moves away from
+        return along[::-1] if self.direction > 0 else along
+
+    def _append(self, rows: np.ndarray):
+        if self._buffer is None or self._buffer.shape[1:] != rows.shape[1:]:
+            self._buffer = np.empty((2 * self.max_length_px,) + rows.shape[1:], dtype=rows.dtype)
+            self._held = 0
+
+        if self._held + len(rows) > len(self._buffer):
+            # Full: move the rows still wanted to the front, at most once per max_length_px
+            # rows appended. Rows the next window overlaps are kept past max_length_px
+            keep_from = min(self.length_px - self.max_length_px, self.inspected_px - self.overlap_px)
+            drop = int(np.clip(keep_from - self.start_px, 0, self._held))
+            self._buffer[:self._held - drop] = self._buffer[drop:self._held]
+            self._held -= drop
+            if self._held + len(rows) > len(self._buffer):
+                grown = np.empty((self._held + len(rows),) + rows.shape[1:], dtype=rows.dtype)
+                grown[:self._held] = self._buffer[:self._held]
+                self._buffer = grown
+
+        self._buffer[self._held:self._held + len(rows)] = rows
+        self._held += len(rows)
+        self.length_px += len(rows)
+
+    def _window(self) -> Optional[MosaicWindow]:
+        if self.length_px - self.inspected_px < self.window_px:
+            return None
+        start = max(self.inspected_px - self.overlap_px, self.start_px)
+        window = MosaicWindow(image=self._buffer[start - self.start_px:self._held], start_px=start,
+                              new_from=max(self.reported_px - start, 0))
+        self.inspected_px = self.length_px
+        # Defects touching the newest row may continue; they are reported with the next window
+        self.reported_px = self.length_px - 1
+        return window
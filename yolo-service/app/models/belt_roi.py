@@ -0,0 +1,178 @@
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def match_edge_lines(lines: np.ndarray, expected: Tuple[float, float],
+                     tolerance: float) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Pick the Hough lines continuing the previously confirmed belt edges
+
+    For each expected edge x, the longest near-vertical line whose midpoint lies
+    within tolerance is chosen. Shorter lines from the belt surface texture are
+    ignored instead of averaged in, and a pair whose width differs from the
+    expected width by more than tolerance is rejected, so the band cannot
+    creep inwards.
+
+    Returns:
+        Tuple of (left_line, right_line) as x1, y1, x2, y2 arrays
+    """
+    best = [None, None]
+    best_length = [0.0, 0.0]
+
+    for line in lines:
+        x1, y1, x2, y2 = line[0]
+        # Same near-vertical test as the full-frame search
+        if x2 - x1 == 0 or abs((y2 - y1) / (x2 - x1)) <= 2:
+            continue
+
+        line_x = (x1 + x2) / 2
+        length = float(np.hypot(x2 - x1, y2 - y1))
+        for side, edge_x in enumerate(expected):
+            if abs(line_x - edge_x) <= tolerance and length > best_length[side]:
+                best[side], best_length[side] = line[0], length
+
+    left, right = best
+    if left is None or right is None:
+        return None, None
+
+    width = (right[0] + right[2]) / 2 - (left[0] + left[2]) / 2
+    if abs(width - (expected[1] - expected[0])) > tolerance:
+        return None, None
+    return left, right
+
+
+class BeltROITracker:
+    """
+    Tracks the band of image columns covered by the belt.
+
+    Edge detectors confirm the belt's left/right edges (analysis-image
+    coordinates); other analyzers crop their work to the band around them.
+    The band is dropped after too many frames without confirmed edges so
+    analysis falls back to the full frame.
+
+    Analyzers sharing a tracker each hold a BeltROIView. While the tracker
+    is held, updates made through views are queued and applied afterwards
+    in a fixed order of their sources, so analyzers running concurrently on
+    one frame all see the band as it was when the frame started.
+    """
+
+    def __init__(self, margin_ratio: float = 0.1, min_margin_px: int = 8,
+                 min_belt_width_px: int = 16, max_misses: int = 10):
+        """
+        Initialize belt ROI tracker
+
+        Args:
+            margin_ratio: Margin added on each side, as a fraction of the belt width
+            min_margin_px: Smallest margin in pixels
+            min_belt_width_px: Edge pairs closer than this are not accepted
+            max_misses: Frames without confirmed edges before the band is dropped
+        """
+        self.margin_ratio = margin_ratio
+        self.min_margin_px = min_margin_px
+        self.min_belt_width_px = min_belt_width_px
+        self.max_misses = max_misses
+
+        # (left, right, frame_width) is replaced as a whole so readers on
+        # other threads never see a half-updated band
+        self._edges: Optional[Tuple[float, float, int]] = None
+        self.misses = 0
+        # Updates queued per source while held
+        self._pending: Optional[Dict[str, List[Tuple[str, tuple]]]] = None
+
+    def confirm(self, left: float, right: float, frame_width: int):
+        """Record edges found on the current frame"""
+        if right - left < self.min_belt_width_px:
+            return
+        self._edges = (left, right, frame_width)
+        self.misses = 0
+
+    def miss(self):
+        """Record a frame on which no edges were found"""
+        self.misses += 1
+        if self.misses > self.max_misses and self._edges is not None:
+            self._edges = None
+            logger.info("Belt ROI lost, falling back to full frame")
+
+    def clear(self):
+        self._edges = None
+        self.misses = 0
+
+    def view(self, source: str) -> 'BeltROIView':
+        """Handle for one analyzer, whose updates are queued under source while held"""
+        return BeltROIView(self, source)
+
+    @contextmanager
+    def held(self, order: Iterable[str]):
+        """Queue updates made through views until the block ends, then apply them by source in this order"""
+        self._pending = {}
+        try:
+            yield
+        finally:
+            pending, self._pending = self._pending, None
+            for source in order:
+                for method, args in pending.get(source, ()):
+                    getattr(self, method)(*args)
+
+    def _update(self, source: str, method: str, *args):
+        pending = self._pending
+        if pending is None:
+            getattr(self, method)(*args)
+        else:
+            pending.setdefault(source, []).append((method, args))
+
+    def edges(self, frame_width: int) -> Optional[Tuple[float, float]]:
+        """Last confirmed edges, if they belong to a frame of this width"""
+        edges = self._edges
+        if edges is None or edges[2] != frame_width:
+            return None
+        return edges[0], edges[1]
+
+    def margin(self, left: float, right: float) -> int:
+        """Band margin on each side, also the distance an edge may move between frames"""
+        return max(self.min_margin_px, int((right - left) * self.margin_ratio))
+
+    def band(self, frame_width: int,
+             edges: Optional[Tuple[float, float]] = None) -> Optional[Tuple[int, int]]:
+        """Column range [x0, x1) covering the belt plus margin (around edges if given)"""
+        if edges is None:
+            edges = self.edges(frame_width)
+        if edges is None:
+            return None
+
+        left, right = edges
+        margin = self.margin(left, right)
+        x0 = max(0, int(left) - margin)
+        x1 = min(frame_width, int(right) + margin + 1)
+        return x0, x1
+
+
+class BeltROIView:
+    """An analyzer's handle on a shared BeltROITracker"""
+
+    def __init__(self, tracker: BeltROITracker, source: str):
+        self.tracker = tracker
+        self.source = source
+
+    def confirm(self, left: float, right: float, frame_width: int):
+        self.tracker._update(self.source, 'confirm', left, right, frame_width)
+
+    def miss(self):
+        self.tracker._update(self.source, 'miss')
+
+    def clear(self):
+        self.tracker.clear()
+
+    def edges(self, frame_width: int) -> Optional[Tuple[float, float]]:
+        return self.tracker.edges(frame_width)
+
+    def margin(self, left: float, right: float) -> int:
+        return self.tracker.margin(left, right)
+
+    def band(self, frame_width: int,
+             edges: Optional[Tuple[float, float]] = None) -> Optional[Tuple[int, int]]:
+        return self.tracker.band(frame_width, edges)
@@ -6,6 +6,11 @@ from dataclasses import dataclass
 from collections import deque
 import time
 
+from app.models.belt_roi import BeltROITracker
+from app.models.feature_speed import FeatureDisplacementTracker
+from app.models.frame_context import FrameContext, FrameLike
+from app.models.strip_speed import StripDisplacementEstimator
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +34,11 @@ class BeltSpeedMonitor:
 
     def __init__(self, nominal_speed_mps: float = 1.5,
                  roller_diameter_mm: float = 200,
-                 frames_to_average: int = 30):
+                 frames_to_average: int = 30,
+                 speed_mode: str = 'flow',
+                 belt_orientation: str = 'horizontal',
+                 pixels_per_meter: float = 1000,
+                 assumed_fps: float = 30):
         """
         Initialize belt speed monitor
 
@@ -37,6 +46,11 @@ class BeltSpeedMonitor:
             nominal_speed_mps: Design belt speed in meters/second
             roller_diameter_mm: Diameter of drive roller in mm
             frames_to_average: Number of frames to average for speed calculation
+            speed_mode: 'flow' (dense optical flow), 'phase' (phase correlation of a
+                belt strip) or 'features' (sparse Lucas-Kanade feature tracking)
+            belt_orientation: Belt travel direction in the image, 'horizontal' or 'vertical'
+            pixels_per_meter: Belt surface scale of the analyzed image
+            assumed_fps: Frame rate used when frames carry no usable timestamps
         """
         self.nominal_speed = nominal_speed_mps
         self.roller_diameter = roller_diameter_mm / 1000  # Convert to meters
@@ -67,11 +81,26 @@ class BeltSpeedMonitor:
         self.calibration_factor = None
         self.roller_features = None
 
-    def calibrate(self, reference_image: np.ndarray, known_speed_mps: float):
+        # Belt band shared with the camera's other analyzers; None analyzes full frames
+        self.roi: Optional[BeltROITracker] = None
+
+        self.speed_mode = speed_mode
+        self.belt_orientation = belt_orientation
+        self.strip_estimator = StripDisplacementEstimator(orientation=belt_orientation)
+        self.feature_tracker = FeatureDisplacementTracker(
+            orientation=belt_orientation, feature_params=self.feature_params, lk_params=self.lk_params
+        )
+
+        # Calibration and frame timing
+        self.pixels_per_meter = pixels_per_meter
+        self.assumed_fps = assumed_fps
+        self.prev_timestamp: Optional[float] = None
+
+    def calibrate(self, reference_image: FrameLike, known_speed_mps: float):
         """
         Calibrate speed measurement using known speed
         """
-        gray = cv2.cvtColor(reference_image, cv2.COLOR_BGR2GRAY)
+        gray = FrameContext.wrap(reference_image).gray()
 
         # Detect roller or belt features
         features = cv2.goodFeaturesToTrack(gray, mask=None, **self.feature_params)
@@ -81,26 +110,44 @@ class BeltSpeedMonitor:
             self.calibration_factor = known_speed_mps  # Store for reference
             logger.info(f"Speed monitor calibrated with {len(features)} features")
 
-    def calculate_speed_optical_flow(self, current_frame: np.ndarray) -> Optional[float]:
+    def _frame_interval(self, timestamp: Optional[float]) -> float:
+        """Seconds since the previous frame, from frame timestamps when available"""
+        time_delta = 1 / self.assumed_fps
+        if timestamp is not None:
+            if self.prev_timestamp is not None and timestamp > self.prev_timestamp:
+                time_delta = timestamp - self.prev_timestamp
+            self.prev_timestamp = timestamp
+        return time_delta
+
+    def calculate_speed_optical_flow(self, current_frame: FrameLike,
+                                     timestamp: Optional[float] = None) -> Optional[float]:
         """
         Calculate belt speed using optical flow
         """
+        time_delta = self._frame_interval(timestamp)
+        ctx = FrameContext.wrap(current_frame)
+        current_gray = ctx.gray()
         if self.prev_gray is None:
-            self.prev_gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
+            self.prev_gray = current_gray
             return None
 
-        current_gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
+        # Flow outside the belt band is structure and floor, not belt motion
+        prev_gray, gray = self.prev_gray, current_gray
+        band = self.roi.band(gray.shape[1]) if self.roi is not None else None
+        if band is not None and prev_gray.shape == gray.shape:
+            prev_gray, gray = prev_gray[:, band[0]:band[1]], gray[:, band[0]:band[1]]
 
         # Calculate optical flow
-        flow = cv2.calcOpticalFlowFarneback(
-            self.prev_gray, current_gray, None,
-            pyr_scale=0.5, levels=3, winsize=15,
-            iterations=3, poly_n=5, poly_sigma=1.2,
-            flags=0
-        )
+        with ctx.timer.stage('flow'):
+            flow = cv2.calcOpticalFlowFarneback(
+                prev_gray, gray, None,
+                pyr_scale=0.5, levels=3, winsize=15,
+                iterations=3, poly_n=5, poly_sigma=1.2,
+                flags=0
+            )
 
-        # Calculate average horizontal movement (assuming belt moves horizontally)
-        h_flow = flow[..., 0]
+        # Calculate average movement along the belt's travel axis
+        h_flow = flow[..., 0 if self.belt_orientation == 'horizontal' else 1]
 
         # Filter out noise
         mask = np.abs(h_flow) > 0.5
@@ -112,76 +159,52 @@ class BeltSpeedMonitor:
         self.prev_gray = current_gray
 
         # Convert pixel displacement to real speed
-        # This requires calibration - simplified version
-        pixels_per_meter = 1000  # This should be calibrated
-        time_delta = 1 / 30  # Assuming 30fps, should be actual timestamp difference
-
         speed_pixels_per_sec = avg_h_flow / time_delta
-        speed_mps = speed_pixels_per_sec / pixels_per_meter
+        speed_mps = speed_pixels_per_sec / self.pixels_per_meter
 
         return speed_mps
 
-    def calculate_speed_feature_tracking(self, current_frame: np.ndarray) -> Optional[float]:
+    def calculate_speed_phase_correlation(self, current_frame: FrameLike,
+                                          timestamp: Optional[float] = None) -> Optional[float]:
         """
-        Calculate belt speed by tracking features
+        Calculate belt speed from phase correlation of a thin belt strip
         """
-        if self.prev_gray is None or self.roller_features is None:
-            self.prev_gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
-
-            # Detect new features
-            features = cv2.goodFeaturesToTrack(
-                self.prev_gray, mask=None, **self.feature_params
-            )
-            if features is not None:
-                self.roller_features = features.reshape(-1, 2)
+        time_delta = self._frame_interval(timestamp)
+        ctx = FrameContext.wrap(current_frame)
+        gray = ctx.gray()
+        band = self.roi.band(gray.shape[1]) if self.roi is not None else None
+        with ctx.timer.stage('flow'):
+            shift = self.strip_estimator.displacement(gray, band)
+        if shift is None:
             return None
 
-        current_gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
-
-        # Track features
-        next_features, status, error = cv2.calcOpticalFlowPyrLK(
-            self.prev_gray, current_gray,
-            self.roller_features.reshape(-1, 1, 2),
-            None, **self.lk_params
-        )
-
-        # Select good points
-        good_old = self.roller_features[status == 1]
-        good_new = next_features[status == 1]
-
-        if len(good_old) > 0:
-            # Calculate average displacement
-            displacement = good_new - good_old
-            avg_displacement = np.mean(displacement, axis=0)
+        return shift / time_delta / self.pixels_per_meter
 
-            # Speed calculation (requires calibration)
-            # This is a simplified version
-            pixels_per_meter = 1000  # Should be calibrated
-            time_delta = 1 / 30  # Should be actual timestamp difference
-
-            speed_x_mps = avg_displacement[0] / (pixels_per_meter * time_delta)
-
-            # Update features for next frame
-            self.roller_features = good_new
-
-            return abs(speed_x_mps)
-
-        # If tracking lost, detect new features
-        features = cv2.goodFeaturesToTrack(
-            current_gray, mask=None, **self.feature_params
-        )
-        if features is not None:
-            self.roller_features = features.reshape(-1, 2)
+    def calculate_speed_feature_tracking(self, current_frame: FrameLike,
+                                         timestamp: Optional[float] = None) -> Optional[float]:
+        """
+        Calculate belt speed by tracking features
+        """
+        time_delta = self._frame_interval(timestamp)
+        ctx = FrameContext.wrap(current_frame)
+        gray = ctx.gray()
+        band = self.roi.band(gray.shape[1]) if self.roi is not None else None
+
+        # Pool refill, the cropped LK window and outlier rejection live in the tracker
+        with ctx.timer.stage('flow'):
+            shift = self.feature_tracker.displacement(gray, band)
+        if shift is None:
+            return None
 
-        return None
+        return shift / time_delta / self.pixels_per_meter
 
-    def calculate_speed_roller_detection(self, image: np.ndarray) -> Optional[float]:
+    def calculate_speed_roller_detection(self, image: FrameLike) -> Optional[float]:
         """
         Calculate speed by detecting roller rotation
         """
         # This would detect circular features (rollers) and track rotation
         # Simplified implementation
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = FrameContext.wrap(image).gray()
 
         # Detect circles (rollers)
         circles = cv2.HoughCircles(
@@ -196,13 +219,24 @@ class BeltSpeedMonitor:
 
         return None
 
-    def analyze_speed(self, image: np.ndarray, timestamp: float) -> BeltSpeedStatus:
+    def analyze_speed(self, image: FrameLike, timestamp: float, stationary: bool = False) -> BeltSpeedStatus:
         """
         Main method to analyze belt speed
+
+        stationary marks a frame the change gate found unchanged: the belt is
+        recorded as stopped without measuring
         """
         try:
             # Calculate speed using preferred method
-            speed = self.calculate_speed_optical_flow(image)
+            if stationary:
+                # The last measured frame and its timestamp stay the reference
+                speed = 0.0
+            elif self.speed_mode == 'phase':
+                speed = self.calculate_speed_phase_correlation(image, timestamp)
+            elif self.speed_mode == 'features':
+                speed = self.calculate_speed_feature_tracking(image, timestamp)
+            else:
+                speed = self.calculate_speed_optical_flow(image, timestamp)
 
             if speed is None:
                 # Not enough data yet
@@ -286,12 +320,13 @@ class BeltSpeedMonitor:
                 timestamp=timestamp
             )
 
-    def visualize_speed(self, image: np.ndarray, status: BeltSpeedStatus) -> np.ndarray:
+    def visualize_speed(self, image: FrameLike, status: BeltSpeedStatus) -> np.ndarray:
         """
         Draw speed visualization on image
         """
-        result = image.copy()
-        height, width = image.shape[:2]
+        ctx = FrameContext.wrap(image)
+        result = ctx.color().copy()
+        height, width = ctx.height, ctx.width
 
         # Color based on severity
         if status.severity == "normal":
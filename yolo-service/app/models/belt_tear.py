@@ -1,13 +1,33 @@
 import numpy as np
 import cv2
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 import logging
 from dataclasses import dataclass
-from scipy import ndimage
-import skimage.measure
+
+from app.models.belt_mosaic import BeltMosaic
+from app.models.belt_roi import BeltROITracker
+from app.models.frame_context import FrameContext, FrameLike, get_clahe
 
 logger = logging.getLogger(__name__)
 
+# Preprocessing before the edge search: bilateral filter at full resolution,
+# at half resolution, or CLAHE and filter both at half resolution
+TEAR_PROFILES = ('quality', 'balanced', 'fast')
+
+
+def _at_half_resolution(image: np.ndarray, process: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Run process on a half-resolution copy of image and scale its result back up"""
+    height, width = image.shape[:2]
+    small = cv2.resize(image, (max(width // 2, 1), max(height // 2, 1)), interpolation=cv2.INTER_AREA)
+    # Cubic keeps tear borders about as steep as the full-resolution filter leaves them
+    return cv2.resize(process(small), (width, height), interpolation=cv2.INTER_CUBIC)
+
+
+def _gradient_magnitude(image: np.ndarray) -> np.ndarray:
+    """Sobel gradient magnitude, taken in int16 and float32"""
+    gradient_x, gradient_y = cv2.spatialGradient(image)
+    return cv2.magnitude(gradient_x.astype(np.float32), gradient_y.astype(np.float32))
+
 
 @dataclass
 class BeltTearStatus:
@@ -22,21 +42,33 @@ class BeltTearStatus:
     recommendations: List[str]
     confidence: float
     timestamp: float
+    # With a belt mosaic: belt travel inspected so far, in meters. Tear
+    # locations are then in belt coordinates, x across the inspected belt and
+    # y along it from the start of the mosaic, and carry belt_position_m
+    belt_position_m: Optional[float] = None
 
 
 class BeltTearDetector:
     """Detect tears, rips, and damage on conveyor belt"""
 
-    def __init__(self, belt_width_mm: float = 1200, pixel_to_mm: float = 0.5):
+    def __init__(self, belt_width_mm: float = 1200, pixel_to_mm: float = 0.5, profile: str = 'quality',
+                 mosaic: Optional[BeltMosaic] = None):
         """
         Initialize belt tear detector
 
         Args:
             belt_width_mm: Actual belt width in millimeters
             pixel_to_mm: Conversion factor from pixels to millimeters
+            profile: Preprocessing profile, one of TEAR_PROFILES; 'balanced' and
+                'fast' filter at half resolution
+            mosaic: Inspect only belt newly revealed since the previous frame,
+                stitched along the belt, instead of whole frames
         """
+        if profile not in TEAR_PROFILES:
+            raise ValueError(f"profile must be one of {TEAR_PROFILES}")
         self.belt_width_mm = belt_width_mm
         self.pixel_to_mm = pixel_to_mm
+        self.profile = profile
 
         # Tear thresholds
         self.min_tear_length_mm = 10  # Minimum tear length to report
@@ -52,21 +84,32 @@ class BeltTearDetector:
         self.texture_mean = None
         self.texture_std = None
 
-    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
+        # Belt band shared with the camera's other analyzers; None analyzes full frames
+        self.roi: Optional[BeltROITracker] = None
+        self.edge_mask_px = 5  # Belt edge lines (blurred + dilated) cleared from the tear search
+
+        self.mosaic = mosaic
+
+    def preprocess_image(self, image: FrameLike) -> np.ndarray:
         """
         Preprocess image for tear detection
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        ctx = FrameContext.wrap(image)
 
-        # Enhance contrast using CLAHE
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(gray)
+        if self.profile == 'fast':
+            # Contrast enhancement and filter on a half-resolution frame; the same
+            # tile grid covers the same part of the belt
+            return ctx.memo(('tear_preprocessed', 'fast'), lambda: _at_half_resolution(
+                ctx.gray(), lambda small: cv2.bilateralFilter(get_clahe(2.0, (8, 8)).apply(small), 5, 75, 75)))
 
-        # Apply bilateral filter to preserve edges while reducing noise
-        filtered = cv2.bilateralFilter(enhanced, 9, 75, 75)
+        # Grayscale + CLAHE contrast enhancement, shared with other analyzers
+        enhanced = ctx.clahe(2.0, (8, 8))
 
-        return filtered
+        # Apply bilateral filter to preserve edges while reducing noise
+        if self.profile == 'balanced':
+            return ctx.memo(('tear_preprocessed', 'balanced'), lambda: _at_half_resolution(
+                enhanced, lambda small: cv2.bilateralFilter(small, 5, 75, 75)))
+        return ctx.memo(('tear_preprocessed', 'quality'), lambda: cv2.bilateralFilter(enhanced, 9, 75, 75))
 
     def detect_edges(self, image: np.ndarray) -> np.ndarray:
         """
@@ -81,65 +124,140 @@ class BeltTearDetector:
 
         return dilated
 
+    def mask_outside_belt(self, edge_image: np.ndarray, left: float, right: float) -> np.ndarray:
+        """
+        Clear edges on and beyond the belt edges (x coordinates of edge_image)
+
+        The belt edges themselves are long thin lines that would pass as tears,
+        and anything beside the belt is not belt damage.
+        """
+        x0 = max(0, int(left) + self.edge_mask_px)
+        x1 = max(x0, int(right) - self.edge_mask_px + 1)
+        edge_image[:, :x0] = 0
+        edge_image[:, x1:] = 0
+        return edge_image
+
     def find_tear_candidates(self, edge_image: np.ndarray) -> List[Dict]:
         """
         Find potential tear regions using contour analysis
+
+        Area, bounding box, extent and aspect ratio of all contours are computed
+        at once from their concatenated points; only the survivors of those
+        filters get a convex hull for the solidity test.
         """
         # Find contours
         contours, _ = cv2.findContours(
             edge_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
         )
-
-        tear_candidates = []
-
-        for contour in contours:
-            # Calculate contour properties
-            area = cv2.contourArea(contour)
-
+        if not contours:
+            return []
+
+        lengths = np.fromiter(map(len, contours), dtype=np.int64, count=len(contours))
+        starts = np.zeros(len(contours), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+
+        # Bounding rectangles, as cv2.boundingRect
+        x = np.minimum.reduceat(points[:, 0], starts)
+        y = np.minimum.reduceat(points[:, 1], starts)
+        w = np.maximum.reduceat(points[:, 0], starts) - x + 1
+        h = np.maximum.reduceat(points[:, 1], starts) - y + 1
+
+        # Shoelace areas; integer sums, so identical to cv2.contourArea
+        following = np.roll(points, -1, axis=0)
+        following[starts + lengths - 1] = points[starts]
+        cross = points[:, 0] * following[:, 1] - following[:, 0] * points[:, 1]
+        areas = np.abs(np.add.reduceat(cross, starts)) / 2
+
+        long_side, short_side = np.maximum(w, h), np.minimum(w, h)
+        keep = (
             # Filter very small contours (noise)
-            if area < 50:  # Minimum area in pixels
-                continue
-
-            # Get bounding rectangle
-            x, y, w, h = cv2.boundingRect(contour)
+            (areas >= 50)
+            # Tears are long and thin and fill little of their bounding box
+            & (long_side / short_side > 3)
+            & (areas / (w * h) < 0.6)
+            # Only consider if above minimum size
+            & (long_side * self.pixel_to_mm >= self.min_tear_length_mm)
+            & (short_side * self.pixel_to_mm >= self.min_tear_width_mm)
+        )
 
-            # Calculate aspect ratio (tears are typically elongated)
-            aspect_ratio = max(w, h) / min(w, h) if min(w, h) > 0 else 1
+        tear_candidates = []
 
-            # Calculate extent (how filled the bounding box is)
-            extent = area / (w * h) if w * h > 0 else 0
+        for index in np.flatnonzero(keep).tolist():
+            contour = contours[index]
+            area = float(areas[index])
 
-            # Calculate solidity (how convex/concave)
-            hull = cv2.convexHull(contour)
-            hull_area = cv2.contourArea(hull)
+            # Calculate solidity (how convex/concave); tears have jagged edges
+            hull_area = cv2.contourArea(cv2.convexHull(contour))
             solidity = area / hull_area if hull_area > 0 else 0
+            if solidity >= 0.8:
+                continue
 
-            # Tears typically have:
-            # - High aspect ratio (long and thin)
-            # - Low extent (irregular shape)
-            # - Low solidity (jagged edges)
-            if aspect_ratio > 3 and extent < 0.6 and solidity < 0.8:
-                # This looks like a tear
-
-                # Convert to real-world dimensions
-                length_mm = max(w, h) * self.pixel_to_mm
-                width_mm = min(w, h) * self.pixel_to_mm
-
-                # Only consider if above minimum size
-                if length_mm >= self.min_tear_length_mm and width_mm >= self.min_tear_width_mm:
-                    tear_candidates.append({
-                        'contour': contour,
-                        'bbox': (x, y, w, h),
-                        'area_pixels': area,
-                        'area_mm2': area * (self.pixel_to_mm ** 2),
-                        'length_mm': length_mm,
-                        'width_mm': width_mm,
-                        'aspect_ratio': aspect_ratio,
-                        'center': (x + w // 2, y + h // 2)
-                    })
+            bx, by, bw, bh = int(x[index]), int(y[index]), int(w[index]), int(h[index])
+            tear_candidates.append({
+                'contour': contour,
+                'bbox': (bx, by, bw, bh),
+                'area_pixels': area,
+                'area_mm2': area * (self.pixel_to_mm ** 2),
+                'length_mm': max(bw, bh) * self.pixel_to_mm,
+                'width_mm': min(bw, bh) * self.pixel_to_mm,
+                'aspect_ratio': max(bw, bh) / min(bw, bh),
+                'center': (bx + bw // 2, by + bh // 2)
+            })
 
         return tear_candidates
 
+    def texture_statistics(self, image: np.ndarray,
+                           boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Mean, standard deviation and mean gradient magnitude of each box
+
+        The gradient is taken in int16 with one pixel of real neighbours around
+        each box, and its magnitude in float32. When the boxes overlap enough
+        that their enclosing box has fewer pixels than they have together, the
+        gradient and integral images of intensity, squared intensity and
+        gradient are computed once over it and each box costs a few lookups;
+        otherwise each box is filtered on its own.
+        """
+        height, width = image.shape[:2]
+        x0 = np.clip(boxes[:, 0], 0, width)
+        y0 = np.clip(boxes[:, 1], 0, height)
+        x1 = np.clip(boxes[:, 0] + boxes[:, 2], 0, width)
+        y1 = np.clip(boxes[:, 1] + boxes[:, 3], 0, height)
+        pixels = np.maximum((x1 - x0) * (y1 - y0), 1)
+
+        # Boxes grown by the Sobel kernel's reach
+        px0, py0 = np.maximum(x0 - 1, 0), np.maximum(y0 - 1, 0)
+        px1, py1 = np.minimum(x1 + 1, width), np.minimum(y1 + 1, height)
+        left, top, right, bottom = int(px0.min()), int(py0.min()), int(px1.max()), int(py1.max())
+
+        if (right - left) * (bottom - top) <= int(((px1 - px0) * (py1 - py0)).sum()):
+            area = image[top:bottom, left:right]
+            # int32 sums overflow past 2**31 / 255 pixels
+            sum_depth = cv2.CV_32S if area.size < 2 ** 31 // 255 else cv2.CV_64F
+            sums, squares = cv2.integral2(area, sdepth=sum_depth, sqdepth=cv2.CV_64F)
+            gradients = cv2.integral(_gradient_magnitude(area), sdepth=cv2.CV_64F)
+
+            bx0, bx1, by0, by1 = x0 - left, x1 - left, y0 - top, y1 - top
+
+            def box_sums(integral: np.ndarray) -> np.ndarray:
+                return (integral[by1, bx1] - integral[by0, bx1]
+                        - integral[by1, bx0] + integral[by0, bx0]).astype(np.float64)
+
+            means = box_sums(sums) / pixels
+            stds = np.sqrt(np.maximum(box_sums(squares) / pixels - means ** 2, 0))
+            return means, stds, box_sums(gradients) / pixels
+
+        means, stds, mean_gradients = (np.zeros(len(boxes)) for _ in range(3))
+        for i in range(len(boxes)):
+            if x1[i] <= x0[i] or y1[i] <= y0[i]:
+                continue
+            mean, std = cv2.meanStdDev(image[y0[i]:y1[i], x0[i]:x1[i]])
+            magnitude = _gradient_magnitude(image[py0[i]:py1[i], px0[i]:px1[i]])
+            means[i], stds[i] = mean[0, 0], std[0, 0]
+            mean_gradients[i] = cv2.mean(magnitude[y0[i] - py0[i]:y1[i] - py0[i], x0[i] - px0[i]:x1[i] - px0[i]])[0]
+        return means, stds, mean_gradients
+
     def analyze_texture_anomaly(self, image: np.ndarray, tear_regions: List[Dict]) -> List[Dict]:
         """
         Analyze texture in tear regions to confirm tears
@@ -151,44 +269,45 @@ class BeltTearDetector:
             self.texture_std = np.std(image)
             return tear_regions
 
-        confirmed_tears = []
-
-        for tear in tear_regions:
-            x, y, w, h = tear['bbox']
-
-            # Extract region
-            region = image[y:y + h, x:x + w]
+        if not tear_regions:
+            return []
 
-            if region.size == 0:
-                continue
+        boxes = np.array([tear['bbox'] for tear in tear_regions], dtype=np.int64)
+        sizes = boxes[:, 2] * boxes[:, 3]
 
-            # Calculate texture statistics
-            region_mean = np.mean(region)
-            region_std = np.std(region)
+        # Calculate texture statistics; the gradient magnitude
+        # helps detect tears vs shadows
+        region_mean, region_std, mean_gradient = self.texture_statistics(image, boxes)
 
-            # Calculate local binary pattern (simplified)
-            # This helps detect tears vs shadows
-            gradient_x = cv2.Sobel(region, cv2.CV_64F, 1, 0, ksize=3)
-            gradient_y = cv2.Sobel(region, cv2.CV_64F, 0, 1, ksize=3)
-            gradient_magnitude = np.sqrt(gradient_x ** 2 + gradient_y ** 2)
-            mean_gradient = np.mean(gradient_magnitude)
+        # Tears typically have:
+        # - Different mean intensity from belt
+        # - Higher edge density
+        # - Different texture patterns
 
-            # Tears typically have:
-            # - Different mean intensity from belt
-            # - Higher edge density
-            # - Different texture patterns
+        intensity_diff = np.abs(region_mean - self.texture_mean)
+        edge_density = mean_gradient / 255
+        confirmed = (sizes > 0) & ((intensity_diff > 20) | (edge_density > 0.3))
 
-            intensity_diff = abs(region_mean - self.texture_mean)
-            edge_density = mean_gradient / 255
+        confirmed_tears = []
 
-            if intensity_diff > 20 or edge_density > 0.3:
-                tear['texture_anomaly'] = True
-                tear['intensity_diff'] = intensity_diff
-                tear['edge_density'] = edge_density
-                confirmed_tears.append(tear)
+        for index in np.flatnonzero(confirmed).tolist():
+            tear = tear_regions[index]
+            tear['texture_anomaly'] = True
+            tear['intensity_diff'] = float(intensity_diff[index])
+            tear['edge_density'] = float(edge_density[index])
+            tear['texture_std'] = float(region_std[index])
+            confirmed_tears.append(tear)
 
         return confirmed_tears
 
+    def _shift_tears(self, tears: List[Dict], x_offset: int, y_offset: int = 0):
+        """Map tears found in the belt band (or a mosaic window) back to frame (or belt) coordinates"""
+        for tear in tears:
+            x, y, w, h = tear['bbox']
+            tear['bbox'] = (x + x_offset, y + y_offset, w, h)
+            tear['center'] = (tear['center'][0] + x_offset, tear['center'][1] + y_offset)
+            tear['contour'] = tear['contour'] + np.array([x_offset, y_offset], dtype=tear['contour'].dtype)
+
     def classify_tear_severity(self, tears: List[Dict]) -> Tuple[str, List[str]]:
         """
         Classify overall tear severity and generate recommendations
@@ -243,76 +362,28 @@ class BeltTearDetector:
 
         return severity, recommendations
 
-    def analyze_tears(self, image: np.ndarray) -> BeltTearStatus:
+    def analyze_tears(self, image: FrameLike) -> BeltTearStatus:
         """
         Main method to analyze belt for tears
         """
         try:
-            # Preprocess image
-            processed = self.preprocess_image(image)
-
-            # Detect edges
-            edges = self.detect_edges(processed)
-
-            # Find tear candidates
-            candidates = self.find_tear_candidates(edges)
-
-            # Confirm tears with texture analysis
-            confirmed_tears = self.analyze_texture_anomaly(processed, candidates)
-
-            if not confirmed_tears:
-                return BeltTearStatus(
-                    tear_detected=False,
-                    tear_count=0,
-                    tear_locations=[],
-                    max_tear_length_mm=0.0,
-                    max_tear_width_mm=0.0,
-                    total_tear_area_mm2=0.0,
-                    severity="none",
-                    recommendations=["Belt appears intact"],
-                    confidence=0.95,
-                    timestamp=cv2.getTickCount() / cv2.getTickFrequency()
-                )
-
-            # Calculate statistics
-            tear_count = len(confirmed_tears)
-            max_length = max(t['length_mm'] for t in confirmed_tears)
-            max_width = max(t['width_mm'] for t in confirmed_tears)
-            total_area = sum(t['area_mm2'] for t in confirmed_tears)
-
-            # Classify severity
-            severity, recommendations = self.classify_tear_severity(confirmed_tears)
-
-            # Prepare tear locations for reporting
-            tear_locations = []
-            for tear in confirmed_tears:
-                x, y, w, h = tear['bbox']
-                tear_locations.append({
-                    'x': x,
-                    'y': y,
-                    'width': w,
-                    'height': h,
-                    'length_mm': tear['length_mm'],
-                    'width_mm': tear['width_mm'],
-                    'area_mm2': tear['area_mm2'],
-                    'center': tear['center']
-                })
-
-            # Calculate confidence based on edge quality and texture analysis
-            confidence = min(0.95, 0.7 + (len(confirmed_tears) / 20))
-
-            return BeltTearStatus(
-                tear_detected=True,
-                tear_count=tear_count,
-                tear_locations=tear_locations,
-                max_tear_length_mm=round(max_length, 1),
-                max_tear_width_mm=round(max_width, 1),
-                total_tear_area_mm2=round(total_area, 1),
-                severity=severity,
-                recommendations=recommendations,
-                confidence=round(confidence, 2),
-                timestamp=cv2.getTickCount() / cv2.getTickFrequency()
-            )
+            ctx = FrameContext.wrap(image)
+            if self.mosaic is not None:
+                return self._analyze_new_belt(ctx)
+
+            # Crop to the belt band when its edges are known
+            belt = self.roi.edges(ctx.width) if self.roi is not None else None
+            x_offset = 0
+            if belt is not None:
+                x_offset, x_end = self.roi.band(ctx.width, belt)
+                ctx = ctx.region(x_offset, x_end)
+                ctx.timer.fast_path('roi_band')
+
+            confirmed_tears = self._find_tears(
+                ctx, (belt[0] - x_offset, belt[1] - x_offset) if belt is not None else None)
+            if x_offset:
+                self._shift_tears(confirmed_tears, x_offset)
+            return self._tear_status(confirmed_tears)
 
         except Exception as e:
             logger.error(f"Error in tear analysis: {e}")
@@ -329,12 +400,120 @@ class BeltTearDetector:
                 timestamp=cv2.getTickCount() / cv2.getTickFrequency()
             )
 
-    def visualize_tears(self, image: np.ndarray, status: BeltTearStatus) -> np.ndarray:
+    def _analyze_new_belt(self, ctx: FrameContext) -> BeltTearStatus:
+        """Add the frame to the mosaic and search the belt it completes, if enough has accumulated"""
+        ctx.timer.fast_path('tear_mosaic')
+
+        # Only the belt surface goes into the mosaic, without its edge lines. The
+        # edges are tracked at mid-frame; strips come from the frame's leading
+        # rows, where a slanted belt's edges are up to half a band margin away
+        belt = self.roi.edges(ctx.width) if self.roi is not None else None
+        span = None
+        if belt is not None:
+            inset = self.edge_mask_px + self.roi.margin(*belt) // 2
+            span = (belt[0] + inset, belt[1] - inset)
+        with ctx.timer.stage('tear_mosaic'):
+            window = self.mosaic.advance(ctx.gray(), span)
+        belt_position_m = round(self.mosaic.length_px * self.pixel_to_mm / 1000, 3)
+        if window is None:
+            return self._tear_status([], belt_position_m)
+
+        # Each tear is reported by the window holding its trailing end; one
+        # touching the newest row may go on and is left to the next window
+        last_row = len(window.image) - 1
+        confirmed_tears = [tear for tear in self._find_tears(FrameContext(window.image, ctx.timer))
+                           if window.new_from <= tear['bbox'][1] + tear['bbox'][3] - 1 < last_row]
+        self._shift_tears(confirmed_tears, 0, window.start_px)
+        return self._tear_status(confirmed_tears, belt_position_m)
+
+    def _find_tears(self, ctx: FrameContext, belt: Optional[Tuple[float, float]] = None) -> List[Dict]:
+        """Confirmed tears of an image; belt edges, if given, are masked from the search"""
+        # Preprocess image
+        with ctx.timer.stage('tear_preprocess'):
+            processed = self.preprocess_image(ctx)
+        if self.profile != 'quality':
+            ctx.timer.fast_path(f"tear_{self.profile}")
+
+        # Detect edges
+        edges = self.detect_edges(processed)
+        if belt is not None:
+            self.mask_outside_belt(edges, belt[0], belt[1])
+
+        # Find tear candidates
+        with ctx.timer.stage('tear_contours'):
+            candidates = self.find_tear_candidates(edges)
+
+        # Confirm tears with texture analysis
+        with ctx.timer.stage('tear_texture'):
+            return self.analyze_texture_anomaly(processed, candidates)
+
+    def _tear_status(self, confirmed_tears: List[Dict], belt_position_m: Optional[float] = None) -> BeltTearStatus:
+        if not confirmed_tears:
+            return BeltTearStatus(
+                tear_detected=False,
+                tear_count=0,
+                tear_locations=[],
+                max_tear_length_mm=0.0,
+                max_tear_width_mm=0.0,
+                total_tear_area_mm2=0.0,
+                severity="none",
+                recommendations=["Belt appears intact"],
+                confidence=0.95,
+                timestamp=cv2.getTickCount() / cv2.getTickFrequency(),
+                belt_position_m=belt_position_m
+            )
+
+        # Calculate statistics
+        tear_count = len(confirmed_tears)
+        max_length = max(t['length_mm'] for t in confirmed_tears)
+        max_width = max(t['width_mm'] for t in confirmed_tears)
+        total_area = sum(t['area_mm2'] for t in confirmed_tears)
+
+        # Classify severity
+        severity, recommendations = self.classify_tear_severity(confirmed_tears)
+
+        # Prepare tear locations for reporting
+        tear_locations = []
+        for tear in confirmed_tears:
+            x, y, w, h = tear['bbox']
+            location = {
+                'x': x,
+                'y': y,
+                'width': w,
+                'height': h,
+                'length_mm': tear['length_mm'],
+                'width_mm': tear['width_mm'],
+                'area_mm2': tear['area_mm2'],
+                'center': tear['center']
+            }
+            if belt_position_m is not None:
+                location['belt_position_m'] = round((y + h / 2) * self.pixel_to_mm / 1000, 3)
+            tear_locations.append(location)
+
+        # Calculate confidence based on edge quality and texture analysis
+        confidence = min(0.95, 0.7 + (len(confirmed_tears) / 20))
+
+        return BeltTearStatus(
+            tear_detected=True,
+            tear_count=tear_count,
+            tear_locations=tear_locations,
+            max_tear_length_mm=round(max_length, 1),
+            max_tear_width_mm=round(max_width, 1),
+            total_tear_area_mm2=round(total_area, 1),
+            severity=severity,
+            recommendations=recommendations,
+            confidence=round(confidence, 2),
+            timestamp=cv2.getTickCount() / cv2.getTickFrequency(),
+            belt_position_m=belt_position_m
+        )
+
+    def visualize_tears(self, image: FrameLike, status: BeltTearStatus) -> np.ndarray:
         """
         Draw tear visualization on image
         """
-        result = image.copy()
-        height, width = image.shape[:2]
+        ctx = FrameContext.wrap(image)
+        result = ctx.color().copy()
+        height, width = ctx.height, ctx.width
 
         if status.tear_detected:
             # Color based on severity
@@ -0,0 +1,134 @@
+"""
+Change gate deciding how much of a frame needs analyzing.
+
+A small grayscale thumbnail of every frame is compared with the thumbnail of
+the last analyzed frame:
+
+- motion energy, the fraction of thumbnail pixels that changed, and the
+  shift phase correlation finds between the thumbnails tell whether anything
+  moved at all; a stopped belt or a static scene is served from the cached
+  results without running any analyzer. A finely textured belt blurs to a
+  near-uniform thumbnail, so its travel hardly changes any pixel but still
+  shows as a shift; and a belt last measured running is never cached;
+- the column-mean profile only changes when the belt edges move or the
+  lighting changes, so a running belt whose profile is unchanged reuses the
+  last alignment and only runs speed and tear analysis.
+
+Every max_gated_frames frames a full analysis is forced so slow changes are
+never missed.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from app.models.frame_context import FrameContext, FrameLike
+
+GATE_ACTIONS = ('full', 'reuse_alignment', 'cached')
+
+
+@dataclass
+class GateDecision:
+    """What to run for one frame, with the scores behind the decision"""
+    action: str  # 'full', 'reuse_alignment' or 'cached'
+    motion_energy: float  # Fraction of thumbnail pixels changed since the last analyzed frame
+    difference: float  # Mean absolute thumbnail difference (gray levels)
+    profile_change: float  # Largest column-profile change since the last alignment (gray levels)
+    shift_px: Optional[float] = None  # Thumbnail shift since the last analyzed frame, if measured
+
+
+class ChangeGate:
+    """Per-camera gate comparing frames with the last analyzed one"""
+
+    def __init__(self, thumb_width: int = 160, pixel_threshold: int = 8,
+                 static_energy: float = 0.01, min_shift_px: float = 0.3,
+                 running_speed_mps: float = 0.05, profile_threshold: float = 6.0,
+                 max_gated_frames: int = 150):
+        """
+        Initialize change gate
+
+        Args:
+            thumb_width: Thumbnail width the comparison runs at
+            pixel_threshold: Gray-level change for a thumbnail pixel to count as changed
+            static_energy: Below this motion energy the frame is served from the cache
+            min_shift_px: Thumbnail shift at which the scene counts as moving, whatever its energy
+            running_speed_mps: Above this last measured speed no frame is served from the cache
+            profile_threshold: Below this profile change the last alignment is reused
+            max_gated_frames: Consecutive gated frames before a full analysis is forced
+        """
+        self.thumb_width = thumb_width
+        self.pixel_threshold = pixel_threshold
+        self.static_energy = static_energy
+        self.min_shift_px = min_shift_px
+        self.running_speed_mps = running_speed_mps
+        self.profile_threshold = profile_threshold
+        self.max_gated_frames = max_gated_frames
+
+        self.ref_thumb: Optional[np.ndarray] = None
+        self.ref_profile: Optional[np.ndarray] = None
+        self.gated_frames = 0
+        self._window: Optional[np.ndarray] = None
+        self.counts: Dict[str, int] = {action: 0 for action in GATE_ACTIONS}
+
+    def reset(self):
+        self.ref_thumb = None
+        self.ref_profile = None
+        self.gated_frames = 0
+
+    def thumbnail(self, image: FrameLike) -> np.ndarray:
+        ctx = FrameContext.wrap(image)
+        width = min(self.thumb_width, ctx.width)
+        height = max(1, round(ctx.height * width / ctx.width))
+        return ctx.memo(('thumbnail', width), lambda: cv2.resize(
+            ctx.gray(), (width, height), interpolation=cv2.INTER_AREA))
+
+    def shift(self, thumb: np.ndarray) -> float:
+        """Thumbnail shift in pixels since the reference, by phase correlation"""
+        if self._window is None or self._window.shape != thumb.shape:
+            self._window = cv2.createHanningWindow((thumb.shape[1], thumb.shape[0]), cv2.CV_32F)
+        (dx, dy), _ = cv2.phaseCorrelate(self.ref_thumb.astype(np.float32), thumb.astype(np.float32), self._window)
+        return float(np.hypot(dx, dy))
+
+    def check(self, image: FrameLike, speed_mps: float = 0.0) -> GateDecision:
+        """
+        Decide what to run for this frame and update the references accordingly
+
+        Args:
+            image: Frame to check
+            speed_mps: Belt speed last measured on this camera
+        """
+        thumb = self.thumbnail(image)
+        profile = thumb.mean(axis=0, dtype=np.float32)
+
+        if (self.ref_thumb is None or self.ref_thumb.shape != thumb.shape
+                or self.gated_frames >= self.max_gated_frames):
+            decision = GateDecision('full', 1.0, 255.0, 255.0)
+        else:
+            diff = cv2.absdiff(thumb, self.ref_thumb)
+            energy = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            profile_change = float(np.abs(profile - self.ref_profile).max())
+            # The shift is only needed to confirm a frame that looks static
+            static = energy < self.static_energy and speed_mps <= self.running_speed_mps
+            shift = self.shift(thumb) if static else None
+
+            if static and shift < self.min_shift_px:
+                action = 'cached'
+            elif profile_change < self.profile_threshold:
+                action = 'reuse_alignment'
+            else:
+                action = 'full'
+            decision = GateDecision(action, round(float(energy), 4), round(float(diff.mean()), 2),
+                                    round(profile_change, 2), round(shift, 3) if shift is not None else None)
+
+        if decision.action == 'full':
+            self.ref_thumb, self.ref_profile = thumb, profile
+            self.gated_frames = 0
+        else:
+            self.gated_frames += 1
+            if decision.action == 'reuse_alignment':
+                # The frame is analyzed for speed and tears, so it is the new reference
+                self.ref_thumb = thumb
+
+        self.counts[decision.action] += 1
+        return decision
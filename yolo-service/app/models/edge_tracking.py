@@ -0,0 +1,166 @@
+"""
+Incremental belt edge tracking.
+
+Once both belt edges are known, each edge is followed from frame to frame by
+searching a narrow window around its previous position. Horizontal gradient
+magnitudes are summed over horizontal strips into 1-D column profiles; the
+profile peak of each strip gives one edge point and a line fitted through the
+points gives the edge. This replaces Canny + HoughLinesP over the whole frame
+until tracking confidence drops, when callers re-acquire the edges with Hough.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.models.frame_context import FrameContext
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EdgeLine:
+    """Belt edge as x = slope * y + intercept (analysis-image coordinates)"""
+    slope: float
+    intercept: float
+    height: int
+
+    @classmethod
+    def from_points(cls, points, height: int) -> "EdgeLine":
+        """Line through the x1, y1, x2, y2 segment returned by HoughLinesP"""
+        x1, y1, x2, y2 = (float(v) for v in points)
+        slope = (x2 - x1) / (y2 - y1) if y2 != y1 else 0.0
+        return cls(slope=slope, intercept=x1 - slope * y1, height=height)
+
+    def x_at(self, y):
+        return self.slope * y + self.intercept
+
+    @property
+    def center_x(self) -> float:
+        """Edge x at mid-height"""
+        return float(self.x_at((self.height - 1) / 2))
+
+    def points(self) -> np.ndarray:
+        """Top and bottom end points as x1, y1, x2, y2"""
+        bottom = self.height - 1
+        return np.array([self.x_at(0), 0, self.x_at(bottom), bottom], dtype=np.float64)
+
+
+class BeltEdgeTracker:
+    """Follows both belt edges through narrow gradient-profile windows"""
+
+    def __init__(self, search_px: int = 8, strips: int = 12,
+                 min_contrast: float = 2.0, min_confidence: float = 0.6):
+        """
+        Initialize belt edge tracker
+
+        Args:
+            search_px: Half-width of the search window around each previous edge
+            strips: Horizontal strips, each giving one point of the edge line
+            min_contrast: Profile peak / window mean ratio for a strip to count
+            min_confidence: Below this the track is dropped and callers re-acquire
+        """
+        self.search_px = search_px
+        self.strips = strips
+        self.min_contrast = min_contrast
+        self.min_confidence = min_confidence
+
+        self.left: Optional[EdgeLine] = None
+        self.right: Optional[EdgeLine] = None
+        self.frame_shape: Optional[Tuple[int, int]] = None
+        self.confidence = 0.0
+
+        self.tracked_frames = 0
+        self.acquisitions = 0
+
+    @property
+    def active(self) -> bool:
+        return self.left is not None and self.right is not None
+
+    def acquire(self, left: EdgeLine, right: EdgeLine, frame_shape: Tuple[int, ...]):
+        """Start tracking from edges found by a full search"""
+        self.left, self.right = left, right
+        self.frame_shape = tuple(frame_shape[:2])
+        self.confidence = 1.0
+        self.acquisitions += 1
+
+    def clear(self):
+        self.left = self.right = None
+        self.frame_shape = None
+        self.confidence = 0.0
+
+    def track(self, image) -> Optional[Tuple[EdgeLine, EdgeLine]]:
+        """
+        Follow both edges into a new frame
+
+        Returns:
+            Tuple of (left, right) edge lines, or None when the track was lost
+        """
+        ctx = FrameContext.wrap(image)
+        if not self.active or (ctx.height, ctx.width) != self.frame_shape:
+            return None
+
+        gray = ctx.gray()
+        left, left_confidence = self._track_edge(gray, self.left)
+        right, right_confidence = self._track_edge(gray, self.right)
+        confidence = min(left_confidence, right_confidence)
+
+        # Belt width changes slowly; a jump means one side latched onto something else
+        if left is not None and right is not None:
+            width_change = abs((right.center_x - left.center_x) - (self.right.center_x - self.left.center_x))
+            if width_change > self.search_px:
+                confidence = 0.0
+
+        if left is None or right is None or confidence < self.min_confidence:
+            logger.debug(f"Edge track lost (confidence {confidence:.2f})")
+            self.clear()
+            return None
+
+        self.left, self.right = left, right
+        self.confidence = confidence
+        self.tracked_frames += 1
+        return left, right
+
+    def _track_edge(self, gray: np.ndarray, line: EdgeLine) -> Tuple[Optional[EdgeLine], float]:
+        height, width = gray.shape
+        strip_rows = height // self.strips
+        if strip_rows < 1:
+            return None, 0.0
+
+        rows = strip_rows * self.strips
+        ys = np.arange(self.strips) * strip_rows + (strip_rows - 1) / 2
+        expected = line.x_at(ys)
+
+        # One band covering the search window of every strip
+        w = self.search_px
+        x0 = max(0, int(np.floor(expected.min())) - w - 1)
+        x1 = min(width, int(np.ceil(expected.max())) + w + 2)
+        if x1 - x0 < 3:
+            return None, 0.0
+
+        gx = cv2.Sobel(gray[:rows, x0:x1], cv2.CV_16S, 1, 0, ksize=3)
+        profiles = np.abs(gx).astype(np.int32).reshape(self.strips, strip_rows, -1).sum(axis=1)
+
+        points_y, points_x = [], []
+        for strip, center in enumerate(expected):
+            lo = max(0, int(round(center)) - w - x0)
+            hi = min(profiles.shape[1], int(round(center)) + w + 1 - x0)
+            window = profiles[strip, lo:hi]
+            if window.size == 0:
+                continue
+
+            peak = int(np.argmax(window))
+            if window[peak] >= self.min_contrast * (window.mean() + 1):
+                points_y.append(ys[strip])
+                points_x.append(x0 + lo + peak)
+
+        found = len(points_x) / self.strips
+        if len(points_x) < max(2, self.strips // 2):
+            return None, found
+
+        slope, intercept = np.polyfit(points_y, points_x, 1)
+        residual = np.sqrt(np.mean((np.polyval((slope, intercept), points_y) - points_x) ** 2))
+        confidence = found * max(0.0, 1.0 - residual / w)
+        return EdgeLine(float(slope), float(intercept), height), confidence
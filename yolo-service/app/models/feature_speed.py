@@ -0,0 +1,155 @@
+"""
+Belt displacement from sparse Lucas-Kanade feature tracking.
+
+A pool of corners inside the belt band is tracked from frame to frame with
+pyramidal Lucas-Kanade. Per-feature displacements along the travel axis are
+filtered with a median/MAD test, so features on static structure or
+mismatched corners do not bias the estimate, and the pool is topped up
+whenever it falls below a threshold instead of only after tracking is lost
+completely.
+
+The OpenCV Python bindings do not accept prebuilt pyramids in
+calcOpticalFlowPyrLK, so pyramids cannot be carried over between frames.
+Instead LK only sees the column range spanned by the features plus the
+largest motion the pyramid can follow, which keeps pyramid construction
+proportional to the belt band rather than the frame.
+"""
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.models.strip_speed import BELT_ORIENTATIONS
+
+DEFAULT_FEATURE_PARAMS = dict(maxCorners=100, qualityLevel=0.3, minDistance=7, blockSize=7)
+DEFAULT_LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+)
+
+
+class FeatureDisplacementTracker:
+    """Frame-to-frame belt displacement from a managed pool of tracked corners"""
+
+    def __init__(self, orientation: str = 'horizontal', feature_params: Optional[Dict] = None,
+                 lk_params: Optional[Dict] = None, min_features: int = 40,
+                 min_inliers: int = 5, mad_threshold: float = 3.0, min_spread_px: float = 0.5):
+        """
+        Initialize feature displacement tracker
+
+        Args:
+            orientation: Belt travel direction in the image, 'horizontal' or 'vertical'
+            feature_params: cv2.goodFeaturesToTrack settings; maxCorners is the pool size
+            lk_params: cv2.calcOpticalFlowPyrLK settings (winSize, maxLevel, criteria)
+            min_features: The pool is refilled when fewer features survive a frame
+            min_inliers: Fewer agreeing features than this give no measurement
+            mad_threshold: Features further than this many MADs from the median are outliers
+            min_spread_px: Lower bound for the MAD, so near-identical shifts are not rejected
+        """
+        if orientation not in BELT_ORIENTATIONS:
+            raise ValueError(f"orientation must be one of {BELT_ORIENTATIONS}")
+        self.orientation = orientation
+        self.feature_params = dict(feature_params or DEFAULT_FEATURE_PARAMS)
+        self.lk_params = dict(lk_params or DEFAULT_LK_PARAMS)
+        self.min_features = min_features
+        self.min_inliers = min_inliers
+        self.mad_threshold = mad_threshold
+        self.min_spread_px = min_spread_px
+
+        self.prev_gray: Optional[np.ndarray] = None
+        self.prev_points: Optional[np.ndarray] = None  # (N, 1, 2) float32
+        self.frame_shape: Optional[Tuple[int, int]] = None
+
+        self.tracked = 0
+        self.inliers = 0
+        self.refills = 0
+
+    def reset(self):
+        self.prev_gray = None
+        self.prev_points = None
+        self.frame_shape = None
+
+    def memory_bytes(self) -> int:
+        size = self.prev_gray.nbytes if self.prev_gray is not None else 0
+        return size + (self.prev_points.nbytes if self.prev_points is not None else 0)
+
+    def _search_columns(self, points: np.ndarray, width: int) -> Tuple[int, int]:
+        """Columns LK needs: the features plus the largest motion the pyramid can follow"""
+        pad = self.lk_params['winSize'][0] * 2 ** self.lk_params['maxLevel']
+        xs = points[..., 0]
+        return max(0, int(xs.min()) - pad), min(width, int(np.ceil(xs.max())) + pad + 1)
+
+    def _refill(self, gray: np.ndarray, points: np.ndarray, band: Optional[Tuple[int, int]]) -> np.ndarray:
+        """Top the pool up with new corners in the belt band, away from existing features"""
+        wanted = self.feature_params['maxCorners'] - len(points)
+        if wanted <= 0:
+            return points
+
+        mask = np.zeros(gray.shape, np.uint8)
+        x0, x1 = band if band is not None else (0, gray.shape[1])
+        mask[:, x0:x1] = 255
+        radius = int(self.feature_params.get('minDistance', 7))
+        for x, y in points.reshape(-1, 2):
+            cv2.circle(mask, (int(x), int(y)), radius, 0, -1)
+
+        params = dict(self.feature_params, maxCorners=wanted)
+        corners = cv2.goodFeaturesToTrack(gray, mask=mask, **params)
+        if corners is None:
+            return points
+
+        self.refills += 1
+        return np.concatenate([points, corners.astype(np.float32)])
+
+    def displacement(self, gray: np.ndarray, band: Optional[Tuple[int, int]] = None) -> Optional[float]:
+        """
+        Belt shift since the previous frame, in analysis pixels along the travel axis
+
+        Args:
+            gray: Grayscale analysis image
+            band: Column range of the belt, if known; new features are only taken there
+
+        Returns:
+            Signed displacement, or None on the first frame or without enough agreeing features
+        """
+        if gray.shape != self.frame_shape:
+            self.reset()
+            self.frame_shape = gray.shape
+
+        shift = None
+        points = np.empty((0, 1, 2), np.float32)
+
+        if self.prev_gray is not None and self.prev_points is not None and len(self.prev_points):
+            x0, x1 = self._search_columns(self.prev_points, gray.shape[1])
+            offset = np.array([x0, 0], np.float32)
+            next_points, status, _ = cv2.calcOpticalFlowPyrLK(
+                self.prev_gray[:, x0:x1], gray[:, x0:x1], self.prev_points - offset, None, **self.lk_params
+            )
+            next_points += offset
+            good = status.ravel() == 1
+            old, new = self.prev_points[good], next_points[good]
+            self.tracked = int(good.sum())
+
+            axis = 0 if self.orientation == 'horizontal' else 1
+            moves = (new - old).reshape(-1, 2)[:, axis]
+            if len(moves):
+                median = np.median(moves)
+                spread = max(1.4826 * np.median(np.abs(moves - median)), self.min_spread_px)
+                inliers = np.abs(moves - median) <= self.mad_threshold * spread
+                self.inliers = int(inliers.sum())
+                if self.inliers >= self.min_inliers:
+                    shift = float(np.mean(moves[inliers]))
+
+                # Outliers are dropped from the pool along with lost features
+                points = new[inliers]
+                height, width = gray.shape
+                xy = points.reshape(-1, 2)
+                inside = (xy[:, 0] >= 0) & (xy[:, 0] < width) & (xy[:, 1] >= 0) & (xy[:, 1] < height)
+                points = points[inside]
+
+        if len(points) < self.min_features:
+            points = self._refill(gray, points, band)
+
+        self.prev_gray = gray
+        self.prev_points = points
+        return shift
@@ -0,0 +1,154 @@
+import cv2
+import numpy as np
+import threading
+from contextlib import nullcontext
+from typing import Callable, Dict, Hashable, Tuple, Union
+
+# CLAHE objects are reusable across frames; creating one per frame is wasted work.
+# They keep working buffers between calls, so every thread gets its own
+_clahe_local = threading.local()
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """Return a grayscale view of the frame, skipping conversion for gray input"""
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def get_clahe(clip_limit: float = 2.0, tile_grid_size: Tuple[int, int] = (8, 8)) -> cv2.CLAHE:
+    key = (clip_limit, tuple(tile_grid_size))
+    cache: Dict[Tuple[float, Tuple[int, int]], cv2.CLAHE] = _clahe_local.__dict__.setdefault('cache', {})
+    clahe = cache.get(key)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=key[1])
+        cache[key] = clahe
+    return clahe
+
+
+class NullTimer:
+    """
+    Stage timer that records nothing.
+
+    Analyzers time their expensive steps with `with ctx.timer.stage(name):`
+    and report shortcuts with ctx.timer.fast_path(name); the service attaches
+    a recording timer, everything else gets this one.
+    """
+    _null = nullcontext()
+
+    def stage(self, name: str):
+        return self._null
+
+    def analyzer(self, name: str):
+        return self._null
+
+    def fast_path(self, name: str):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class FrameContext:
+    """
+    Per-frame cache of image intermediates shared by all analyzers.
+
+    Each intermediate (gray, blurred, Canny, CLAHE, gradients) is computed on
+    first use and returned from the cache afterwards, so analyzers running on
+    the same frame never redo a conversion. Safe to share between threads.
+    """
+
+    def __init__(self, image: np.ndarray, timer=NULL_TIMER):
+        self.image = image
+        self.timer = timer
+        self._cache: Dict[Hashable, object] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def wrap(cls, frame: Union[np.ndarray, "FrameContext"]) -> "FrameContext":
+        """Accept either a raw image or an existing context"""
+        if isinstance(frame, FrameContext):
+            return frame
+        return cls(frame)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.image.shape
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    def memo(self, key: Hashable, compute: Callable[[], object]):
+        """Return the cached value for key, computing it once if needed"""
+        if key in self._cache:
+            return self._cache[key]
+
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        # Per-key lock: concurrent users of one intermediate wait for a single
+        # computation while unrelated intermediates proceed in parallel
+        with lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+
+    def gray(self) -> np.ndarray:
+        def compute():
+            with self.timer.stage('gray'):
+                return to_gray(self.image)
+
+        return self.memo('gray', compute)
+
+    def blurred(self, ksize: int = 5) -> np.ndarray:
+        return self.memo(('blurred', ksize),
+                         lambda: cv2.GaussianBlur(self.gray(), (ksize, ksize), 0))
+
+    def canny(self, low: int = 50, high: int = 150, blur_ksize: int = 5) -> np.ndarray:
+        def compute():
+            blurred = self.blurred(blur_ksize)
+            with self.timer.stage('canny'):
+                return cv2.Canny(blurred, low, high)
+
+        return self.memo(('canny', low, high, blur_ksize), compute)
+
+    def clahe(self, clip_limit: float = 2.0, tile_grid_size: Tuple[int, int] = (8, 8)) -> np.ndarray:
+        return self.memo(('clahe', clip_limit, tuple(tile_grid_size)),
+                         lambda: get_clahe(clip_limit, tile_grid_size).apply(self.gray()))
+
+    def gradients(self, ksize: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """Horizontal and vertical Sobel gradients of the gray frame (float32)"""
+        return self.memo(('gradients', ksize), lambda: (
+            cv2.Sobel(self.gray(), cv2.CV_32F, 1, 0, ksize=ksize),
+            cv2.Sobel(self.gray(), cv2.CV_32F, 0, 1, ksize=ksize)
+        ))
+
+    def region(self, x0: int, x1: int) -> "FrameContext":
+        """
+        Context over the column band [x0, x1), shared by all analyzers cropping to it
+
+        The crop is a view, not a copy. If this frame's gray image already exists
+        the region reuses a slice of it instead of converting again.
+        """
+        def make_region():
+            region = FrameContext(self.image[:, x0:x1], self.timer)
+            if 'gray' in self._cache:
+                region._cache['gray'] = self._cache['gray'][:, x0:x1]
+            return region
+
+        return self.memo(('region', x0, x1), make_region)
+
+    def color(self) -> np.ndarray:
+        """BGR version of the frame for drawing overlays"""
+        if self.image.ndim == 3:
+            return self.image
+        return self.memo('color', lambda: cv2.cvtColor(self.image, cv2.COLOR_GRAY2BGR))
+
+
+FrameLike = Union[np.ndarray, FrameContext]
@@ -0,0 +1,240 @@
+"""
+Multi-analyzer pipeline.
+
+The analyzers of one frame are modelled as a DAG of stages that share a
+FrameContext:
+
+    gray -> edges -> alignment
+    gray -> speed (optical flow)
+    gray -> clahe -> tears (contours + texture)
+    edges -> monitor (BeltMonitor alignment + speed)
+
+Only the stages needed for the requested analyzers run. When the camera's
+change gate finds the frame unchanged, alignment and tear results of the
+last analyzed frame are reused instead of running their stages. Every stage whose
+dependencies are done is started immediately on the calling worker's own
+thread pool, so independent branches run concurrently (OpenCV releases the
+GIL) without queueing behind other cameras' frames. The camera's belt band
+is held for the frame: every stage sees the band of the previous frames,
+and the edges found are applied afterwards in ANALYZERS order, so results
+do not depend on which stage finishes first.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, is_dataclass
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.belt_alignment import BeltAlignmentDetector
+from app.models.belt_mosaic import BeltMosaic
+from app.models.belt_speed import BeltSpeedMonitor
+from app.models.belt_tear import BeltTearDetector
+from app.models.frame_context import FrameContext
+
+logger = logging.getLogger(__name__)
+
+ANALYZERS = ('monitor', 'alignment', 'speed', 'tears')
+
+# Change-gate actions under which an analyzer's last result is still valid
+REUSABLE = {
+    'alignment': ('reuse_alignment', 'cached'),
+    'tears': ('cached',),
+}
+
+
+@dataclass(frozen=True)
+class FrameInfo:
+    """Per-frame inputs of the pipeline besides the image"""
+    timestamp: float  # Capture time in seconds
+    gate: str = 'full'  # Change-gate action for the frame
+    late: bool = False  # Captured before the camera's newest analyzed frame
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of the pipeline DAG"""
+    name: str
+    deps: Tuple[str, ...]
+    run: Callable  # (ctx, session, frame) -> result
+
+
+def _stage_gray(ctx, session, frame):
+    ctx.gray()
+
+
+def _stage_edges(ctx, session, frame):
+    # With edge tracking or the projection backend, Canny is only needed on the
+    # occasional re-acquisition frame and is computed there on demand
+    config = session.config
+    if frame.gate == 'full' and config.alignment_backend == 'hough' and not config.edge_tracking:
+        ctx.canny(50, 150)
+
+
+def _stage_clahe(ctx, session, frame):
+    # The fast tear profile enhances a half-resolution copy of its own, the mosaic its windows
+    if session.config.tear_profile != 'fast' and not session.config.tear_mosaic:
+        ctx.clahe(2.0, (8, 8))
+
+
+def _stage_monitor(ctx, session, frame):
+    return session.monitor.analyze_frame(ctx, frame.timestamp, frame.gate, frame.late)
+
+
+def _stage_alignment(ctx, session, frame):
+    return session.analyzer('alignment').analyze_alignment(ctx)
+
+
+def _stage_speed(ctx, session, frame):
+    return session.analyzer('speed').analyze_speed(ctx, frame.timestamp, stationary=frame.gate == 'cached')
+
+
+def _stage_tears(ctx, session, frame):
+    return session.analyzer('tears').analyze_tears(ctx)
+
+
+STAGES: Dict[str, Stage] = {stage.name: stage for stage in [
+    Stage('gray', (), _stage_gray),
+    Stage('edges', ('gray',), _stage_edges),
+    Stage('clahe', ('gray',), _stage_clahe),
+    Stage('monitor', ('edges',), _stage_monitor),
+    Stage('alignment', ('edges',), _stage_alignment),
+    Stage('speed', ('gray',), _stage_speed),
+    Stage('tears', ('clahe',), _stage_tears),
+]}
+
+
+def _create_alignment(belt_width_mm, config):
+    return BeltAlignmentDetector(belt_width_mm=belt_width_mm, edge_tracking=config.edge_tracking,
+                                 alignment_backend=config.alignment_backend,
+                                 analysis_scale=config.analysis_scale)
+
+
+def _create_speed(nominal_speed_mps, pixel_to_mm, config):
+    # Belt surface scale of the analysis image
+    return BeltSpeedMonitor(nominal_speed_mps=nominal_speed_mps, speed_mode=config.speed_mode,
+                            belt_orientation=config.belt_orientation,
+                            pixels_per_meter=1000 / (pixel_to_mm * config.analysis_scale))
+
+
+def _create_tears(belt_width_mm, pixel_to_mm, config):
+    # Tear sizes are measured on the analysis image
+    return BeltTearDetector(belt_width_mm=belt_width_mm,
+                            pixel_to_mm=pixel_to_mm * config.analysis_scale,
+                            profile=config.tear_profile,
+                            mosaic=BeltMosaic(orientation=config.belt_orientation) if config.tear_mosaic else None)
+
+
+def default_analyzer_factories(belt_width_mm: float, nominal_speed_mps: float,
+                               pixel_to_mm: float) -> Dict[str, Callable]:
+    """Picklable factories creating each camera's pipeline analyzers from its CameraConfig"""
+    return {
+        'alignment': partial(_create_alignment, belt_width_mm),
+        'speed': partial(_create_speed, nominal_speed_mps, pixel_to_mm),
+        'tears': partial(_create_tears, belt_width_mm, pixel_to_mm),
+    }
+
+
+def reusable_results(session, analyzers: Iterable[str], frame: FrameInfo) -> Dict[str, object]:
+    """Last results of the requested analyzers that are still valid for this frame"""
+    def reusable(name):
+        if name == 'tears' and session.config.tear_mosaic:
+            # The mosaic only reports belt it has not seen; a reused result would report its tears again
+            return False
+        # A late frame must not move speed state back in time
+        return frame.gate in REUSABLE.get(name, ()) or (frame.late and name == 'speed')
+
+    return {name: session.last_results[name] for name in analyzers
+            if reusable(name) and name in session.last_results}
+
+
+def resolve_stages(analyzers: Iterable[str]) -> List[str]:
+    """Return the requested stages plus everything they depend on"""
+    needed = []
+
+    def visit(name):
+        if name in needed:
+            return
+        for dep in STAGES[name].deps:
+            visit(dep)
+        needed.append(name)
+
+    for analyzer in analyzers:
+        if analyzer not in ANALYZERS:
+            raise ValueError(f"Unknown analyzer '{analyzer}', expected one of {ANALYZERS}")
+        visit(analyzer)
+    return needed
+
+
+# One stage pool per executor shard: shards run pipelines in their own thread
+_local = threading.local()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = ThreadPoolExecutor(max_workers=len(ANALYZERS),
+                                  thread_name_prefix=f"{threading.current_thread().name}-stage")
+        _local.pool = pool
+    return pool
+
+
+def run_pipeline(ctx: FrameContext, session, analyzers: Iterable[str],
+                 frame: FrameInfo) -> Tuple[Dict[str, object], Dict[str, float]]:
+    """
+    Run the requested analyzers on one frame
+
+    Returns:
+        Tuple of (analyzer results, per-stage timings in milliseconds)
+    """
+    pending = resolve_stages(analyzers)
+    done = set()
+    results: Dict[str, object] = {}
+    timings: Dict[str, float] = {}
+    running = {}
+    pool = _get_pool()
+
+    def timed(stage: Stage):
+        start = time.perf_counter()
+        if stage.name in ANALYZERS:
+            # Samples taken in this thread belong to the analyzer; shared stages keep the default label
+            with ctx.timer.analyzer(stage.name), ctx.timer.stage('analyze'):
+                result = stage.run(ctx, session, frame)
+        else:
+            result = stage.run(ctx, session, frame)
+        return result, (time.perf_counter() - start) * 1000
+
+    with session.roi.held(ANALYZERS):
+        while pending or running:
+            for name in [n for n in pending if all(dep in done for dep in STAGES[n].deps)]:
+                pending.remove(name)
+                running[pool.submit(timed, STAGES[name])] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                result, elapsed_ms = future.result()
+                timings[name] = round(elapsed_ms, 3)
+                done.add(name)
+                if name in ANALYZERS:
+                    results[name] = result
+
+    return results, timings
+
+
+def to_jsonable(value):
+    """Convert analyzer results (dataclasses, numpy scalars, tuples) to JSON types"""
+    if is_dataclass(value):
+        return to_jsonable(asdict(value))
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
@@ -0,0 +1,205 @@
+"""
+Record-and-replay archives of a camera's traffic.
+
+While recording is on for a camera, every frame it analyzes is appended to
+the camera's archive exactly as it was received (encoded image or raw
+frame), with its timestamps and the result the service returned.
+benchmarks.replay pushes an archive back through the analyzers to compare
+speed and results on real lighting and dirt.
+
+An archive is a directory of segment files per camera. Each segment is a
+sequence of records:
+
+    magic       4s      b"BLTA"
+    meta_len    uint32  length of the JSON metadata
+    frame_len   uint32  length of the frame bytes (0 for config records)
+
+followed by the metadata and the frame. Every segment starts with a config
+record holding the camera's settings, and a new one is written whenever
+they change. Segments rotate at segment_bytes, and the oldest segments are
+deleted to keep each camera under max_bytes. A partial record at the end of
+a segment (the process died mid-write) is skipped when reading.
+"""
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RECORD_MAGIC = b"BLTA"
+RECORD_HEADER = struct.Struct("<4sII")
+SEGMENT_SUFFIX = ".blta"
+
+
+def _safe_name(camera_id: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', camera_id) or '_'
+
+
+class FrameRecorder:
+    """Append-only archive of one camera's frames and results"""
+
+    def __init__(self, camera_id: str, directory: str = "/app/logs/recordings",
+                 max_bytes: int = 1024 * 1024 * 1024, segment_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize frame recorder
+
+        Args:
+            camera_id: Camera whose frames are recorded
+            directory: Root directory; the camera's segments go to a subdirectory
+            max_bytes: Size cap of the camera's archive, oldest segments are deleted first
+            segment_bytes: Size at which a new segment file is started
+        """
+        self.camera_id = camera_id
+        self.directory = os.path.join(directory, _safe_name(camera_id))
+        self.max_bytes = max_bytes
+        self.segment_bytes = min(segment_bytes, max_bytes)
+
+        self.config: Optional[Dict] = None
+        self.frames = 0
+        self.errors = 0
+        self._file = None
+        self._segment_size = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def start(self, config: Dict):
+        """Start recording into a new segment; raises OSError if it cannot be created"""
+        with self._lock:
+            self.config = config
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._open_segment()
+                logger.info(f"Recording camera '{self.camera_id}' to {self.directory}")
+
+    def stop(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"Stopped recording camera '{self.camera_id}' ({self.frames} frames)")
+
+    def update_config(self, config: Dict):
+        """Note changed camera settings; frames after this record were analyzed with them"""
+        with self._lock:
+            self.config = config
+            if self._file is not None:
+                self._write({'kind': 'config', 'config': config}, b'')
+
+    def append(self, kind: str, data: bytes, meta: Dict):
+        """
+        Append one analyzed frame
+
+        Args:
+            kind: Task that analyzed the frame, 'frame' (monitor) or 'pipeline'
+            data: The frame as received
+            meta: Timestamps, result and request options, JSON-serializable
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            if self._segment_size + len(data) > self.segment_bytes:
+                self._file.close()
+                self._file = None
+                try:
+                    self._open_segment()
+                except OSError as e:
+                    self._failed(e)
+                    return
+            self._write({'kind': kind, 'recorded_at': time.time(), **meta}, data)
+            self.frames += 1
+
+    def segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_SUFFIX))
+
+    def stats(self) -> Dict:
+        segments = self.segments()
+        return {
+            'camera_id': self.camera_id,
+            'active': self.active,
+            'directory': self.directory,
+            'frames': self.frames,
+            'errors': self.errors,
+            'segments': len(segments),
+            'bytes': sum(os.path.getsize(path) for path in segments),
+            'max_bytes': self.max_bytes,
+        }
+
+    def _open_segment(self):
+        self._sequence += 1
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self._sequence:04d}{SEGMENT_SUFFIX}"
+        self._enforce_cap()
+        self._file = open(os.path.join(self.directory, name), 'ab')
+        self._segment_size = 0
+        self._write({'kind': 'config', 'camera_id': self.camera_id, 'config': self.config}, b'')
+
+    def _enforce_cap(self):
+        # Room for the new segment is made before it is opened
+        segments = self.segments()
+        total = sum(os.path.getsize(path) for path in segments)
+        while segments and total + self.segment_bytes > self.max_bytes:
+            oldest = segments.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+            logger.info(f"Deleted recording segment {oldest} (size cap)")
+
+    def _write(self, meta: Dict, data: bytes):
+        payload = json.dumps(meta, separators=(',', ':')).encode()
+        try:
+            self._file.write(RECORD_HEADER.pack(RECORD_MAGIC, len(payload), len(data)))
+            self._file.write(payload)
+            self._file.write(data)
+            self._file.flush()
+        except OSError as e:
+            self._failed(e)
+            return
+        self._segment_size += RECORD_HEADER.size + len(payload) + len(data)
+
+    def _failed(self, error: OSError):
+        # Recording must never break analysis; a full disk stops it instead
+        self.errors += 1
+        logger.error(f"Recording camera '{self.camera_id}' failed, stopping: {error}")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def archive_segments(path: str) -> List[str]:
+    """Segment files of an archive: a segment, a camera directory or a recordings root"""
+    if os.path.isfile(path):
+        return [path]
+    segments = []
+    for root, _, names in os.walk(path):
+        segments.extend(os.path.join(root, name) for name in names if name.endswith(SEGMENT_SUFFIX))
+    return sorted(segments)
+
+
+def read_segment(path: str) -> Iterator[Dict]:
+    """Yield the records of one segment as metadata dicts, frames under 'data'"""
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            magic, meta_len, frame_len = RECORD_HEADER.unpack(header)
+            if magic != RECORD_MAGIC:
+                logger.warning(f"Corrupt record in {path}, skipping the rest of the segment")
+                return
+            payload = f.read(meta_len)
+            data = f.read(frame_len)
+            if len(payload) < meta_len or len(data) < frame_len:
+                return  # Truncated by a crash mid-write
+            record = json.loads(payload)
+            record['data'] = data
+            yield record
@@ -0,0 +1,63 @@
+"""
+Capture-time ordering of a camera's frames.
+
+Speed is measured between consecutive frames using their capture
+timestamps, so frames must reach a camera's analyzers in capture order.
+Clients that batch or pipeline requests cannot always guarantee that, so a
+frame that arrives after a newer one is tolerated within a reorder window:
+it is analyzed, but it is not used for speed because the camera's frame
+state has already moved past it. Frames older than the window are stale
+and are rejected.
+"""
+from typing import List, Optional, Sequence
+
+
+class StaleFrameError(ValueError):
+    """Raised for a frame captured before the camera's reorder window"""
+
+
+class CaptureClock:
+    """Newest capture time a camera has analyzed, used to classify new frames"""
+
+    def __init__(self):
+        self.newest: Optional[float] = None
+        self.late = 0
+        self.stale = 0
+
+    def reset(self):
+        self.newest = None
+
+    def admit(self, capture_ts: Optional[float], window_s: float) -> bool:
+        """
+        Classify a frame by its capture time
+
+        Args:
+            capture_ts: Capture time in seconds; frames without one are always in order
+            window_s: How far behind the newest frame a late frame may be
+
+        Returns:
+            True for a frame in capture order, False for a late frame within the window
+
+        Raises:
+            StaleFrameError: The frame is older than the reorder window
+        """
+        if capture_ts is None:
+            return True
+        if self.newest is None or capture_ts > self.newest:
+            self.newest = capture_ts
+            return True
+
+        age = self.newest - capture_ts
+        if age > window_s:
+            self.stale += 1
+            raise StaleFrameError(f"Frame captured {age:.3f}s before the newest analyzed frame "
+                                  f"(reorder window {window_s}s)")
+        self.late += 1
+        return False
+
+
+def capture_order(timestamps: Sequence[Optional[float]]) -> List[int]:
+    """Indices of frames sorted by capture time; frames without a timestamp keep their position"""
+    timed = sorted((i for i, ts in enumerate(timestamps) if ts is not None), key=lambda i: timestamps[i])
+    slots = iter(timed)
+    return [i if timestamps[i] is None else next(slots) for i in range(len(timestamps))]
@@ -0,0 +1,369 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from app.ingest import ANALYSIS_SCALES
+from app.models.belt_monitor import BeltMonitor
+from app.models.belt_roi import BeltROITracker
+from app.models.belt_tear import TEAR_PROFILES
+from app.models.change_gate import ChangeGate, GateDecision
+from app.models.edge_projection import ALIGNMENT_BACKENDS
+from app.models.strip_speed import BELT_ORIENTATIONS, SPEED_MODES
+from app.recorder import FrameRecorder
+from app.reorder import CaptureClock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAMERA_ID = "default"
+
+
+@dataclass
+class CameraConfig:
+    """Per-camera analysis settings"""
+    analysis_scale: int = 1
+    roi_enabled: bool = True  # Confine analysis to the tracked belt band
+    edge_tracking: bool = True  # Follow edges frame to frame instead of Hough every frame
+    alignment_backend: str = 'hough'  # Edge acquisition: 'hough' or 'projection'
+    speed_mode: str = 'flow'  # 'flow' (Farneback), 'phase' (strip correlation) or 'features' (LK)
+    belt_orientation: str = 'horizontal'  # Belt travel direction in the image
+    tear_profile: str = 'quality'  # Tear preprocessing: 'quality', 'balanced' or 'fast'
+    tear_mosaic: bool = False  # Inspect each stretch of belt once, as it is revealed, instead of every frame
+    change_gate: bool = False  # Serve unchanged frames from cached results
+    reorder_window_s: float = 0.25  # Frames this much older than the newest are analyzed, older ones rejected
+
+    def validate(self):
+        if self.analysis_scale not in ANALYSIS_SCALES:
+            raise ValueError(f"analysis_scale must be one of {ANALYSIS_SCALES}")
+        if self.alignment_backend not in ALIGNMENT_BACKENDS:
+            raise ValueError(f"alignment_backend must be one of {ALIGNMENT_BACKENDS}")
+        if self.speed_mode not in SPEED_MODES:
+            raise ValueError(f"speed_mode must be one of {SPEED_MODES}")
+        if self.belt_orientation not in BELT_ORIENTATIONS:
+            raise ValueError(f"belt_orientation must be one of {BELT_ORIENTATIONS}")
+        if self.tear_profile not in TEAR_PROFILES:
+            raise ValueError(f"tear_profile must be one of {TEAR_PROFILES}")
+        if self.reorder_window_s < 0:
+            raise ValueError("reorder_window_s must not be negative")
+
+    def apply(self, monitor: BeltMonitor):
+        monitor.analysis_scale = self.analysis_scale
+        monitor.edge_tracking = self.edge_tracking
+        monitor.alignment_backend = self.alignment_backend
+        monitor.set_speed_mode(self.speed_mode, self.belt_orientation)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class CameraSession:
+    """Monitoring state owned by a single camera"""
+    camera_id: str
+    monitor: BeltMonitor
+    config: CameraConfig = field(default_factory=CameraConfig)
+    analyzer_factories: Dict[str, Callable[[CameraConfig], object]] = field(default_factory=dict)
+    analyzers: Dict[str, object] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    frames_processed: int = 0
+    # One belt band per camera, confirmed by whichever analyzer finds the edges
+    roi: BeltROITracker = field(default_factory=BeltROITracker)
+    gate: ChangeGate = field(default_factory=ChangeGate)
+    # Latest pipeline result per analyzer, returned for gated frames
+    last_results: Dict[str, object] = field(default_factory=dict)
+    clock: CaptureClock = field(default_factory=CaptureClock)
+    # Archive of received frames and results, while recording is on
+    recorder: Optional[FrameRecorder] = None
+
+    def __post_init__(self):
+        self._attach_roi('monitor', self.monitor)
+
+    def _attach_roi(self, name: str, analyzer):
+        analyzer.roi = self.roi.view(name) if self.config.roi_enabled else None
+
+    def analyzer(self, name: str):
+        """Return the camera's pipeline analyzer, creating it on first use"""
+        analyzer = self.analyzers.get(name)
+        if analyzer is None:
+            analyzer = self.analyzer_factories[name](self.config)
+            self._attach_roi(name, analyzer)
+            self.analyzers[name] = analyzer
+        return analyzer
+
+    def admit(self, capture_ts: Optional[float]) -> bool:
+        """True if the frame is in capture order, False if late; raises StaleFrameError if stale"""
+        return self.clock.admit(capture_ts, self.config.reorder_window_s)
+
+    def check_gate(self, image) -> Optional[GateDecision]:
+        """Change-gate decision for a frame, or None when gating is off"""
+        if not self.config.change_gate:
+            return None
+        return self.gate.check(image, self.last_speed_mps())
+
+    def last_speed_mps(self) -> float:
+        """Latest speed measured by the monitor or the pipeline's speed analyzer"""
+        speeds = [self.monitor.speed_history[-1]] if self.monitor.speed_history else []
+        speed = self.analyzers.get('speed')
+        if speed is not None and speed.speed_history:
+            speeds.append(speed.speed_history[-1])
+        return max(speeds, default=0.0)
+
+    @property
+    def recording(self) -> bool:
+        return self.recorder is not None and self.recorder.active
+
+    def record(self, kind: str, data: bytes, **meta):
+        """Append an analyzed frame to the camera's archive if recording is on"""
+        if self.recording:
+            self.recorder.append(kind, data, meta)
+
+    def reset(self):
+        self.monitor.reset()
+        self.roi.clear()
+        self.gate.reset()
+        self.last_results.clear()
+        self.clock.reset()
+        self._attach_roi('monitor', self.monitor)
+        # Pipeline analyzers have no reset of their own; they are recreated on next use
+        self.analyzers.clear()
+
+    def memory_bytes(self) -> int:
+        size = self.monitor.memory_bytes()
+        if self.gate.ref_thumb is not None:
+            size += self.gate.ref_thumb.nbytes
+        for analyzer in self.analyzers.values():
+            for value in vars(analyzer).values():
+                if isinstance(value, np.ndarray):
+                    size += value.nbytes
+                elif hasattr(value, 'memory_bytes'):
+                    size += value.memory_bytes()
+        return size
+
+
+class SessionRegistry:
+    """Per-camera BeltMonitor sessions with LRU, idle-TTL and memory-cap eviction"""
+
+    def __init__(self, monitor_factory: Callable[[], BeltMonitor],
+                 max_sessions: int = 64,
+                 idle_ttl_seconds: float = 600,
+                 max_memory_mb: float = 512,
+                 default_config: Optional[CameraConfig] = None,
+                 analyzer_factories: Optional[Dict[str, Callable[[CameraConfig], object]]] = None,
+                 recorder_factory: Optional[Callable[[str], FrameRecorder]] = None):
+        """
+        Initialize session registry
+
+        Args:
+            monitor_factory: Callable creating a fresh BeltMonitor for a new camera
+            max_sessions: Maximum number of live camera sessions
+            idle_ttl_seconds: Sessions unused for longer than this are evicted (0 disables)
+            max_memory_mb: Upper bound on the frame state held by all sessions
+            default_config: Settings for cameras that were never configured
+            analyzer_factories: Pipeline analyzers created per camera on first use
+            recorder_factory: Callable creating a camera's FrameRecorder when recording is turned on
+        """
+        self.monitor_factory = monitor_factory
+        self.analyzer_factories = analyzer_factories or {}
+        self.recorder_factory = recorder_factory
+        self.default_config = default_config or CameraConfig()
+        self.default_config.validate()
+
+        # Configs are tiny and outlive evicted sessions
+        self._configs: Dict[str, CameraConfig] = {}
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl_seconds
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+
+        # Most recently used session is kept at the end
+        self._sessions: "OrderedDict[str, CameraSession]" = OrderedDict()
+        # Frame state per camera as last measured; a session is re-measured after each of
+        # its own frames, so the cap is checked without walking every session
+        self._memory: Dict[str, int] = {}
+        self._memory_total = 0
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, camera_id: str) -> bool:
+        return camera_id in self._sessions
+
+    def session(self, camera_id: str) -> CameraSession:
+        """Return the session for a camera, creating it on first use"""
+        with self._lock:
+            now = time.time()
+            self._evict_idle(now)
+
+            session = self._sessions.get(camera_id)
+            if session is None:
+                config = self.config(camera_id)
+                monitor = self.monitor_factory()
+                config.apply(monitor)
+                session = CameraSession(camera_id=camera_id, monitor=monitor, config=config,
+                                        analyzer_factories=self.analyzer_factories)
+                self._sessions[camera_id] = session
+                self._measure(camera_id)
+                logger.info(f"Created session for camera '{camera_id}'")
+            else:
+                self._sessions.move_to_end(camera_id)
+
+            session.last_used = now
+            self._enforce_limits(keep=camera_id)
+            return session
+
+    def get(self, camera_id: str) -> BeltMonitor:
+        """Return the BeltMonitor bound to a camera"""
+        return self.session(camera_id).monitor
+
+    def config(self, camera_id: str) -> CameraConfig:
+        with self._lock:
+            return self._configs.get(camera_id, self.default_config)
+
+    def configure(self, camera_id: str, **changes) -> CameraConfig:
+        """Update a camera's settings; a live session is reconfigured and reset"""
+        with self._lock:
+            config = replace(self.config(camera_id), **changes)
+            config.validate()
+            self._configs[camera_id] = config
+
+            session = self._sessions.get(camera_id)
+            if session is not None:
+                session.config = config
+                config.apply(session.monitor)
+                # Frame state captured under the old settings is not comparable
+                session.reset()
+                self._measure(camera_id)
+                if session.recorder is not None:
+                    session.recorder.update_config(config.to_dict())
+            return config
+
+    def set_recording(self, camera_id: str, enabled: bool) -> Dict:
+        """Turn recording of a camera's frames on or off"""
+        with self._lock:
+            if self.recorder_factory is None:
+                raise ValueError("Recording is not configured")
+
+            session = self.session(camera_id)
+            if session.recorder is None:
+                session.recorder = self.recorder_factory(camera_id)
+            if enabled:
+                session.recorder.start(session.config.to_dict())
+            else:
+                session.recorder.stop()
+            return session.recorder.stats()
+
+    def recording(self, camera_id: str) -> Optional[Dict]:
+        with self._lock:
+            session = self._sessions.get(camera_id)
+            if session is None or session.recorder is None:
+                return None
+            return session.recorder.stats()
+
+    def touch(self, camera_id: str):
+        """Mark a frame as processed and re-check the memory cap"""
+        with self._lock:
+            session = self._sessions.get(camera_id)
+            if session is None:
+                return
+            session.frames_processed += 1
+            session.last_used = time.time()
+            self._measure(camera_id)
+            self._enforce_limits(keep=camera_id)
+
+    def reset(self, camera_id: Optional[str] = None) -> int:
+        """Reset one camera's monitor, or every monitor if no camera is given"""
+        with self._lock:
+            if camera_id is None:
+                sessions = list(self._sessions.values())
+            else:
+                session = self._sessions.get(camera_id)
+                sessions = [session] if session is not None else []
+
+            for session in sessions:
+                session.reset()
+                self._measure(session.camera_id)
+            return len(sessions)
+
+    def remove(self, camera_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(camera_id, None)
+            self._forget(camera_id)
+            if session is not None and session.recorder is not None:
+                session.recorder.stop()
+            return session is not None
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return self._memory_total
+
+    def _measure(self, camera_id: str):
+        size = self._sessions[camera_id].memory_bytes()
+        self._memory_total += size - self._memory.get(camera_id, 0)
+        self._memory[camera_id] = size
+
+    def _forget(self, camera_id: str):
+        self._memory_total -= self._memory.pop(camera_id, 0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            now = time.time()
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_ttl_seconds': self.idle_ttl,
+                'memory_bytes': self.memory_bytes(),
+                'max_memory_bytes': self.max_memory_bytes,
+                'evictions': self.evictions,
+                'cameras': {
+                    camera_id: {
+                        'frames_processed': s.frames_processed,
+                        'idle_seconds': round(now - s.last_used, 1),
+                        'memory_bytes': self._memory.get(camera_id, 0),
+                        'gate': dict(s.gate.counts),
+                        'late_frames': s.clock.late,
+                        'stale_frames': s.clock.stale,
+                        'recording': s.recording
+                    }
+                    for camera_id, s in self._sessions.items()
+                }
+            }
+
+    def _evict_idle(self, now: float):
+        if self.idle_ttl <= 0:
+            return
+
+        expired = [cid for cid, s in self._sessions.items() if now - s.last_used > self.idle_ttl]
+        for camera_id in expired:
+            self._evict(camera_id, "idle")
+
+    def _enforce_limits(self, keep: str):
+        # Evict least recently used sessions, never the one currently in use
+        while len(self._sessions) > self.max_sessions:
+            if not self._evict_lru(keep, "session limit"):
+                break
+
+        while self._memory_total > self.max_memory_bytes:
+            if not self._evict_lru(keep, "memory cap"):
+                break
+
+    def _evict_lru(self, keep: str, reason: str) -> bool:
+        for camera_id in self._sessions:
+            if camera_id != keep:
+                self._evict(camera_id, reason)
+                return True
+        return False
+
+    def _evict(self, camera_id: str, reason: str):
+        session = self._sessions.pop(camera_id, None)
+        self._forget(camera_id)
+        if session is not None and session.recorder is not None:
+            # Recording belongs to the session; it ends with it
+            session.recorder.stop()
+        self.evictions += 1
+        logger.info(f"Evicted session for camera '{camera_id}' ({reason})")
@@ -0,0 +1,297 @@
+"""
+Server-side frame sources.
+
+Each active camera gets a dedicated reader thread that opens its RTSP URL,
+USB device or video file with cv2.VideoCapture and feeds the camera's
+BeltMonitor session through the FrameExecutor. Frames beyond the target
+analysis rate are skipped with grab(), which advances the stream without
+decoding the image.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+from app import tasks
+from app.metrics import REGISTRY
+from app.executor import FrameExecutor
+from app.media import MediaAccess
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FrameSourceSpec:
+    """Where a camera's frames come from"""
+    camera_id: str
+    source: str  # RTSP/HTTP URL, device path or index, or video file path
+    target_fps: float = 5.0
+    loop: bool = False  # Restart video files at the end instead of stopping
+    realtime: bool = True  # Pace video files at their recorded rate
+
+    @property
+    def is_file(self) -> bool:
+        return os.path.isfile(self.source)
+
+    def capture_target(self):
+        # cv2.VideoCapture expects an int for device indices such as "0"
+        return int(self.source) if self.source.isdigit() else self.source
+
+
+class FrameSourceWorker(threading.Thread):
+    """Reader thread pulling frames from one camera source"""
+
+    def __init__(self, spec: FrameSourceSpec,
+                 submit: Callable[[str, np.ndarray, float], Future],
+                 initial_backoff: float = 1.0, max_backoff: float = 30.0):
+        """
+        Initialize frame source worker
+
+        Args:
+            spec: Camera source description
+            submit: Queues one frame for analysis and returns its future
+            initial_backoff: First reconnect delay in seconds
+            max_backoff: Upper bound for the exponential reconnect delay
+        """
+        super().__init__(name=f"frame-source-{spec.camera_id}", daemon=True)
+        self.spec = spec
+        self.submit = submit
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self._stop_event = threading.Event()
+        self._in_flight: Optional[Future] = None
+        # Keeps capture timestamps increasing when a looped file restarts
+        self._file_time_offset = 0.0
+
+        self.state = "starting"
+        self.frames_read = 0
+        self.frames_skipped = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self.last_status = None
+        self.last_error: Optional[str] = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def run(self):
+        backoff = self.initial_backoff
+
+        while not self.stopped:
+            self.state = "connecting"
+            capture = cv2.VideoCapture(self.spec.capture_target())
+
+            if not capture.isOpened():
+                capture.release()
+                self.last_error = f"Could not open source {self.spec.source}"
+                backoff = self._backoff(backoff)
+                continue
+
+            logger.info(f"Frame source for camera '{self.spec.camera_id}' opened")
+            self.state = "running"
+            backoff = self.initial_backoff
+
+            try:
+                if self.spec.is_file:
+                    finished = self._read_file(capture)
+                else:
+                    finished = self._read_live(capture)
+            finally:
+                capture.release()
+
+            if finished:
+                if not self.spec.loop:
+                    self.state = "finished"
+                    logger.info(f"Frame source for camera '{self.spec.camera_id}' reached end of file")
+                    return
+                continue
+
+            if not self.stopped:
+                self.last_error = "Stream interrupted"
+                backoff = self._backoff(backoff)
+
+        self.state = "stopped"
+
+    def _read_live(self, capture: cv2.VideoCapture) -> bool:
+        """Read a live stream; returns False when the connection drops"""
+        interval = 1.0 / self.spec.target_fps
+        next_due = time.monotonic()
+
+        while not self.stopped:
+            # grab() keeps draining the camera buffer so analyzed frames are always fresh
+            if not capture.grab():
+                return False
+
+            now = time.monotonic()
+            if now < next_due:
+                self.frames_skipped += 1
+                continue
+
+            next_due = max(next_due + interval, now)
+            ok, image = capture.retrieve()
+            if not ok:
+                return False
+            self._dispatch(image, time.time())
+
+        return False
+
+    def _read_file(self, capture: cv2.VideoCapture) -> bool:
+        """Read a video file; returns True at end of file"""
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        stride = max(1, round(source_fps / self.spec.target_fps))
+        started = time.monotonic()
+        frame_index = -1
+
+        while not self.stopped:
+            if not capture.grab():
+                self._file_time_offset += (frame_index + 1) / source_fps
+                return True
+
+            frame_index += 1
+            if frame_index % stride:
+                self.frames_skipped += 1
+                continue
+
+            ok, image = capture.retrieve()
+            if not ok:
+                self._file_time_offset += (frame_index + 1) / source_fps
+                return True
+
+            position = frame_index / source_fps
+            capture_ts = self._file_time_offset + position
+            if self.spec.realtime:
+                delay = started + position - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+            self._dispatch(image, capture_ts)
+
+        return False
+
+    def _dispatch(self, image: np.ndarray, capture_ts: float):
+        self.frames_read += 1
+
+        # Never queue behind a frame that is still being analyzed
+        if self._in_flight is not None and not self._in_flight.done():
+            self.frames_dropped += 1
+            REGISTRY.inc('belt_frames_dropped_total', camera=self.spec.camera_id, reason='worker_busy')
+            return
+
+        self._in_flight = self.submit(self.spec.camera_id, image, capture_ts)
+        self._in_flight.add_done_callback(self._store_result)
+
+    def _store_result(self, future: Future):
+        try:
+            self.last_status = future.result()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Frame source analysis error for '{self.spec.camera_id}': {e}")
+
+    def _backoff(self, delay: float) -> float:
+        self.state = "backoff"
+        self.reconnects += 1
+        logger.warning(f"Frame source for camera '{self.spec.camera_id}' unavailable, "
+                       f"retrying in {delay:.1f}s")
+        self._stop_event.wait(delay)
+        return min(delay * 2, self.max_backoff)
+
+    def stats(self) -> Dict:
+        status = self.last_status
+        return {
+            'source': self.spec.source,
+            'target_fps': self.spec.target_fps,
+            'state': self.state,
+            'frames_read': self.frames_read,
+            'frames_skipped': self.frames_skipped,
+            'frames_dropped': self.frames_dropped,
+            'reconnects': self.reconnects,
+            'last_error': self.last_error,
+            'last_status': {
+                'alignment_percentage': status.alignment_percentage,
+                'alignment_direction': status.alignment_direction,
+                'speed_mps': status.speed_mps,
+                'alert': status.alert
+            } if status is not None else None
+        }
+
+
+class FrameSourceManager:
+    """Starts and stops one FrameSourceWorker per camera"""
+
+    def __init__(self, executor: FrameExecutor, access: Optional[MediaAccess] = None,
+                 stop_timeout: float = 5.0):
+        """
+        Initialize frame source manager
+
+        Args:
+            executor: Executor analyzing the pulled frames
+            access: Sources clients may open; without it only devices are accepted
+            stop_timeout: Seconds to wait for a replaced worker to finish
+        """
+        self.executor = executor
+        self.access = access or MediaAccess()
+        self.stop_timeout = stop_timeout
+        self._workers: Dict[str, FrameSourceWorker] = {}
+        self._lock = threading.Lock()
+
+    def _submit(self, camera_id: str, image: np.ndarray, capture_ts: float) -> Future:
+        return self.executor.submit(camera_id, tasks.analyze_image, camera_id, image, capture_ts)
+
+    def start(self, spec: FrameSourceSpec) -> FrameSourceWorker:
+        if spec.target_fps <= 0:
+            raise ValueError("target_fps must be positive")
+        self.access.check_source(spec.source)
+
+        while True:
+            with self._lock:
+                previous = self._workers.pop(spec.camera_id, None)
+                if previous is None:
+                    # A new source starts a new timeline; queued on the camera's shard ahead of its frames
+                    self.executor.submit(spec.camera_id, tasks.reset, spec.camera_id)
+                    worker = FrameSourceWorker(spec, self._submit)
+                    self._workers[spec.camera_id] = worker
+                    worker.start()
+                    return worker
+
+            # Joined outside the lock so other cameras' sources are not held up.
+            # Its last frames must be queued before the reset, never after it.
+            previous.stop()
+            previous.join(timeout=self.stop_timeout)
+            if previous.is_alive():
+                with self._lock:
+                    # Still running, so keep tracking it unless a concurrent start replaced it
+                    self._workers.setdefault(spec.camera_id, previous)
+                raise RuntimeError(f"Frame source for camera '{spec.camera_id}' did not stop "
+                                   f"within {self.stop_timeout}s")
+            # Loop in case a concurrent start registered another worker meanwhile
+
+    def stop(self, camera_id: str) -> bool:
+        with self._lock:
+            worker = self._workers.pop(camera_id, None)
+        if worker is None:
+            return False
+        worker.stop()
+        return True
+
+    def stop_all(self):
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+        for worker in workers:
+            worker.join(timeout=5)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {camera_id: worker.stats() for camera_id, worker in self._workers.items()}
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Optional, Tuple
+
+
+class LatestFrameSlot:
+    """
+    Single-slot mailbox between a stream reader and the analyzer.
+
+    A new frame replaces one that has not been picked up yet, so a slow
+    analyzer always works on the freshest frame and memory stays bounded.
+    Freshest is by capture time when frames carry one: a frame captured
+    before the waiting frame is dropped instead of replacing it.
+    """
+
+    def __init__(self):
+        self._frame: Optional[Tuple[bytes, Optional[float]]] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame: bytes, capture_ts: Optional[float] = None):
+        self.received += 1
+        if self._frame is not None:
+            self.dropped += 1
+            waiting_ts = self._frame[1]
+            if capture_ts is not None and waiting_ts is not None and capture_ts < waiting_ts:
+                return
+        self._frame = (frame, capture_ts)
+        self._ready.set()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[Tuple[bytes, Optional[float]]]:
+        """Wait for the next (frame, capture_ts); returns None once the slot is closed and drained"""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        frame, self._frame = self._frame, None
+        return frame
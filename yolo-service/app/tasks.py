@@ -0,0 +1,268 @@
+"""
+Frame analysis tasks executed by FrameExecutor workers.
+
+Each worker (thread pool shard or worker process) owns the SessionRegistry
+stored in this module, so the functions below always operate on the state of
+the process they run in.
+"""
+import logging
+import os
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from app.ingest import decode_frame, encode_raw_frame, reduce_for_analysis
+from app.metrics import REGISTRY, StageTimer, resident_memory_bytes
+from app.models.belt_monitor import BeltMonitor, BeltStatus
+from app.models.frame_context import NULL_TIMER, FrameContext, NullTimer
+from app.pipeline import FrameInfo, reusable_results, run_pipeline, to_jsonable
+from app.recorder import FrameRecorder
+from app.reorder import StaleFrameError
+from app.sessions import CameraConfig, CameraSession, SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+_sessions: Optional[SessionRegistry] = None
+_metrics_enabled = True
+
+
+def init_sessions(monitor_factory: Callable[[], BeltMonitor], max_sessions: int = 64,
+                  idle_ttl_seconds: float = 600, max_memory_mb: float = 512,
+                  default_config: Optional[CameraConfig] = None,
+                  analyzer_factories: Optional[Dict[str, Callable]] = None,
+                  metrics_enabled: bool = True,
+                  recorder_factory: Optional[Callable[[str], FrameRecorder]] = None):
+    """Create the session registry for this worker"""
+    global _sessions, _metrics_enabled
+    _metrics_enabled = metrics_enabled
+    _sessions = SessionRegistry(
+        monitor_factory=monitor_factory,
+        max_sessions=max_sessions,
+        idle_ttl_seconds=idle_ttl_seconds,
+        max_memory_mb=max_memory_mb,
+        default_config=default_config,
+        analyzer_factories=analyzer_factories,
+        recorder_factory=recorder_factory
+    )
+
+
+def get_sessions() -> SessionRegistry:
+    if _sessions is None:
+        raise RuntimeError("Session registry not initialized in this worker")
+    return _sessions
+
+
+def _timer(camera_id: str, analyzer: str, timings: bool):
+    """Stage timer for one frame; the NullTimer when neither metrics nor a breakdown are wanted"""
+    if not _metrics_enabled and not timings:
+        return NULL_TIMER
+    return StageTimer(camera_id, analyzer, REGISTRY if _metrics_enabled else None, breakdown=timings)
+
+
+def _timings_payload(timer: StageTimer, image: np.ndarray, analysis_scale: int) -> Dict:
+    height, width = image.shape[:2]
+    return {
+        'steps_ms': timer.breakdown(),
+        'resolution': [width, height],
+        'analysis_scale': analysis_scale,
+        'fast_paths': sorted(timer.fast_paths),
+    }
+
+
+def _decode(data: bytes, analysis_scale: int, timer):
+    with timer.stage('decode'):
+        frame = decode_frame(data, analysis_scale)
+    if frame.raw:
+        timer.fast_path('raw_frame')
+    elif frame.scale > 1:
+        timer.fast_path('reduced_decode')
+    return frame
+
+
+def _admit(session: CameraSession, capture_ts: Optional[float]) -> bool:
+    try:
+        return session.admit(capture_ts)
+    except StaleFrameError:
+        REGISTRY.inc('belt_frames_dropped_total', camera=session.camera_id, reason='stale')
+        raise
+
+
+def recorded_status(status: BeltStatus) -> Dict:
+    """A status as stored in recordings, for comparing replayed results"""
+    result = asdict(status)
+    result.pop('timings')
+    return to_jsonable(result)
+
+
+def _processed(sessions: SessionRegistry, camera_id: str):
+    sessions.touch(camera_id)
+    REGISTRY.inc('belt_frames_processed_total', camera=camera_id)
+
+
+def _analyze_gated(session: CameraSession, image: np.ndarray, capture_ts: Optional[float],
+                   timer: Union[StageTimer, NullTimer]) -> BeltStatus:
+    """
+    Run the camera's monitor, skipping the work the change gate finds unnecessary
+
+    Raises StaleFrameError for frames older than the camera's reorder window.
+    Late frames bypass the gate, whose references already hold a newer frame.
+    """
+    in_order = _admit(session, capture_ts)
+    ctx = FrameContext(image, timer)
+    with timer.stage('gate'):
+        decision = session.check_gate(ctx) if in_order else None
+    gate = decision.action if decision is not None else 'full'
+    if gate != 'full':
+        timer.fast_path(f"gate_{gate}")
+    with timer.stage('analyze'):
+        return session.monitor.analyze_frame(ctx, capture_ts, gate, late=not in_order)
+
+
+def analyze_frame(camera_id: str, data: bytes, capture_ts: Optional[float] = None,
+                  timings: bool = False) -> BeltStatus:
+    """
+    Decode an encoded or raw frame and run it through the camera's monitor
+
+    capture_ts overrides the timestamp in a raw frame's header. With timings
+    the status carries the frame's per-stage breakdown.
+    """
+    sessions = get_sessions()
+    session = sessions.session(camera_id)
+    timer = _timer(camera_id, 'monitor', timings)
+    frame = _decode(data, session.config.analysis_scale, timer)
+
+    capture_ts = _capture_time(capture_ts, frame.capture_ts)
+    status = _analyze_gated(session, frame.image, capture_ts, timer)
+    session.record('frame', data, capture_ts=capture_ts, result=recorded_status(status))
+    if timings:
+        status.timings = _timings_payload(timer, frame.image, session.config.analysis_scale)
+    _processed(sessions, camera_id)
+    return status
+
+
+def analyze_image(camera_id: str, image: np.ndarray, capture_ts: Optional[float] = None) -> BeltStatus:
+    """Run an already decoded full-resolution frame through the camera's monitor"""
+    sessions = get_sessions()
+    session = sessions.session(camera_id)
+    timer = _timer(camera_id, 'monitor', False)
+    with timer.stage('decode'):
+        analysis_image = reduce_for_analysis(image, session.config.analysis_scale)
+
+    status = _analyze_gated(session, analysis_image, capture_ts, timer)
+    if session.recording:
+        # Pulled frames were never encoded; they are archived losslessly
+        session.record('frame', encode_raw_frame(image, capture_ts), capture_ts=capture_ts,
+                       result=recorded_status(status))
+    _processed(sessions, camera_id)
+    return status
+
+
+def visualize_frame(camera_id: str, data: bytes, capture_ts: Optional[float] = None) -> Tuple[BeltStatus, bytes]:
+    """Analyze a frame and return its status with the annotated JPEG"""
+    sessions = get_sessions()
+    session = sessions.session(camera_id)
+
+    # The overlay is drawn on the full-resolution frame, analysis runs at the camera's scale
+    timer = _timer(camera_id, 'monitor', False)
+    with timer.stage('decode'):
+        frame = decode_frame(data)
+        analysis_image = reduce_for_analysis(frame.image, session.config.analysis_scale)
+
+    capture_ts = _capture_time(capture_ts, frame.capture_ts)
+    status = _analyze_gated(session, analysis_image, capture_ts, timer)
+    session.record('frame', data, capture_ts=capture_ts, result=recorded_status(status))
+    with timer.stage('visualize'):
+        annotated = session.monitor.visualize(frame.image, status)
+    _processed(sessions, camera_id)
+
+    with timer.stage('encode'):
+        _, buffer = cv2.imencode('.jpg', annotated)
+    return status, buffer.tobytes()
+
+
+def analyze_pipeline(camera_id: str, data: bytes, analyzers: List[str],
+                     capture_ts: Optional[float] = None, timings_requested: bool = False) -> Dict:
+    """
+    Run a chosen set of analyzers on one frame, sharing intermediates between them
+
+    With timings_requested the result also breaks each analyzer down into its stages.
+    """
+    sessions = get_sessions()
+    session = sessions.session(camera_id)
+
+    timer = _timer(camera_id, 'shared', timings_requested)
+    start = time.perf_counter()
+    frame = _decode(data, session.config.analysis_scale, timer)
+    decode_ms = (time.perf_counter() - start) * 1000
+
+    capture_ts = _capture_time(capture_ts, frame.capture_ts)
+    in_order = _admit(session, capture_ts)
+    ctx = FrameContext(frame.image, timer)
+
+    start = time.perf_counter()
+    with timer.stage('gate'):
+        decision = session.check_gate(ctx) if in_order else None
+    gate_ms = (time.perf_counter() - start) * 1000
+    if decision is not None and decision.action != 'full':
+        timer.fast_path(f"gate_{decision.action}")
+    info = FrameInfo(timestamp=capture_ts if capture_ts is not None else time.time(),
+                     gate=decision.action if decision is not None else 'full',
+                     late=not in_order)
+
+    # Results still valid for this frame are returned without running their stages
+    reused = reusable_results(session, analyzers, info)
+    results, timings = run_pipeline(ctx, session, [a for a in analyzers if a not in reused], info)
+    session.last_results.update(results)
+    results.update(reused)
+    _processed(sessions, camera_id)
+
+    jsonable = to_jsonable({name: results[name] for name in analyzers})
+    session.record('pipeline', data, capture_ts=capture_ts, timestamp=info.timestamp,
+                   analyzers=analyzers, result=jsonable)
+    result = {
+        'results': jsonable,
+        'timings_ms': {'decode': round(decode_ms, 3), 'gate': round(gate_ms, 3), **timings},
+        'resolution': [ctx.width, ctx.height],
+        'gate': {**asdict(decision), 'reused': sorted(reused)} if decision is not None else None,
+        'late': info.late
+    }
+    if timings_requested:
+        result['timings'] = _timings_payload(timer, frame.image, session.config.analysis_scale)
+    return result
+
+
+def _capture_time(explicit: Optional[float], embedded: Optional[float]) -> Optional[float]:
+    # A timestamp sent with the request wins over one in the raw frame header
+    return explicit if explicit is not None else embedded
+
+
+def configure(camera_id: str, changes: Dict) -> Dict:
+    return get_sessions().configure(camera_id, **changes).to_dict()
+
+
+def get_config(camera_id: str) -> Dict:
+    return get_sessions().config(camera_id).to_dict()
+
+
+def reset(camera_id: Optional[str] = None) -> int:
+    return get_sessions().reset(camera_id)
+
+
+def set_recording(camera_id: str, enabled: bool) -> Dict:
+    return get_sessions().set_recording(camera_id, enabled)
+
+
+def recording_stats(camera_id: str) -> Optional[Dict]:
+    return get_sessions().recording(camera_id)
+
+
+def session_stats() -> Dict:
+    return get_sessions().stats()
+
+
+def metrics_snapshot() -> Dict:
+    """Samples recorded by this worker process, with its resident memory"""
+    return {**REGISTRY.snapshot(), 'pid': os.getpid(), 'rss_bytes': resident_memory_bytes()}
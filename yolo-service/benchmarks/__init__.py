@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the analyzers.
+
+Run from the yolo-service directory so the app package is importable, e.g.
+
+    python -m benchmarks.alignment_backends --frames 200
+"""
@@ -0,0 +1,127 @@
+"""
+Compare the Hough and projection-profile alignment backends.
+
+Both backends run a full edge search on every frame (tracking and ROI off),
+each on a fresh FrameContext so grayscale and edge images are paid for by
+the backend that needs them. Reports per-backend latency and detection rate,
+the agreement of the projection edges with Hough, and, for synthetic frames,
+the error against ground truth.
+
+    python -m benchmarks.alignment_backends --frames 200 --resolution 1920x1080
+    python -m benchmarks.alignment_backends --video /videos/belt.mp4 --output result.json
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from app.models.belt_alignment import BeltAlignmentDetector
+from app.models.edge_projection import ALIGNMENT_BACKENDS
+from app.models.frame_context import FrameContext
+from benchmarks.synthetic import BeltScene, frame_sequence
+
+
+def load_frames(video: Optional[str], count: int, resolution: str):
+    """Frames and ground truth (None for recorded video)"""
+    if video is None:
+        width, height = (int(v) for v in resolution.split('x'))
+        scene = BeltScene(width=width, height=height)
+        return [(image, truth) for image, truth in frame_sequence(scene, count, drift_px=width * 0.05)]
+
+    frames = []
+    capture = cv2.VideoCapture(video)
+    try:
+        while len(frames) < count:
+            ok, image = capture.read()
+            if not ok:
+                break
+            frames.append((image, None))
+    finally:
+        capture.release()
+    return frames
+
+
+def center_x(left_edge, right_edge) -> Optional[float]:
+    if left_edge is None or right_edge is None:
+        return None
+    return float((left_edge[0] + left_edge[2] + right_edge[0] + right_edge[2]) / 4)
+
+
+def run_backend(backend: str, frames) -> Dict:
+    detector = BeltAlignmentDetector(edge_tracking=False, alignment_backend=backend)
+    latencies: List[float] = []
+    centers: List[Optional[float]] = []
+
+    for image, _ in frames:
+        ctx = FrameContext(image)
+        start = time.perf_counter()
+        left_edge, right_edge = detector.detect_belt_edges(ctx)
+        latencies.append((time.perf_counter() - start) * 1000)
+        centers.append(center_x(left_edge, right_edge))
+
+    latencies_ms = np.array(latencies)
+    return {
+        'latency_ms': {
+            'mean': round(float(latencies_ms.mean()), 3),
+            'p50': round(float(np.percentile(latencies_ms, 50)), 3),
+            'p99': round(float(np.percentile(latencies_ms, 99)), 3),
+        },
+        'detection_rate': round(sum(c is not None for c in centers) / len(centers), 3),
+        'centers': centers,
+    }
+
+
+def center_errors(centers: List[Optional[float]], reference: List[Optional[float]],
+                  tolerance_px: float) -> Optional[Dict]:
+    errors = np.array([abs(c - r) for c, r in zip(centers, reference) if c is not None and r is not None])
+    if errors.size == 0:
+        return None
+    return {
+        'frames': int(errors.size),
+        'median_px': round(float(np.median(errors)), 2),
+        'p95_px': round(float(np.percentile(errors, 95)), 2),
+        'within_tolerance': round(float(np.mean(errors <= tolerance_px)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', help="Recorded belt video (default: synthetic frames)")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--resolution', default='1280x720', help="Synthetic frame size WxH")
+    parser.add_argument('--tolerance', type=float, default=3.0, help="Agreement tolerance in pixels")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.resolution)
+    if not frames:
+        raise SystemExit("No frames to benchmark")
+
+    results = {backend: run_backend(backend, frames) for backend in ALIGNMENT_BACKENDS}
+    truth = [t['center'] if t is not None else None for _, t in frames]
+
+    report = {
+        'source': args.video or f"synthetic {args.resolution}",
+        'frames': len(frames),
+        'backends': {},
+        'projection_vs_hough': center_errors(results['projection']['centers'],
+                                             results['hough']['centers'], args.tolerance),
+    }
+    for backend, result in results.items():
+        centers = result.pop('centers')
+        if args.video is None:
+            result['error_vs_truth'] = center_errors(centers, truth, args.tolerance)
+        report['backends'][backend] = result
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
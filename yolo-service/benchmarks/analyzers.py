@@ -0,0 +1,246 @@
+"""
+Benchmark the belt analyzers on synthetic conveyor frames.
+
+BeltMonitor, BeltAlignmentDetector, BeltSpeedMonitor and BeltTearDetector
+each analyze the same drifting, moving belt (with injected tears) at every
+requested resolution. Each analyzer keeps its own state and gets a fresh
+FrameContext per frame, so nothing is shared between them. Reports
+throughput, p50/p99 latency, peak allocation per frame, and accuracy
+against the generator's ground truth, so a speed-up can be checked against
+what it costs in accuracy.
+
+The first --memory-frames frames of each resolution are a warm-up that
+runs under tracemalloc to measure peak allocation; only the frames after
+them are timed. tracemalloc sees numpy arrays, including those returned by
+OpenCV, but not OpenCV's internal buffers.
+
+    python -m benchmarks.analyzers --frames 60 --output baseline.json
+    python -m benchmarks.analyzers --resolutions 1080p --analyzers tears --tears 4
+"""
+import argparse
+import json
+import resource
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.models.belt_alignment import BeltAlignmentDetector
+from app.models.belt_monitor import BeltMonitor
+from app.models.belt_speed import BeltSpeedMonitor
+from app.models.belt_tear import BeltTearDetector
+from app.models.frame_context import FrameContext
+from benchmarks.synthetic import BeltScene, Tear, frame_sequence, pixels_per_meter
+
+RESOLUTIONS = {
+    '480p': (640, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+
+
+def make_scene(resolution: str, args) -> BeltScene:
+    width, height = RESOLUTIONS[resolution]
+    # Tears are spread along the surface so some are always in view
+    tears = [Tear(across=0.2 + 0.6 * (i % 3) / 2, along_px=int(height * (i + 0.5) / args.tears),
+                  length_px=width // 12, width_px=max(3, width // 320), angle_deg=15 * i)
+             for i in range(args.tears)]
+    return BeltScene(width=width, height=height, offset_px=width * args.offset,
+                     orientation=args.orientation, noise_sigma=args.noise,
+                     lighting_gradient=args.lighting_gradient, tears=tears)
+
+
+class AnalyzerRun:
+    """One analyzer over a frame sequence: its latencies, peak allocation and accuracy samples"""
+
+    def __init__(self, analyze: Callable[[FrameContext, Dict], Dict]):
+        self.analyze = analyze
+        self.latencies: List[float] = []
+        self.peak_bytes = 0
+        self.samples: List[Dict] = []
+
+    def run(self, image: np.ndarray, truth: Dict, timed: bool):
+        ctx = FrameContext(image)
+        if timed:
+            start = time.perf_counter()
+            sample = self.analyze(ctx, truth)
+            self.latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            sample = self.analyze(ctx, truth)
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1] - baseline)
+        self.samples.append(sample)
+
+
+def monitor_analyzer(scene: BeltScene) -> Callable:
+    monitor = BeltMonitor(belt_width_mm=scene.belt_width_m * 1000, belt_orientation=scene.orientation)
+
+    def analyze(ctx: FrameContext, truth: Dict) -> Dict:
+        status = monitor.analyze_frame(ctx, truth['timestamp'])
+        return {
+            'detected': status.left_edge is not None,
+            'deviation_percentage': status.alignment_percentage,
+            'speed_mps': status.speed_mps,
+        }
+    return analyze
+
+
+def alignment_analyzer(scene: BeltScene) -> Callable:
+    detector = BeltAlignmentDetector(belt_width_mm=scene.belt_width_m * 1000)
+
+    def analyze(ctx: FrameContext, truth: Dict) -> Dict:
+        status = detector.analyze_alignment(ctx)
+        return {
+            'detected': status.direction not in ('unknown', 'error'),
+            'deviation_percentage': status.deviation_percentage,
+        }
+    return analyze
+
+
+def speed_analyzer(scene: BeltScene) -> Callable:
+    monitor = BeltSpeedMonitor(belt_orientation=scene.orientation, pixels_per_meter=pixels_per_meter(scene),
+                               assumed_fps=scene.fps)
+
+    def analyze(ctx: FrameContext, truth: Dict) -> Dict:
+        status = monitor.analyze_speed(ctx, truth['timestamp'])
+        return {'speed_mps': status.current_speed_mps}
+    return analyze
+
+
+def tear_analyzer(scene: BeltScene) -> Callable:
+    detector = BeltTearDetector(belt_width_mm=scene.belt_width_m * 1000,
+                                pixel_to_mm=1000 / pixels_per_meter(scene))
+
+    def analyze(ctx: FrameContext, truth: Dict) -> Dict:
+        status = detector.analyze_tears(ctx)
+        return {'tears': [[t['x'], t['y'], t['width'], t['height']] for t in status.tear_locations]}
+    return analyze
+
+
+ANALYZERS = {
+    'monitor': monitor_analyzer,
+    'alignment': alignment_analyzer,
+    'speed': speed_analyzer,
+    'tears': tear_analyzer,
+}
+
+
+def _overlaps(a: List[int], b: List[int]) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def _summary(values: List[float]) -> Optional[Dict]:
+    if not values:
+        return None
+    values = np.array(values)
+    return {'median': round(float(np.median(values)), 3), 'p95': round(float(np.percentile(values, 95)), 3)}
+
+
+def accuracy(samples: List[Dict], truths: List[Dict]) -> Dict:
+    """Errors against ground truth for whatever the analyzer reports"""
+    result = {}
+    first = samples[0]
+    if 'detected' in first:
+        result['detection_rate'] = round(float(np.mean([s['detected'] for s in samples])), 3)
+    if 'deviation_percentage' in first:
+        result['deviation_error_pct'] = _summary([abs(s['deviation_percentage'] - t['deviation_percentage'])
+                                                  for s, t in zip(samples, truths) if s.get('detected')])
+    if 'speed_mps' in first:
+        # The first frame has nothing to measure against
+        result['speed_error_pct'] = _summary([abs(s['speed_mps'] - t['speed_mps']) / t['speed_mps'] * 100
+                                              for s, t in zip(samples[1:], truths[1:]) if t['speed_mps'] > 0])
+    if 'tears' in first:
+        truth_count = sum(len(t['tears']) for t in truths)
+        found = sum(any(_overlaps(box, d) for d in s['tears']) for s, t in zip(samples, truths) for box in t['tears'])
+        false_positives = sum(not any(_overlaps(d, box) for box in t['tears'])
+                              for s, t in zip(samples, truths) for d in s['tears'])
+        result['tear_recall'] = round(found / truth_count, 3) if truth_count else None
+        result['false_tears_per_frame'] = round(false_positives / len(samples), 3)
+    return result
+
+
+def run_resolution(resolution: str, analyzers: List[str], args) -> Dict:
+    scene = make_scene(resolution, args)
+    runs = {name: AnalyzerRun(ANALYZERS[name](scene)) for name in analyzers}
+    truths = []
+
+    count = args.memory_frames + args.frames
+    tracemalloc.start()
+    try:
+        for index, (image, truth) in enumerate(frame_sequence(scene, count, drift_px=scene.width * args.drift,
+                                                              travel_px=args.travel, flicker=args.flicker)):
+            timed = index >= args.memory_frames
+            if timed and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            truths.append(truth)
+            for run in runs.values():
+                run.run(image, truth, timed)
+    finally:
+        tracemalloc.stop()
+
+    report = {}
+    for name, run in runs.items():
+        latencies = np.array(run.latencies)
+        report[name] = {
+            'throughput_fps': round(float(len(latencies) / latencies.sum() * 1000), 2),
+            'latency_ms': {
+                'mean': round(float(latencies.mean()), 3),
+                'p50': round(float(np.percentile(latencies, 50)), 3),
+                'p99': round(float(np.percentile(latencies, 99)), 3),
+            },
+            'peak_alloc_mb': round(run.peak_bytes / 2 ** 20, 2),
+            'accuracy': accuracy(run.samples, truths),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', default=','.join(RESOLUTIONS),
+                        help=f"Comma-separated subset of {', '.join(RESOLUTIONS)}")
+    parser.add_argument('--analyzers', default=','.join(ANALYZERS),
+                        help=f"Comma-separated subset of {', '.join(ANALYZERS)}")
+    parser.add_argument('--frames', type=int, default=60, help="Timed frames per resolution")
+    parser.add_argument('--memory-frames', type=int, default=5, help="Warm-up frames measured for memory")
+    parser.add_argument('--orientation', default='vertical', choices=('horizontal', 'vertical'),
+                        help="Direction the belt surface travels in the image")
+    parser.add_argument('--travel', type=int, default=6, help="Belt surface travel per frame in pixels")
+    parser.add_argument('--offset', type=float, default=0.03, help="Belt offset as a fraction of the frame width")
+    parser.add_argument('--drift', type=float, default=0.02,
+                        help="Lateral wander amplitude as a fraction of the frame width")
+    parser.add_argument('--tears', type=int, default=2, help="Tears cut into the belt surface")
+    parser.add_argument('--noise', type=float, default=2.0, help="Sensor noise sigma in gray levels")
+    parser.add_argument('--lighting-gradient', type=float, default=0.2,
+                        help="Brightness change across the frame, as a fraction")
+    parser.add_argument('--flicker', type=float, default=0.02, help="Per-frame brightness change, as a fraction")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    resolutions = [r.strip().lower() for r in args.resolutions.split(',') if r.strip()]
+    analyzers = [a.strip() for a in args.analyzers.split(',') if a.strip()]
+    unknown = [r for r in resolutions if r not in RESOLUTIONS] + [a for a in analyzers if a not in ANALYZERS]
+    if unknown:
+        raise SystemExit(f"Unknown resolutions or analyzers: {', '.join(unknown)}")
+    if args.frames < 2:
+        raise SystemExit("--frames must be at least 2")
+
+    report = {
+        'scene': {key: value for key, value in vars(args).items()
+                  if key not in ('resolutions', 'analyzers', 'output')},
+        'resolutions': {resolution: run_resolution(resolution, analyzers, args) for resolution in resolutions},
+        # ru_maxrss is in kilobytes on Linux
+        'process_peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
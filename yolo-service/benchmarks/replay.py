@@ -0,0 +1,173 @@
+"""
+Replay recorded camera traffic through the analyzers.
+
+Reads an archive written by app.recorder (one segment, a camera's
+directory or the whole recordings directory) and runs every frame through
+the same task the service used, with the recorded timestamps and camera
+settings. Reports throughput and latency, and every field whose result
+differs from the recorded one, so an optimization can be shown to be faster
+without changing detections.
+
+Frames are replayed as fast as possible, or with --realtime at the pace
+they were recorded. --analyzers runs a different set of pipeline analyzers
+on every frame instead; there is no recorded output to compare against then.
+
+Some differences are expected without any code change. The first frames
+after recording started may differ, because the live session already held
+frame state from before the recording. Replaying the same archive twice
+shows this noise floor.
+
+    python -m benchmarks.replay /app/logs/recordings/cam-1 --output replay.json
+    python -m benchmarks.replay recording.blta --analyzers alignment,tears --realtime
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app import tasks
+from app.models.belt_monitor import BeltMonitor
+from app.pipeline import ANALYZERS, default_analyzer_factories
+from app.recorder import archive_segments, read_segment
+from app.reorder import StaleFrameError
+from app.tasks import recorded_status
+
+
+def records(path: str) -> Iterator[Tuple[str, Dict]]:
+    """(camera_id, record) pairs of an archive in recording order"""
+    for segment in archive_segments(path):
+        camera_id = None
+        for record in read_segment(segment):
+            camera_id = record.get('camera_id', camera_id)
+            yield camera_id, record
+
+
+def differences(recorded, replayed, tolerance: float, path: str = '') -> List[str]:
+    """Dotted paths of the fields that differ; timestamps are ignored"""
+    if isinstance(recorded, dict) and isinstance(replayed, dict):
+        diffs = []
+        for key in sorted(set(recorded) | set(replayed)):
+            if key == 'timestamp':
+                continue
+            diffs.extend(differences(recorded.get(key), replayed.get(key), tolerance, f"{path}.{key}".lstrip('.')))
+        return diffs
+    if isinstance(recorded, list) and isinstance(replayed, list) and len(recorded) == len(replayed):
+        return [d for i, (a, b) in enumerate(zip(recorded, replayed))
+                for d in differences(a, b, tolerance, f"{path}[{i}]")]
+    numbers = (int, float)
+    if (isinstance(recorded, numbers) and isinstance(replayed, numbers)
+            and not isinstance(recorded, bool) and not isinstance(replayed, bool)):
+        return [] if abs(recorded - replayed) <= tolerance else [path]
+    return [] if recorded == replayed else [path]
+
+
+def replay_record(camera_id: str, record: Dict, analyzers: Optional[List[str]]) -> Optional[Dict]:
+    """Run one recorded frame and return the result comparable with the recorded one"""
+    timestamp = record.get('timestamp', record['result'].get('timestamp'))
+    if analyzers is not None:
+        tasks.analyze_pipeline(camera_id, record['data'], analyzers, timestamp)
+        return None
+    if record['kind'] == 'pipeline':
+        return tasks.analyze_pipeline(camera_id, record['data'], record['analyzers'], timestamp)['results']
+    return recorded_status(tasks.analyze_frame(camera_id, record['data'], timestamp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archive', help="Segment file, camera directory or recordings directory")
+    parser.add_argument('--analyzers', help=f"Comma-separated subset of {', '.join(ANALYZERS)} "
+                                            "to run instead of the recorded task")
+    parser.add_argument('--realtime', action='store_true', help="Replay at the recorded pace")
+    parser.add_argument('--tolerance', type=float, default=1e-6, help="Allowed difference of numeric fields")
+    parser.add_argument('--examples', type=int, default=10, help="Differing frames to include in the report")
+    parser.add_argument('--belt-width-mm', type=float, default=1200)
+    parser.add_argument('--nominal-speed', type=float, default=1.5)
+    parser.add_argument('--pixel-to-mm', type=float, default=0.5)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    analyzers = None
+    if args.analyzers:
+        analyzers = [a.strip() for a in args.analyzers.split(',') if a.strip()]
+        unknown = [a for a in analyzers if a not in ANALYZERS]
+        if not analyzers or unknown:
+            raise SystemExit(f"--analyzers must be a subset of {', '.join(ANALYZERS)}")
+
+    tasks.init_sessions(
+        partial(BeltMonitor, belt_width_mm=args.belt_width_mm, nominal_speed_mps=args.nominal_speed),
+        max_sessions=1024, idle_ttl_seconds=0, max_memory_mb=64 * 1024,
+        analyzer_factories=default_analyzer_factories(args.belt_width_mm, args.nominal_speed, args.pixel_to_mm),
+        metrics_enabled=False
+    )
+
+    latencies: List[float] = []
+    field_diffs: Counter = Counter()
+    examples: List[Dict] = []
+    frames_differing = stale = 0
+    first_recorded = start = None
+
+    for index, (camera_id, record) in enumerate(records(args.archive)):
+        if record['kind'] == 'config':
+            # Rotated segments repeat the settings; only a real change resets the session
+            if record.get('config') and tasks.get_config(camera_id) != record['config']:
+                tasks.configure(camera_id, record['config'])
+            continue
+
+        if args.realtime:
+            if first_recorded is None:
+                first_recorded, start = record['recorded_at'], time.perf_counter()
+            delay = (record['recorded_at'] - first_recorded) - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        begin = time.perf_counter()
+        try:
+            result = replay_record(camera_id, record, analyzers)
+        except StaleFrameError:
+            stale += 1
+            continue
+        latencies.append((time.perf_counter() - begin) * 1000)
+
+        if result is not None:
+            diffs = differences(record['result'], result, args.tolerance)
+            if diffs:
+                frames_differing += 1
+                field_diffs.update(diffs)
+                if len(examples) < args.examples:
+                    examples.append({'record': index, 'camera_id': camera_id, 'fields': diffs,
+                                     'recorded': record['result'], 'replayed': result})
+
+    if not latencies:
+        raise SystemExit("No frames to replay")
+
+    latencies_ms = np.array(latencies)
+    report = {
+        'archive': args.archive,
+        'frames': len(latencies),
+        'stale_frames': stale,
+        'throughput_fps': round(float(len(latencies) / latencies_ms.sum() * 1000), 2),
+        'latency_ms': {
+            'mean': round(float(latencies_ms.mean()), 3),
+            'p50': round(float(np.percentile(latencies_ms, 50)), 3),
+            'p99': round(float(np.percentile(latencies_ms, 99)), 3),
+        },
+        'differences': None if analyzers is not None else {
+            'frames': frames_differing,
+            'fields': dict(field_diffs.most_common()),
+            'examples': examples,
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Synthetic conveyor frames with known belt geometry.
+
+Frames show a textured belt on a darker background. Edge positions, belt
+speed and the positions of injected tears are known exactly, so benchmarks
+can score detections against ground truth as well as against each other.
+"""
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class Tear:
+    """A jagged dark slit cut into the belt surface, moving with it"""
+    across: float  # Position across the belt, as a fraction of the belt width from its left edge
+    along_px: int  # Position along the belt surface texture
+    length_px: int = 60
+    width_px: int = 4
+    angle_deg: float = 0.0  # 0 runs across the belt
+    jaggedness: float = 0.3  # Sideways zig-zag of the slit, as a fraction of its length
+
+
+@dataclass
+class BeltScene:
+    """Geometry and appearance of a synthetic belt"""
+    width: int = 1280
+    height: int = 720
+    belt_width_ratio: float = 0.4  # Belt width as a fraction of the frame width
+    offset_px: float = 0.0  # Belt centre offset from the frame centre
+    slant: float = 0.03  # Edge x change per row (camera not square to the belt)
+    orientation: str = 'vertical'  # Direction the surface travels in the image
+    background: int = 45
+    belt_level: int = 135
+    texture_contrast: int = 25
+    noise_sigma: float = 2.0
+    lighting_gain: float = 1.0  # Overall brightness multiplier
+    lighting_gradient: float = 0.0  # Brightness change from the left to the right of the frame
+    tears: List[Tear] = field(default_factory=list)
+    dirt: int = 0  # Dark specks and short scuffs scattered over the surface
+    belt_width_m: float = 1.2  # Physical belt width, for speed ground truth
+    fps: float = 30.0
+    seed: int = 0
+
+
+def _texture(scene: BeltScene, length: int) -> np.ndarray:
+    rng = np.random.default_rng(scene.seed)
+    noise = rng.normal(0, scene.texture_contrast, (scene.height, length)).astype(np.float32)
+    texture = cv2.GaussianBlur(noise, (5, 5), 0)
+
+    if scene.dirt:
+        dirt_rng = np.random.default_rng(scene.seed + 3)
+        centers = dirt_rng.uniform((0, 0), (length, scene.height), (scene.dirt, 2)).astype(int)
+        sizes = dirt_rng.integers(1, 7, (scene.dirt, 2))
+        angles = dirt_rng.uniform(0, 180, scene.dirt)
+        levels = dirt_rng.uniform(-60, -25, scene.dirt)
+        for (cx, cy), (a, b), angle, level in zip(centers, sizes, angles, levels):
+            cv2.ellipse(texture, (int(cx), int(cy)), (int(a), int(b)), float(angle), 0, 360, float(level), -1)
+
+    for index, tear in enumerate(scene.tears):
+        points = np.round(_tear_points(scene, tear, index)).astype(np.int32)
+        cv2.polylines(texture, [points], False, float(scene.background - scene.belt_level), tear.width_px)
+    return texture
+
+
+def _tear_points(scene: BeltScene, tear: Tear, index: int) -> np.ndarray:
+    """Vertices of a tear's zig-zag in texture coordinates"""
+    belt_width = scene.width * scene.belt_width_ratio
+    center = np.array([scene.width / 2 - belt_width / 2 + tear.across * belt_width, tear.along_px])
+    angle = np.deg2rad(tear.angle_deg)
+    direction = np.array([np.cos(angle), np.sin(angle)])
+    normal = np.array([-direction[1], direction[0]])
+
+    rng = np.random.default_rng(scene.seed + 100 + index)
+    steps = np.linspace(-0.5, 0.5, 9) * tear.length_px
+    sideways = rng.uniform(-0.5, 0.5, steps.size) * tear.jaggedness * tear.length_px / 4
+    sideways[[0, -1]] = 0
+    return center + steps[:, None] * direction + sideways[:, None] * normal
+
+
+def _surface_shift(scene: BeltScene, travel_px: int) -> Tuple[int, int]:
+    """Texture roll (rows, columns) for a travel distance; the texture rides with the belt offset"""
+    shift = int(round(scene.offset_px))
+    if scene.orientation == 'vertical':
+        return travel_px % scene.height, shift
+    return 0, (shift + travel_px) % (scene.width * 2)
+
+
+def edges_at(scene: BeltScene, y) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact left and right edge x of the belt at row(s) y"""
+    belt_width = scene.width * scene.belt_width_ratio
+    center = scene.width / 2 + scene.offset_px + scene.slant * (np.asarray(y) - (scene.height - 1) / 2)
+    return center - belt_width / 2, center + belt_width / 2
+
+
+def tear_boxes(scene: BeltScene, travel_px: int) -> List[List[int]]:
+    """Bounding boxes [x, y, w, h] of the tears fully visible on the belt"""
+    rows, cols = _surface_shift(scene, travel_px)
+    boxes = []
+    for index, tear in enumerate(scene.tears):
+        points = _tear_points(scene, tear, index)
+        pad = tear.width_px / 2
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        left = (x0 - pad + cols) % (scene.width * 2)
+        top = (y0 - pad + rows) % scene.height
+        w, h = x1 - x0 + 2 * pad, y1 - y0 + 2 * pad
+        if left + w > scene.width or top + h > scene.height:
+            continue  # Off screen or wrapping around the texture
+        belt_left, belt_right = edges_at(scene, top + h / 2)
+        if belt_left <= left and left + w <= belt_right:
+            boxes.append([int(left), int(top), int(np.ceil(w)), int(np.ceil(h))])
+    return boxes
+
+
+def render_frame(scene: BeltScene, travel_px: int = 0,
+                 texture: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict]:
+    """
+    Render one BGR frame
+
+    Args:
+        scene: Belt geometry and appearance
+        travel_px: How far the belt surface has moved along its length
+        texture: Precomputed surface texture, reused across frames of a sequence
+
+    Returns:
+        Tuple of (image, ground truth with left, right and center at mid-height,
+        deviation_percentage and the visible tear boxes)
+    """
+    if texture is None:
+        texture = _texture(scene, scene.width * 2)
+
+    ys = np.arange(scene.height)
+    left, right = edges_at(scene, ys)
+    xs = np.arange(scene.width)
+    belt = (xs[None, :] >= left[:, None]) & (xs[None, :] < right[:, None])
+
+    rows, cols = _surface_shift(scene, travel_px)
+    surface = np.roll(texture, (rows, cols), axis=(0, 1))[:, :scene.width]
+    image = np.where(belt, scene.belt_level + surface, scene.background).astype(np.float32)
+
+    if scene.lighting_gain != 1.0 or scene.lighting_gradient:
+        ramp = scene.lighting_gain * (1 + scene.lighting_gradient * (xs / scene.width - 0.5))
+        image *= ramp[None, :].astype(np.float32)
+
+    if scene.noise_sigma > 0:
+        rng = np.random.default_rng(scene.seed + 1 + travel_px)
+        image += rng.normal(0, scene.noise_sigma, image.shape).astype(np.float32)
+
+    gray = np.clip(image, 0, 255).astype(np.uint8)
+    mid_left, mid_right = edges_at(scene, (scene.height - 1) / 2)
+    center = float((mid_left + mid_right) / 2)
+    truth = {
+        'left': float(mid_left),
+        'right': float(mid_right),
+        'center': center,
+        'deviation_percentage': abs(center - scene.width / 2) / (scene.width / 2) * 100,
+        'tears': tear_boxes(scene, travel_px),
+    }
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR), truth
+
+
+def pixels_per_meter(scene: BeltScene) -> float:
+    """Belt surface scale implied by the belt's width in pixels and in meters"""
+    return scene.width * scene.belt_width_ratio / scene.belt_width_m
+
+
+def frame_sequence(scene: BeltScene, count: int, drift_px: float = 0.0, drift_period: int = 120,
+                   travel_px: int = 0, flicker: float = 0.0) -> Iterator[Tuple[np.ndarray, Dict]]:
+    """
+    Yield consecutive frames
+
+    Ground truth also holds the frame's capture timestamp and the belt speed
+    in m/s implied by travel_px, scene.fps and the belt's physical width.
+
+    Args:
+        drift_px: Amplitude of the lateral belt wander around scene.offset_px
+        drift_period: Frames per wander cycle
+        travel_px: Belt surface travel per frame
+        flicker: Amplitude of random per-frame brightness changes, as a fraction
+    """
+    texture = _texture(scene, scene.width * 2)
+    rng = np.random.default_rng(scene.seed + 2)
+    speed_mps = travel_px * scene.fps / pixels_per_meter(scene)
+    for index in range(count):
+        drift = drift_px * np.sin(2 * np.pi * index / drift_period)
+        gain = scene.lighting_gain * (1 + rng.uniform(-flicker, flicker)) if flicker else scene.lighting_gain
+        frame_scene = replace(scene, offset_px=scene.offset_px + drift, lighting_gain=gain)
+        image, truth = render_frame(frame_scene, travel_px * index, texture)
+        truth['timestamp'] = index / scene.fps
+        truth['speed_mps'] = speed_mps
+        yield image, truth
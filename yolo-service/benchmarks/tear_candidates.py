@@ -0,0 +1,140 @@
+"""
+Compare tear candidate extraction against the per-contour reference.
+
+BeltTearDetector.find_tear_candidates computes area, bounding box, extent
+and aspect ratio of all contours at once and builds convex hulls only for
+the survivors. This benchmark runs it and the original loop over every
+external contour on the edge images of dirty synthetic belts. It reports
+the contour counts and latencies, and checks that both return the same
+candidates.
+
+    python -m benchmarks.tear_candidates --resolutions 1080p,4k --dirt 0,2500,5000
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.models.belt_tear import BeltTearDetector
+from benchmarks.analyzers import RESOLUTIONS
+from benchmarks.synthetic import BeltScene, Tear, frame_sequence, pixels_per_meter
+
+
+def contour_candidates(detector: BeltTearDetector, edge_image: np.ndarray) -> Tuple[List[Dict], int]:
+    """The per-contour filter find_tear_candidates replaced, kept as the reference; also returns the contour count"""
+    contours, _ = cv2.findContours(edge_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    candidates = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area < 50:
+            continue
+        x, y, w, h = cv2.boundingRect(contour)
+        aspect_ratio = max(w, h) / min(w, h) if min(w, h) > 0 else 1
+        extent = area / (w * h) if w * h > 0 else 0
+        hull_area = cv2.contourArea(cv2.convexHull(contour))
+        solidity = area / hull_area if hull_area > 0 else 0
+        if aspect_ratio > 3 and extent < 0.6 and solidity < 0.8:
+            length_mm = max(w, h) * detector.pixel_to_mm
+            width_mm = min(w, h) * detector.pixel_to_mm
+            if length_mm >= detector.min_tear_length_mm and width_mm >= detector.min_tear_width_mm:
+                candidates.append({
+                    'contour': contour,
+                    'bbox': (x, y, w, h),
+                    'area_pixels': area,
+                    'area_mm2': area * (detector.pixel_to_mm ** 2),
+                    'length_mm': length_mm,
+                    'width_mm': width_mm,
+                    'aspect_ratio': aspect_ratio,
+                    'center': (x + w // 2, y + h // 2)
+                })
+    return candidates, len(contours)
+
+
+def same_candidates(a: List[Dict], b: List[Dict]) -> bool:
+    if len(a) != len(b):
+        return False
+    for left, right in zip(a, b):
+        if left.keys() != right.keys() or not np.array_equal(left['contour'], right['contour']):
+            return False
+        if any(left[key] != right[key] for key in left if key != 'contour'):
+            return False
+    return True
+
+
+def edge_images(resolution: str, dirt: int, count: int) -> Tuple[List[np.ndarray], BeltTearDetector]:
+    """Edge images of a dirty belt, as the tear detector produces them for whole frames"""
+    width, height = RESOLUTIONS[resolution]
+    tears = [Tear(across=0.25 + 0.25 * i, along_px=height * (i + 1) // 4, length_px=width // 10,
+                  width_px=max(3, width // 320), angle_deg=10 * i) for i in range(3)]
+    scene = BeltScene(width=width, height=height, texture_contrast=35, tears=tears,
+                      dirt=dirt * width * height // (1280 * 720))
+    detector = BeltTearDetector(pixel_to_mm=1000 / pixels_per_meter(scene))
+    return [detector.detect_edges(detector.preprocess_image(image))
+            for image, _ in frame_sequence(scene, count, travel_px=5)], detector
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_case(resolution: str, dirt: int, frames: int, repeats: int) -> Dict:
+    images, detector = edge_images(resolution, dirt, frames)
+    contour_counts, reference_ms, vectorized_ms = [], [], []
+    identical = True
+    candidates = 0
+
+    for edges in images:
+        reference, contour_count = contour_candidates(detector, edges)
+        result = detector.find_tear_candidates(edges)
+        identical &= same_candidates(reference, result)
+        contour_counts.append(contour_count)
+        candidates += len(result)
+        for _ in range(repeats):
+            reference_ms.append(timed(contour_candidates, detector, edges))
+            vectorized_ms.append(timed(detector.find_tear_candidates, edges))
+
+    reference_p50 = float(np.percentile(reference_ms, 50))
+    vectorized_p50 = float(np.percentile(vectorized_ms, 50))
+    return {
+        'resolution': resolution,
+        'dirt_per_720p_frame': dirt,
+        'contours_per_frame': round(float(np.mean(contour_counts)), 1),
+        'candidates_per_frame': round(candidates / len(images), 2),
+        'per_contour_ms': {'p50': round(reference_p50, 3), 'p99': round(float(np.percentile(reference_ms, 99)), 3)},
+        'vectorized_ms': {'p50': round(vectorized_p50, 3), 'p99': round(float(np.percentile(vectorized_ms, 99)), 3)},
+        'speedup': round(reference_p50 / vectorized_p50, 2),
+        'identical': identical,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', default='1080p,4k', help=f"Subset of {', '.join(RESOLUTIONS)}")
+    parser.add_argument('--dirt', default='0,2500,5000', help="Dirt specks per 720p-sized area, comma-separated")
+    parser.add_argument('--frames', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per frame")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    resolutions = [r.strip().lower() for r in args.resolutions.split(',') if r.strip()]
+    unknown = [r for r in resolutions if r not in RESOLUTIONS]
+    if unknown:
+        raise SystemExit(f"Unknown resolutions: {', '.join(unknown)}")
+
+    report = [run_case(resolution, int(dirt), args.frames, args.repeats)
+              for resolution in resolutions for dirt in args.dirt.split(',')]
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
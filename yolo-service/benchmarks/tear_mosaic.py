@@ -0,0 +1,150 @@
+"""
+Compare whole-frame tear inspection with the belt mosaic.
+
+BeltTearDetector normally searches every frame, so a tear passing a camera
+at low speed is inspected, and reported, in dozens of frames. With a
+BeltMosaic it searches only belt revealed since the previous frame. This
+benchmark runs both on the same synthetic belt at several travel speeds and
+reports the cost per frame and per meter of belt, and how often each tear
+passing the camera was reported.
+
+The synthetic belt surface repeats every frame height, so a long run sees
+each tear several times. Detections are mapped to belt coordinates, rows
+of travel since the first frame, and matched to the tear passes they
+cover. Both detectors follow the belt band given by the true belt edges.
+
+    python -m benchmarks.tear_mosaic --resolution 720p --travel 2,6,20
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from app.models.belt_mosaic import BeltMosaic
+from app.models.belt_roi import BeltROITracker
+from app.models.belt_tear import BeltTearDetector
+from app.models.frame_context import FrameContext
+from benchmarks.analyzers import RESOLUTIONS, _overlaps
+from benchmarks.synthetic import BeltScene, Tear, frame_sequence, pixels_per_meter, tear_boxes
+
+
+def make_scene(resolution: str, tears: int) -> BeltScene:
+    width, height = RESOLUTIONS[resolution]
+    return BeltScene(width=width, height=height, tears=[
+        Tear(across=0.2 + 0.6 * (i % 3) / 2, along_px=int(height * (i + 0.5) / tears),
+             length_px=width // 12, width_px=max(3, width // 320), angle_deg=15 * i)
+        for i in range(tears)])
+
+
+def score(boxes: List[List[float]], passes: List[List[float]], period: int, covered: Tuple[float, float]) -> Dict:
+    """
+    Match detections to tear passes
+
+    Args:
+        boxes: Detections [x, y, w, h] in belt coordinates, y in rows of travel
+        passes: First pass of each tear in the same coordinates
+        period: Rows after which the belt surface repeats
+        covered: Belt rows inspected
+    """
+    found: Set[Tuple[int, int]] = set()
+    matched = 0
+    for box in boxes:
+        for index, (x, y, w, h) in enumerate(passes):
+            lap = int(round((box[1] + box[3] / 2 - y - h / 2) / period))
+            if _overlaps(box, [x, y + lap * period, w, h]):
+                found.add((index, lap))
+                matched += 1
+                break
+
+    total = sum(1 for x, y, w, h in passes for lap in range(-1, int(covered[1] // period) + 2)
+                if covered[0] <= y + lap * period and y + lap * period + h < covered[1])
+    return {
+        'tear_passes': total,
+        'recall': round(len(found) / total, 3) if total else None,
+        'reports_per_found_tear': round(matched / len(found), 2) if found else None,
+        'false_reports': len(boxes) - matched,
+    }
+
+
+def run_case(scene: BeltScene, travel_px: int, frames: int, mosaic: bool) -> Dict:
+    scale = pixels_per_meter(scene)
+    roi = BeltROITracker()
+    detector = BeltTearDetector(belt_width_mm=scene.belt_width_m * 1000, pixel_to_mm=1000 / scale,
+                                mosaic=BeltMosaic(orientation=scene.orientation) if mosaic else None)
+    detector.roi = roi
+
+    latencies, boxes = [], []
+    mosaic_origin = None
+    for index, (image, truth) in enumerate(frame_sequence(scene, frames, travel_px=travel_px)):
+        roi.confirm(truth['left'], truth['right'], scene.width)
+        start = time.perf_counter()
+        status = detector.analyze_tears(FrameContext(image))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        # Belt row r at travel T shows in frame row H - 1 - r + T
+        travel = travel_px * index
+        if mosaic:
+            if mosaic_origin is None and detector.mosaic.length_px:
+                mosaic_origin = travel
+            # Mosaic rows continue belt rows from the travel the mosaic started at, its
+            # columns start where the mosaic's strip sits on the belt
+            x0 = round((truth['left'] + truth['right']) / 2 - (detector.mosaic.width or 0) / 2)
+            boxes.extend([t['x'] + x0, t['y'] + mosaic_origin, t['width'], t['height']]
+                         for t in status.tear_locations)
+        else:
+            boxes.extend([t['x'], scene.height - t['y'] - t['height'] + travel, t['width'], t['height']]
+                         for t in status.tear_locations)
+
+    passes = [[x, scene.height - y - h, w, h] for x, y, w, h in tear_boxes(scene, 0)]
+    if mosaic:
+        covered = (mosaic_origin or 0, (mosaic_origin or 0) + detector.mosaic.reported_px)
+    else:
+        covered = (0, scene.height + travel_px * (frames - 1))
+    belt_m = travel_px * (frames - 1) / scale
+
+    latencies_ms = np.array(latencies)
+    return {
+        'latency_ms': {
+            'mean': round(float(latencies_ms.mean()), 3),
+            'p50': round(float(np.percentile(latencies_ms, 50)), 3),
+            'p99': round(float(np.percentile(latencies_ms, 99)), 3),
+        },
+        'ms_per_belt_m': round(float(latencies_ms.sum()) / belt_m, 1) if belt_m else None,
+        **score(boxes, passes, scene.height, covered),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolution', default='720p', choices=list(RESOLUTIONS))
+    parser.add_argument('--travel', default='2,6,20', help="Belt travel per frame in pixels, comma-separated")
+    parser.add_argument('--frames', type=int, default=240)
+    parser.add_argument('--tears', type=int, default=3, help="Tears cut into the belt surface")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    scene = make_scene(args.resolution, args.tears)
+    report = {
+        'resolution': args.resolution,
+        'frames': args.frames,
+        'travel': {
+            travel: {
+                'belt_m': round(int(travel) * (args.frames - 1) / pixels_per_meter(scene), 2),
+                'frames': run_case(scene, int(travel), args.frames, mosaic=False),
+                'mosaic': run_case(scene, int(travel), args.frames, mosaic=True),
+            }
+            for travel in args.travel.split(',')
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
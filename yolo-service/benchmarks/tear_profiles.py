@@ -0,0 +1,109 @@
+"""
+Compare the tear detector's preprocessing profiles.
+
+Runs BeltTearDetector with every profile in TEAR_PROFILES on the same
+synthetic belt frames (with injected tears) and reports, per resolution and
+profile, the latency of the whole tear analysis and of its preprocessing,
+recall and false tears against the generator's ground truth, and how many
+of the 'quality' profile's detections each profile also finds.
+
+Each frame gets a fresh FrameContext, so the CLAHE image 'quality' and
+'balanced' would share with other analyzers in the pipeline is part of
+their preprocessing time here.
+
+    python -m benchmarks.tear_profiles --resolutions 720p,1080p --frames 60
+"""
+import argparse
+import json
+from typing import Dict, List
+
+import numpy as np
+
+from app.metrics import StageTimer
+from app.models.belt_tear import TEAR_PROFILES, BeltTearDetector
+from app.models.frame_context import FrameContext
+from benchmarks.analyzers import RESOLUTIONS, _overlaps, accuracy
+from benchmarks.synthetic import BeltScene, Tear, frame_sequence, pixels_per_meter
+
+
+def make_scene(resolution: str, args) -> BeltScene:
+    width, height = RESOLUTIONS[resolution]
+    tears = [Tear(across=0.2 + 0.6 * (i % 3) / 2, along_px=int(height * (i + 0.5) / args.tears),
+                  length_px=width // 12, width_px=max(3, width // 320), angle_deg=15 * i)
+             for i in range(args.tears)]
+    return BeltScene(width=width, height=height, offset_px=width * 0.03, noise_sigma=args.noise,
+                     lighting_gradient=0.2, tears=tears, dirt=args.dirt * width * height // (1280 * 720))
+
+
+def _milliseconds(values: List[float]) -> Dict:
+    return {'p50': round(float(np.percentile(values, 50)), 3), 'p99': round(float(np.percentile(values, 99)), 3)}
+
+
+def run_resolution(resolution: str, profiles: List[str], args) -> Dict:
+    scene = make_scene(resolution, args)
+    frames = list(frame_sequence(scene, args.frames, drift_px=scene.width * 0.02, travel_px=6, flicker=0.02))
+    truths = [truth for _, truth in frames]
+
+    detections: Dict[str, List[List[List[int]]]] = {}
+    report = {}
+    for profile in profiles:
+        detector = BeltTearDetector(belt_width_mm=scene.belt_width_m * 1000,
+                                    pixel_to_mm=1000 / pixels_per_meter(scene), profile=profile)
+        total_ms, preprocess_ms, found = [], [], []
+        for image, _ in frames:
+            timer = StageTimer('benchmark', 'tears', breakdown=True)
+            with timer.stage('total'):
+                status = detector.analyze_tears(FrameContext(image, timer))
+            steps = timer.breakdown()['tears']
+            total_ms.append(steps['total'])
+            preprocess_ms.append(steps['tear_preprocess'])
+            found.append([[t['x'], t['y'], t['width'], t['height']] for t in status.tear_locations])
+        detections[profile] = found
+
+        # The first frame only sets the detector's reference texture
+        report[profile] = {
+            'latency_ms': _milliseconds(total_ms[1:]),
+            'preprocess_ms': _milliseconds(preprocess_ms[1:]),
+            'accuracy': accuracy([{'tears': tears} for tears in found], truths),
+        }
+
+    if 'quality' in detections:
+        reference = detections['quality']
+        count = sum(map(len, reference))
+        for profile in profiles:
+            kept = sum(any(_overlaps(box, other) for other in found)
+                       for boxes, found in zip(reference, detections[profile]) for box in boxes)
+            report[profile]['quality_detections_found'] = round(kept / count, 3) if count else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', default='720p,1080p', help=f"Subset of {', '.join(RESOLUTIONS)}")
+    parser.add_argument('--profiles', default=','.join(TEAR_PROFILES), help=f"Subset of {', '.join(TEAR_PROFILES)}")
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--tears', type=int, default=3, help="Tears cut into the belt surface")
+    parser.add_argument('--dirt', type=int, default=0, help="Dirt specks per 720p-sized area")
+    parser.add_argument('--noise', type=float, default=2.0, help="Sensor noise sigma in gray levels")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    resolutions = [r.strip().lower() for r in args.resolutions.split(',') if r.strip()]
+    profiles = [p.strip() for p in args.profiles.split(',') if p.strip()]
+    unknown = [r for r in resolutions if r not in RESOLUTIONS] + [p for p in profiles if p not in TEAR_PROFILES]
+    if unknown:
+        raise SystemExit(f"Unknown resolutions or profiles: {', '.join(unknown)}")
+    if args.frames < 2:
+        raise SystemExit("--frames must be at least 2")
+
+    report = {resolution: run_resolution(resolution, profiles, args) for resolution in resolutions}
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
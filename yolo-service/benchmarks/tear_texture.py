@@ -0,0 +1,140 @@
+"""
+Compare tear texture confirmation against the per-region reference.
+
+BeltTearDetector.analyze_texture_anomaly takes the gradient in int16 and
+float32, and reads overlapping candidates' statistics from integral images
+computed once over the box enclosing them. This benchmark runs it and the
+original per-region float64 Sobel loop on the candidates of dirty synthetic
+belts, and reports latencies and how far the results agree.
+
+The two do not match exactly: the reference filtered each region on its
+own, reflecting the image at the region's border, while the detector now
+uses the real neighbouring pixels. edge_density differs along the borders
+of thin regions, which can flip a candidate close to the 0.3 threshold.
+
+    python -m benchmarks.tear_texture --resolutions 1080p,4k --dirt 0,2500,5000
+"""
+import argparse
+import copy
+import json
+import time
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.models.belt_tear import BeltTearDetector
+from benchmarks.analyzers import RESOLUTIONS
+from benchmarks.synthetic import BeltScene, Tear, frame_sequence, pixels_per_meter
+
+
+def region_confirmation(detector: BeltTearDetector, image: np.ndarray, tear_regions: List[Dict]) -> List[Dict]:
+    """The per-region loop analyze_texture_anomaly replaced, kept as the reference"""
+    confirmed_tears = []
+    for tear in tear_regions:
+        x, y, w, h = tear['bbox']
+        region = image[y:y + h, x:x + w]
+        if region.size == 0:
+            continue
+        region_mean = np.mean(region)
+        gradient_x = cv2.Sobel(region, cv2.CV_64F, 1, 0, ksize=3)
+        gradient_y = cv2.Sobel(region, cv2.CV_64F, 0, 1, ksize=3)
+        mean_gradient = np.mean(np.sqrt(gradient_x ** 2 + gradient_y ** 2))
+        intensity_diff = abs(region_mean - detector.texture_mean)
+        edge_density = mean_gradient / 255
+        if intensity_diff > 20 or edge_density > 0.3:
+            tear['texture_anomaly'] = True
+            tear['intensity_diff'] = intensity_diff
+            tear['edge_density'] = edge_density
+            confirmed_tears.append(tear)
+    return confirmed_tears
+
+
+def candidate_frames(resolution: str, dirt: int, count: int) -> Tuple[List[Tuple[np.ndarray, List[Dict]]], BeltTearDetector]:
+    """(preprocessed image, candidates) of a dirty belt's frames; the detector already holds its reference texture"""
+    width, height = RESOLUTIONS[resolution]
+    tears = [Tear(across=0.25 + 0.25 * i, along_px=height * (i + 1) // 4, length_px=width // 10,
+                  width_px=max(3, width // 320), angle_deg=10 * i) for i in range(3)]
+    scene = BeltScene(width=width, height=height, texture_contrast=35, tears=tears,
+                      dirt=dirt * width * height // (1280 * 720))
+    detector = BeltTearDetector(pixel_to_mm=1000 / pixels_per_meter(scene))
+    frames = []
+    for image, _ in frame_sequence(scene, count + 1, travel_px=5):
+        processed = detector.preprocess_image(image)
+        candidates = detector.find_tear_candidates(detector.detect_edges(processed))
+        if detector.reference_texture is None:
+            detector.analyze_texture_anomaly(processed, candidates)
+            continue
+        frames.append((processed, candidates))
+    return frames, detector
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_case(resolution: str, dirt: int, frames: int, repeats: int) -> Dict:
+    images, detector = candidate_frames(resolution, dirt, frames)
+    reference_ms, integral_ms = [], []
+    candidates = confirmed = disagreements = 0
+    density_error = intensity_error = 0.0
+
+    for image, regions in images:
+        reference = {t['bbox']: t for t in region_confirmation(detector, image, copy.deepcopy(regions))}
+        reference = {t['bbox']: t for t in reference.values()}
+        result = {t['bbox']: t for t in detector.analyze_texture_anomaly(image, copy.deepcopy(regions))}
+        candidates += len(regions)
+        confirmed += len(result)
+        disagreements += len(set(reference) ^ set(result))
+        for bbox in set(reference) & set(result):
+            density_error = max(density_error, abs(reference[bbox]['edge_density'] - result[bbox]['edge_density']))
+            intensity_error = max(intensity_error,
+                                  abs(reference[bbox]['intensity_diff'] - result[bbox]['intensity_diff']))
+        for _ in range(repeats):
+            reference_ms.append(timed(region_confirmation, detector, image, copy.deepcopy(regions)))
+            integral_ms.append(timed(detector.analyze_texture_anomaly, image, copy.deepcopy(regions)))
+
+    reference_p50 = float(np.percentile(reference_ms, 50))
+    integral_p50 = float(np.percentile(integral_ms, 50))
+    return {
+        'resolution': resolution,
+        'dirt_per_720p_frame': dirt,
+        'candidates_per_frame': round(candidates / len(images), 1),
+        'confirmed_per_frame': round(confirmed / len(images), 1),
+        'per_region_ms': {'p50': round(reference_p50, 3), 'p99': round(float(np.percentile(reference_ms, 99)), 3)},
+        'integral_ms': {'p50': round(integral_p50, 3), 'p99': round(float(np.percentile(integral_ms, 99)), 3)},
+        'speedup': round(reference_p50 / integral_p50, 2),
+        'disagreements': disagreements,
+        'max_edge_density_error': round(density_error, 4),
+        'max_intensity_diff_error': round(intensity_error, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', default='1080p,4k', help=f"Subset of {', '.join(RESOLUTIONS)}")
+    parser.add_argument('--dirt', default='0,2500,5000', help="Dirt specks per 720p-sized area, comma-separated")
+    parser.add_argument('--frames', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per frame")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    resolutions = [r.strip().lower() for r in args.resolutions.split(',') if r.strip()]
+    unknown = [r for r in resolutions if r not in RESOLUTIONS]
+    if unknown:
+        raise SystemExit(f"Unknown resolutions: {', '.join(unknown)}")
+
+    report = [run_case(resolution, int(dirt), args.frames, args.repeats)
+              for resolution in resolutions for dirt in args.dirt.split(',')]
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.models.belt_mosaic import BeltMosaic
+from benchmarks.synthetic import BeltScene, frame_sequence
+
+
+class FixedShifts:
+    """Stands in for the strip estimator with known belt displacements"""
+
+    def __init__(self, shifts):
+        self.shifts = iter(shifts)
+
+    def displacement(self, gray, band=None):
+        return next(self.shifts)
+
+    def reset(self):
+        pass
+
+    def memory_bytes(self):
+        return 0
+
+
+def _mosaic(shifts, **kwargs):
+    mosaic = BeltMosaic(orientation='vertical', **kwargs)
+    mosaic.estimator = FixedShifts(shifts)
+    return mosaic
+
+
+def _gray(height=100, width=40):
+    return np.zeros((height, width), np.uint8)
+
+
+def test_unknown_orientation_is_rejected():
+    with pytest.raises(ValueError):
+        BeltMosaic(orientation='diagonal')
+
+
+def test_standing_belt_does_not_start_the_mosaic():
+    mosaic = _mosaic([None, 0.0, 0.2])
+    assert all(mosaic.advance(_gray()) is None for _ in range(3))
+    assert mosaic.length_px == 0
+
+
+def test_windows_repeat_the_overlap_and_mark_rows_already_reported():
+    mosaic = _mosaic([10.0] + [10.0] * 5, window_px=50, overlap_px=20)
+    first = mosaic.advance(_gray())
+    # The first moving frame starts the mosaic whole
+    assert (first.start_px, len(first.image), first.new_from) == (0, 100, 0)
+
+    windows = [mosaic.advance(_gray()) for _ in range(5)]
+    assert windows[:4] == [None] * 4
+    second = windows[4]
+    assert mosaic.length_px == 150
+    assert second.start_px == 80
+    assert len(second.image) == 70
+    # Tears ending before row 99 were reported with the first window
+    assert second.new_from == 99 - 80
+
+
+def test_travel_beyond_a_frame_restarts_the_mosaic_after_a_gap():
+    mosaic = _mosaic([10.0, 150.0], window_px=50, overlap_px=20)
+    mosaic.advance(_gray())
+    window = mosaic.advance(_gray())
+    assert mosaic.gaps == 1
+    assert mosaic.length_px == 250
+    assert window.start_px == 150
+    assert len(window.image) == 100
+    assert window.new_from == 0
+
+
+def test_buffer_stays_bounded_on_a_long_run():
+    mosaic = _mosaic([10.0] * 2000, window_px=50, overlap_px=20, max_length_px=300)
+    for _ in range(2000):
+        mosaic.advance(_gray())
+    assert mosaic.length_px == 100 + 1999 * 10
+    assert mosaic.memory_bytes() <= 2 * 300 * 40
+
+
+def _run(scene, span, frames=40, travel_px=6):
+    mosaic = BeltMosaic(orientation=scene.orientation)
+    for image, truth in frame_sequence(scene, frames, travel_px=travel_px):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        mosaic.advance(gray, (truth['left'] + 5, truth['right'] - 5) if span else None)
+    return mosaic
+
+
+@pytest.mark.parametrize('orientation', ['vertical', 'horizontal'])
+def test_mosaic_length_follows_belt_travel(orientation):
+    scene = BeltScene(width=640, height=360, slant=0.0, orientation=orientation)
+    mosaic = _run(scene, span=True)
+    # The second frame, the first with a measured shift, seeds the mosaic whole
+    seeded = mosaic.width if orientation == 'horizontal' else scene.height
+    assert mosaic.length_px == pytest.approx(seeded + 38 * 6, abs=3)
+
+
+@pytest.mark.parametrize('orientation', ['vertical', 'horizontal'])
+def test_only_the_belt_band_goes_into_the_mosaic(orientation):
+    scene = BeltScene(width=640, height=360, slant=0.0, orientation=orientation)
+    image = _run(scene, span=True).image()
+    # Background is far darker than any belt texture
+    assert np.mean(image < 80) == 0
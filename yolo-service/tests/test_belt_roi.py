@@ -0,0 +1,60 @@
+import numpy as np
+
+from app.models.belt_roi import BeltROITracker, match_edge_lines
+
+
+def _lines(*segments):
+    """Hough output layout: N x 1 x 4"""
+    return np.array([[segment] for segment in segments], dtype=np.int32)
+
+
+def test_longest_line_near_each_expected_edge_is_chosen():
+    lines = _lines(
+        (100, 0, 102, 200),  # left edge
+        (105, 0, 104, 60),  # short texture line near the left edge
+        (400, 0, 398, 200),  # right edge
+    )
+    left, right = match_edge_lines(lines, (101.0, 399.0), tolerance=10)
+    assert tuple(left) == (100, 0, 102, 200)
+    assert tuple(right) == (400, 0, 398, 200)
+
+
+def test_lines_far_from_expected_edges_or_not_vertical_are_ignored():
+    lines = _lines(
+        (100, 0, 102, 200),
+        (300, 0, 300, 200),  # vertical but far from both edges
+        (390, 100, 410, 105),  # near the right edge but horizontal
+    )
+    assert match_edge_lines(lines, (101.0, 399.0), tolerance=10) == (None, None)
+
+
+def test_pair_with_wrong_width_is_rejected():
+    # Each line is within tolerance of its edge, but together the belt would shrink by 16 px
+    lines = _lines((108, 0, 108, 200), (392, 0, 392, 200))
+    assert match_edge_lines(lines, (100.0, 400.0), tolerance=10) == (None, None)
+
+
+def test_band_adds_margin_and_is_clipped_to_the_frame():
+    roi = BeltROITracker(margin_ratio=0.1)
+    roi.confirm(20, 220, 640)
+    assert roi.edges(640) == (20, 220)
+    assert roi.band(640) == (0, 241)
+    # Edges belong to frames of the width they were found on
+    assert roi.edges(320) is None
+
+
+def test_band_is_dropped_after_too_many_misses():
+    roi = BeltROITracker(max_misses=2)
+    roi.confirm(100, 300, 640)
+    roi.miss()
+    roi.miss()
+    assert roi.edges(640) is not None
+    roi.miss()
+    assert roi.edges(640) is None
+
+
+def test_narrow_edge_pairs_are_not_accepted():
+    roi = BeltROITracker(min_belt_width_px=16)
+    roi.confirm(100, 110, 640)
+    assert roi.edges(640) is None
+
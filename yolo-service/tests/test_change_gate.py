@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from app.models.belt_monitor import BeltMonitor
+from app.models.change_gate import ChangeGate
+from benchmarks.synthetic import BeltScene, frame_sequence
+
+
+def _frames(count, travel_px, **scene):
+    return [image for image, _ in frame_sequence(BeltScene(**scene), count, travel_px=travel_px)]
+
+
+def _noisy(image, rng, sigma=2.0):
+    return np.clip(image + rng.normal(0, sigma, image.shape), 0, 255).astype(np.uint8)
+
+
+def test_first_frame_is_analyzed_fully():
+    gate = ChangeGate()
+    assert gate.check(_frames(1, 0)[0]).action == 'full'
+
+
+def test_stopped_belt_is_served_from_the_cache():
+    gate = ChangeGate()
+    rng = np.random.default_rng(0)
+    image = _frames(1, 0)[0]
+    gate.check(image)
+    actions = [gate.check(_noisy(image, rng)).action for _ in range(10)]
+    assert actions == ['cached'] * 10
+
+
+@pytest.mark.parametrize('travel_px', [6, 20])
+def test_moving_fine_texture_is_never_cached(travel_px):
+    # The texture blurs away in the thumbnail; few thumbnail pixels change
+    gate = ChangeGate()
+    actions = [gate.check(image).action for image in _frames(20, travel_px, texture_contrast=25)]
+    assert 'cached' not in actions
+
+
+def test_belt_last_measured_running_is_never_cached():
+    gate = ChangeGate()
+    image = _frames(1, 0)[0]
+    gate.check(image)
+    assert gate.check(image, speed_mps=0.4).action != 'cached'
+    assert gate.check(image, speed_mps=0.0).action == 'cached'
+
+
+def test_full_analysis_is_forced_after_max_gated_frames():
+    gate = ChangeGate(max_gated_frames=3)
+    image = _frames(1, 0)[0]
+    actions = [gate.check(image).action for _ in range(6)]
+    assert actions == ['full', 'cached', 'cached', 'cached', 'full', 'cached']
+
+
+def test_moved_belt_edges_require_full_analysis():
+    gate = ChangeGate()
+    gate.check(_frames(1, 0)[0])
+    assert gate.check(_frames(1, 0, offset_px=80)[0]).action == 'full'
+
+
+@pytest.mark.parametrize('speed_mode', ['flow', 'phase'])
+def test_gated_speed_matches_ungated_speed(speed_mode):
+    """Cached frames must not change the speed measured on the frames around them"""
+    frames = list(frame_sequence(BeltScene(texture_contrast=25), 30, travel_px=6))
+    speeds = {}
+    for gated in (False, True):
+        monitor = BeltMonitor(belt_width_mm=1200, speed_mode=speed_mode, belt_orientation='vertical')
+        measured = []
+        for index, (image, truth) in enumerate(frames):
+            cached = gated and index % 2 == 1
+            status = monitor.analyze_frame(image, truth['timestamp'], gate='cached' if cached else 'full')
+            if not cached:
+                measured.append(status.speed_mps)
+        speeds[gated] = measured[5:]
+
+    expected = frames[0][1]['speed_mps']
+    assert np.allclose(speeds[False], expected, atol=0.03)
+    assert np.allclose(speeds[True], expected, atol=0.03)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from app.models.belt_alignment import BeltAlignmentDetector
+from app.models.belt_monitor import BeltMonitor
+from app.models.edge_projection import find_edges_by_projection
+from benchmarks.synthetic import BeltScene, edges_at, render_frame
+
+
+@pytest.mark.parametrize('offset_px', [-80.0, 0.0, 55.5])
+def test_edges_are_found_at_the_rendered_belt_edges(offset_px):
+    scene = BeltScene(width=640, height=360, offset_px=offset_px)
+    image, _ = render_frame(scene)
+    found = find_edges_by_projection(image)
+    assert found is not None
+
+    rows = np.array([0, scene.height - 1])
+    left, right = edges_at(scene, rows)
+    np.testing.assert_allclose(found.left.x_at(rows), left, atol=1.5)
+    np.testing.assert_allclose(found.right.x_at(rows), right, atol=1.5)
+    assert found.center == pytest.approx(scene.width / 2 + offset_px, abs=1.0)
+    assert found.confidence > 0.5
+
+
+def test_band_search_reports_frame_coordinates():
+    scene = BeltScene(width=640, height=360, offset_px=30)
+    image, _ = render_frame(scene)
+    full = find_edges_by_projection(image)
+    x0 = 100
+    band = find_edges_by_projection(image[:, x0:560], min_belt_ratio=0.5, x_offset=x0)
+    assert band is not None
+    assert band.center == pytest.approx(full.center, abs=0.5)
+
+
+def test_frame_without_a_belt_has_no_edges():
+    image = np.full((360, 640, 3), 90, dtype=np.uint8)
+    assert find_edges_by_projection(image) is None
+
+
+def test_alignment_reports_projection_confidence_and_center():
+    scene = BeltScene(width=640, height=360, offset_px=-40)
+    image, _ = render_frame(scene)
+
+    status = BeltAlignmentDetector(alignment_backend='projection').analyze_alignment(image)
+    assert status.confidence == pytest.approx(find_edges_by_projection(image).confidence)
+    assert status.belt_center == pytest.approx(280, abs=1.0)
+
+    belt = BeltMonitor(alignment_backend='projection').analyze_frame(image, 0.0)
+    assert belt.alignment_confidence == pytest.approx(status.confidence, abs=1e-3)
+    assert belt.belt_center == pytest.approx(280, abs=1.0)
+
+
+def test_hough_alignment_has_no_projection_confidence():
+    image, _ = render_frame(BeltScene(width=640, height=360))
+    assert BeltMonitor(alignment_backend='hough').analyze_frame(image, 0.0).alignment_confidence is None
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+import pytest
+
+from app.executor import FrameExecutor
+
+_log = []
+_log_lock = threading.Lock()
+
+
+def _record(camera_id, index, delay):
+    time.sleep(delay)
+    with _log_lock:
+        _log.append((camera_id, index))
+    return camera_id, index, threading.current_thread().name
+
+
+def _process_task(index, delay):
+    time.sleep(delay)
+    return index, os.getpid()
+
+
+def test_frames_of_a_camera_run_in_submission_order():
+    _log.clear()
+    executor = FrameExecutor(mode='thread', workers=3)
+    rng = random.Random(0)
+    cameras = [f"cam-{n}" for n in range(6)]
+    futures = [executor.submit(camera, _record, camera, index, rng.uniform(0, 0.002))
+               for index in range(20) for camera in cameras]
+    results = [future.result() for future in futures]
+    executor.shutdown()
+
+    for camera in cameras:
+        assert [index for cam, index in _log if cam == camera] == list(range(20))
+        # Always the same worker thread, which holds the camera's state
+        assert len({thread for cam, _, thread in results if cam == camera}) == 1
+
+
+def test_cameras_are_spread_across_shards():
+    executor = FrameExecutor(mode='thread', workers=4)
+    shards = {executor.shard_for(f"cam-{n}") for n in range(32)}
+    executor.shutdown()
+    assert shards == {0, 1, 2, 3}
+
+
+def test_process_shards_keep_camera_order():
+    executor = FrameExecutor(mode='process', workers=2)
+    try:
+        futures = [executor.submit('cam', _process_task, index, 0.001 * (index % 3)) for index in range(10)]
+        results = [future.result(timeout=30) for future in futures]
+    finally:
+        executor.shutdown()
+    assert [index for index, _ in results] == list(range(10))
+    assert len({pid for _, pid in results}) == 1
+
+
+def test_broadcast_runs_once_per_shard():
+    executor = FrameExecutor(mode='thread', workers=3)
+
+    async def run():
+        return await executor.broadcast(threading.current_thread)
+
+    threads = asyncio.run(run())
+    executor.shutdown()
+    assert len({thread.name for thread in threads}) == 3
+
+
+def test_queue_depth_settles_after_tasks_complete():
+    executor = FrameExecutor(mode='thread', workers=2)
+    futures = [executor.submit('cam', time.sleep, 0.001) for _ in range(5)]
+    for future in futures:
+        future.result()
+    executor.shutdown()
+    stats = executor.stats()
+    assert stats['queue_depth'] == 0
+    assert sum(shard['completed'] for shard in stats['shards']) == 5
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        FrameExecutor(mode='fiber')
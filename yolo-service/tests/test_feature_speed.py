@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.models.belt_monitor import BeltMonitor
+from app.models.feature_speed import FeatureDisplacementTracker
+from app.models.frame_context import to_gray
+from benchmarks.synthetic import BeltScene, edges_at, frame_sequence
+
+
+def _sequence(orientation, travel_px, count=6):
+    scene = BeltScene(width=640, height=360, orientation=orientation)
+    left, right = edges_at(scene, scene.height // 2)
+    frames = [(to_gray(image), truth) for image, truth in frame_sequence(scene, count, travel_px=travel_px)]
+    return frames, (int(left), int(right))
+
+
+@pytest.mark.parametrize('orientation', ['vertical', 'horizontal'])
+@pytest.mark.parametrize('travel_px', [0, 3, 7])
+def test_feature_shift_follows_belt_travel(orientation, travel_px):
+    frames, band = _sequence(orientation, travel_px)
+    tracker = FeatureDisplacementTracker(orientation=orientation)
+    shifts = [tracker.displacement(gray, band) for gray, _ in frames]
+    assert shifts[0] is None
+    np.testing.assert_allclose(shifts[1:], travel_px, atol=0.2)
+
+
+def test_static_specks_on_the_belt_are_rejected_as_outliers():
+    frames, band = _sequence('vertical', 5, count=12)
+    tracker = FeatureDisplacementTracker(orientation='vertical')
+    shifts, rejected = [], 0
+    for gray, _ in frames:
+        for k in range(3):
+            # Dirt on the camera window: stays put while the belt moves
+            cv2.rectangle(gray, (300, 40 + 100 * k), (303, 43 + 100 * k), 170, -1)
+        shifts.append(tracker.displacement(gray, band))
+        rejected += tracker.tracked - tracker.inliers
+    np.testing.assert_allclose(shifts[1:], 5, atol=0.15)
+    # Rejected features leave the pool, so they are only counted once
+    assert rejected > 0
+
+
+@pytest.mark.parametrize('orientation', ['vertical', 'horizontal'])
+def test_pool_is_refilled_as_features_leave_the_frame(orientation):
+    frames, band = _sequence(orientation, 9, count=80)
+    tracker = FeatureDisplacementTracker(orientation=orientation)
+    shifts = [tracker.displacement(gray, band) for gray, _ in frames]
+    # Far more travel than the frame is long, yet every frame is measured
+    np.testing.assert_allclose(shifts[1:], 9, atol=0.2)
+    assert tracker.refills > 1
+    assert len(tracker.prev_points) >= tracker.min_features
+
+
+def test_new_features_are_only_taken_in_the_belt_band():
+    frames, band = _sequence('vertical', 0, count=1)
+    tracker = FeatureDisplacementTracker(orientation='vertical')
+    tracker.displacement(frames[0][0], band)
+    xs = tracker.prev_points[:, 0, 0]
+    assert len(xs) and xs.min() >= band[0] and xs.max() < band[1]
+
+
+@pytest.mark.parametrize('orientation', ['vertical', 'horizontal'])
+def test_monitor_feature_mode_measures_belt_speed(orientation):
+    scene = BeltScene(width=640, height=360, orientation=orientation)
+    monitor = BeltMonitor(speed_mode='features', belt_orientation=orientation)
+    for image, truth in frame_sequence(scene, 6, travel_px=7):
+        status = monitor.analyze_frame(image, truth['timestamp'])
+    assert status.speed_mps == pytest.approx(truth['speed_mps'], rel=0.05)
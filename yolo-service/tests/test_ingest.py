@@ -0,0 +1,79 @@
+import struct
+
+import cv2
+import numpy as np
+import pytest
+
+from app.ingest import (RAW_HEADER, RAW_MAGIC, InvalidFrameError, decode_frame, encode_raw_frame,
+                        is_raw_frame, parse_raw_frame, raw_capture_ts)
+
+
+def _image(shape, dtype=np.uint8):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, np.iinfo(dtype).max, shape, dtype=dtype)
+
+
+@pytest.mark.parametrize('shape', [(48, 64), (48, 64, 3)])
+def test_raw_frame_round_trip(shape):
+    image = _image(shape)
+    frame = parse_raw_frame(encode_raw_frame(image, 12.5))
+    assert frame.raw
+    assert frame.capture_ts == 12.5
+    np.testing.assert_array_equal(frame.image, image)
+
+
+def test_raw_bgra_frame_is_converted_to_bgr():
+    image = _image((48, 64, 4))
+    frame = parse_raw_frame(encode_raw_frame(image))
+    np.testing.assert_array_equal(frame.image, cv2.cvtColor(image, cv2.COLOR_BGRA2BGR))
+
+
+def test_raw_uint16_frame_is_reduced_to_8_bit():
+    image = np.full((8, 8), 256 * 200, dtype=np.uint16)
+    frame = parse_raw_frame(encode_raw_frame(image))
+    assert frame.image.dtype == np.uint8
+    assert (frame.image == 200).all()
+
+
+def test_zero_timestamp_means_unknown():
+    data = encode_raw_frame(_image((8, 8)))
+    assert parse_raw_frame(data).capture_ts is None
+    assert raw_capture_ts(data) is None
+
+
+def test_capture_time_is_read_from_the_header_alone():
+    data = encode_raw_frame(_image((8, 8)), 3.25)
+    assert is_raw_frame(data)
+    assert raw_capture_ts(data[:RAW_HEADER.size]) == 3.25
+    assert raw_capture_ts(b'\xff\xd8\xff\xe0') is None
+
+
+@pytest.mark.parametrize('data, message', [
+    (RAW_MAGIC + b'\x00' * 4, 'shorter than its header'),
+    (RAW_HEADER.pack(b'XXXX', 8, 8, 1, 1, 0.0) + bytes(64), 'magic'),
+    (RAW_HEADER.pack(RAW_MAGIC, 8, 8, 2, 1, 0.0) + bytes(128), 'channel'),
+    (RAW_HEADER.pack(RAW_MAGIC, 8, 8, 1, 9, 0.0) + bytes(64), 'dtype'),
+    (RAW_HEADER.pack(RAW_MAGIC, 8, 8, 1, 1, 0.0) + bytes(63), 'payload'),
+])
+def test_malformed_raw_frames_are_rejected(data, message):
+    with pytest.raises(InvalidFrameError, match=message):
+        parse_raw_frame(data)
+
+
+def test_header_layout_is_stable():
+    # Capture agents pack this header themselves
+    assert RAW_HEADER.size == struct.calcsize('<4sIIBB2xd') == 24
+
+
+@pytest.mark.parametrize('scale', [1, 2, 4])
+def test_raw_and_jpeg_frames_reach_the_same_analysis_resolution(scale):
+    image = _image((120, 160, 3))
+    raw = decode_frame(encode_raw_frame(image), scale)
+    jpeg = decode_frame(cv2.imencode('.jpg', image)[1].tobytes(), scale)
+    assert raw.image.shape[:2] == jpeg.image.shape[:2]
+    assert raw.scale == jpeg.scale == scale
+
+
+def test_unsupported_analysis_scale_is_rejected():
+    with pytest.raises(ValueError):
+        decode_frame(encode_raw_frame(_image((8, 8))), 3)
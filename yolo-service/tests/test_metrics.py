@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from app.metrics import STAGE_METRIC, MetricsRegistry, StageTimer, merge_snapshots, render
+
+
+def _lines(text, prefix):
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.01, 0.05, 0.5):
+        registry.observe('gray', seconds, 'cam', 'shared')
+    text = render(registry.snapshot(), buckets=(0.01, 0.1))
+
+    labels = 'camera="cam",analyzer="shared",stage="gray"'
+    assert _lines(text, f'{STAGE_METRIC}_bucket') == [
+        f'{STAGE_METRIC}_bucket{{{labels},le="0.01"}} 2',
+        f'{STAGE_METRIC}_bucket{{{labels},le="0.1"}} 3',
+        f'{STAGE_METRIC}_bucket{{{labels},le="+Inf"}} 4',
+    ]
+    assert _lines(text, f'{STAGE_METRIC}_count') == [f'{STAGE_METRIC}_count{{{labels}}} 4']
+    assert _lines(text, f'{STAGE_METRIC}_sum') == [f'{STAGE_METRIC}_sum{{{labels}}} 0.565000']
+    assert f'# TYPE {STAGE_METRIC} histogram' in text
+
+
+def test_counters_and_gauges_are_rendered_with_escaped_labels():
+    registry = MetricsRegistry()
+    registry.inc('belt_frames_dropped_total', camera='dock "A"', reason='stale')
+    registry.inc('belt_frames_dropped_total', 2, camera='dock "A"', reason='stale')
+    text = render(registry.snapshot(), gauges=[('belt_sessions', (), 3)])
+
+    assert 'belt_frames_dropped_total{camera="dock \\"A\\"",reason="stale"} 3' in text
+    assert '# TYPE belt_frames_dropped_total counter' in text
+    assert 'belt_sessions 3' in text
+    assert '# TYPE belt_sessions gauge' in text
+
+
+def test_worker_snapshots_are_merged():
+    workers = [MetricsRegistry(), MetricsRegistry()]
+    for seconds, registry in zip((0.002, 0.2), workers):
+        registry.observe('hough', seconds, 'cam', 'alignment')
+        registry.inc('belt_frames_processed_total', camera='cam')
+
+    merged = merge_snapshots(registry.snapshot() for registry in workers)
+    assert merged['counters'][('belt_frames_processed_total', (('camera', 'cam'),))] == 2
+    (values,) = merged['histograms'].values()
+    assert sum(values[:-1]) == 2
+    assert values[-1] == pytest.approx(0.202)
+
+
+def test_concurrent_stages_are_labelled_with_their_own_analyzer():
+    registry = MetricsRegistry()
+    timer = StageTimer('cam', 'shared', registry, breakdown=True)
+    barrier = threading.Barrier(2)
+
+    def run(analyzer):
+        with timer.analyzer(analyzer):
+            barrier.wait()
+            with timer.stage('analyze'):
+                pass
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ('alignment', 'tears')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with timer.stage('gray'):
+        pass
+
+    assert set(timer.breakdown()) == {'alignment', 'tears', 'shared'}
+    analyzers = {dict(labels)['analyzer'] for _, labels in registry.snapshot()['histograms']}
+    assert analyzers == {'alignment', 'tears', 'shared'}
+
+
+def test_fast_paths_are_only_collected_for_a_breakdown():
+    quiet = StageTimer('cam', 'monitor')
+    quiet.fast_path('roi_band')
+    assert quiet.fast_paths is None
+
+    timer = StageTimer('cam', 'monitor', breakdown=True)
+    timer.fast_path('roi_band')
+    assert timer.fast_paths == {'roi_band'}
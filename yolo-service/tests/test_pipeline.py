@@ -0,0 +1,105 @@
+from functools import partial
+
+import pytest
+
+from app.ingest import reduce_for_analysis
+from app.models import frame_context
+from app.models.belt_monitor import BeltMonitor
+from app.models.belt_roi import BeltROITracker
+from app.models.frame_context import FrameContext
+from app.pipeline import ANALYZERS, FrameInfo, default_analyzer_factories, resolve_stages, run_pipeline
+from app.sessions import CameraConfig, SessionRegistry
+from benchmarks.synthetic import BeltScene, frame_sequence
+
+
+def _session(**config):
+    registry = SessionRegistry(partial(BeltMonitor), default_config=CameraConfig(**config),
+                               analyzer_factories=default_analyzer_factories(1200, 1.5, 0.5))
+    return registry.session('cam')
+
+
+def _frames(count, scene=None, travel_px=6):
+    return list(frame_sequence(scene or BeltScene(width=640, height=360), count, travel_px=travel_px))
+
+
+def test_stages_are_resolved_with_their_dependencies_first():
+    assert resolve_stages(['alignment']) == ['gray', 'edges', 'alignment']
+    stages = resolve_stages(ANALYZERS)
+    assert sorted(stages) == sorted(['gray', 'edges', 'clahe', 'monitor', 'alignment', 'speed', 'tears'])
+    assert stages.index('clahe') < stages.index('tears')
+
+
+def test_unknown_analyzer_is_rejected():
+    with pytest.raises(ValueError, match='Unknown analyzer'):
+        resolve_stages(['alignment', 'colour'])
+
+
+def test_intermediates_are_computed_once_per_frame(monkeypatch):
+    calls = []
+
+    def counting_gray(image):
+        calls.append(image.shape)
+        return to_gray(image)
+
+    to_gray = frame_context.to_gray
+    monkeypatch.setattr(frame_context, 'to_gray', counting_gray)
+
+    session = _session(edge_tracking=False)
+    for image, truth in _frames(3):
+        calls.clear()
+        results, timings = run_pipeline(FrameContext(image), session, ANALYZERS, FrameInfo(truth['timestamp']))
+        assert set(results) == set(ANALYZERS)
+        assert set(timings) == set(resolve_stages(ANALYZERS))
+        assert calls == [image.shape]
+
+
+def test_pipeline_matches_analyzers_run_on_their_own():
+    frames = _frames(4)
+    session = _session()
+    for image, truth in frames:
+        results, _ = run_pipeline(FrameContext(image), session, ['alignment'], FrameInfo(truth['timestamp']))
+
+    alone = _session().analyzer('alignment')
+    for image, _ in frames:
+        expected = alone.analyze_alignment(image)
+    assert results['alignment'].belt_center == pytest.approx(expected.belt_center)
+    assert results['alignment'].direction == expected.direction
+
+
+@pytest.mark.parametrize('backend', ['hough', 'projection'])
+def test_alignment_is_found_at_reduced_analysis_scale(backend):
+    scene = BeltScene(width=1920, height=1080)
+    session = _session(analysis_scale=8, alignment_backend=backend)
+    for image, truth in _frames(3, scene):
+        ctx = FrameContext(reduce_for_analysis(image, 8))
+        results, _ = run_pipeline(ctx, session, ['monitor', 'alignment'], FrameInfo(truth['timestamp']))
+
+    alignment, status = results['alignment'], results['monitor']
+    assert alignment.direction == 'center'
+    assert alignment.severity == 'normal'
+    assert alignment.deviation_percentage < 1.0
+    assert alignment.belt_center == pytest.approx(960, abs=8)
+    assert status.alignment_direction == 'center'
+    assert status.alignment_severity == 'normal'
+
+
+def test_updates_while_held_apply_after_the_block_in_source_order():
+    roi = BeltROITracker()
+    roi.confirm(100, 300, 640)
+    alignment, monitor = roi.view('alignment'), roi.view('monitor')
+
+    with roi.held(('monitor', 'alignment')):
+        alignment.confirm(110, 310, 640)
+        monitor.confirm(120, 320, 640)
+        # Readers keep seeing the band the frame started with
+        assert monitor.edges(640) == (100, 300)
+
+    assert roi.edges(640) == (110, 310)
+
+
+def test_views_update_directly_when_not_held():
+    roi = BeltROITracker()
+    roi.view('monitor').confirm(100, 300, 640)
+    assert roi.edges(640) == (100, 300)
+    roi.view('monitor').clear()
+    assert roi.edges(640) is None
@@ -0,0 +1,98 @@
+import os
+from functools import partial
+from unittest import mock
+
+import cv2
+
+from app import tasks
+from app.ingest import encode_raw_frame
+from app.models.belt_monitor import BeltMonitor
+from app.pipeline import default_analyzer_factories
+from app.recorder import RECORD_HEADER, FrameRecorder, read_segment
+from benchmarks.replay import differences, records, replay_record
+from benchmarks.synthetic import BeltScene, frame_sequence
+
+
+def _init_sessions(recordings=None):
+    tasks.init_sessions(
+        partial(BeltMonitor), max_sessions=8, idle_ttl_seconds=0,
+        analyzer_factories=default_analyzer_factories(1200, 1.5, 0.5), metrics_enabled=False,
+        recorder_factory=partial(FrameRecorder, directory=str(recordings)) if recordings else None
+    )
+
+
+def test_segments_start_with_the_config_and_rotate_under_the_cap(tmp_path):
+    recorder = FrameRecorder('cam/1', str(tmp_path), max_bytes=4000, segment_bytes=1000)
+    recorder.start({'analysis_scale': 2})
+    for index in range(20):
+        recorder.append('frame', bytes(300), {'capture_ts': index})
+    recorder.stop()
+
+    segments = recorder.segments()
+    assert os.path.dirname(segments[0]) == str(tmp_path / 'cam_1')
+    assert sum(os.path.getsize(path) for path in segments) <= 4000
+    for path in segments:
+        first = next(read_segment(path))
+        assert first['kind'] == 'config' and first['config'] == {'analysis_scale': 2}
+    # The oldest segments were deleted, the newest frames kept
+    frames = [record['capture_ts'] for path in segments for record in read_segment(path)
+              if record['kind'] == 'frame']
+    assert frames == list(range(20 - len(frames), 20))
+
+
+def test_truncated_record_is_skipped(tmp_path):
+    recorder = FrameRecorder('cam', str(tmp_path))
+    recorder.start({})
+    recorder.append('frame', b'abc', {'capture_ts': 1.0})
+    recorder.append('frame', b'defg', {'capture_ts': 2.0})
+    recorder.stop()
+
+    (path,) = recorder.segments()
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 2)
+    kinds = [(record['kind'], record['data']) for record in read_segment(path)]
+    assert kinds == [('config', b''), ('frame', b'abc')]
+
+
+def test_failed_rotation_stops_recording_without_raising(tmp_path):
+    recorder = FrameRecorder('cam', str(tmp_path), max_bytes=4000, segment_bytes=1000)
+    recorder.start({})
+    recorder.append('frame', bytes(600), {})
+    with mock.patch('builtins.open', side_effect=OSError('disk full')):
+        recorder.append('frame', bytes(600), {})
+    assert not recorder.active
+    assert recorder.errors == 1
+    assert recorder.frames == 1
+
+
+def test_replayed_archive_reproduces_the_recorded_results(tmp_path):
+    _init_sessions(tmp_path)
+    tasks.configure('cam', {'speed_mode': 'phase', 'belt_orientation': 'vertical'})
+    tasks.set_recording('cam', True)
+
+    frames = list(frame_sequence(BeltScene(width=640, height=360), 8, travel_px=5))
+    for image, truth in frames[:4]:
+        tasks.analyze_frame('cam', cv2.imencode('.jpg', image)[1].tobytes(), truth['timestamp'])
+    for image, truth in frames[4:6]:
+        tasks.analyze_frame('cam', encode_raw_frame(image, truth['timestamp']))
+    for image, truth in frames[6:]:
+        tasks.analyze_pipeline('cam', cv2.imencode('.png', image)[1].tobytes(),
+                               ['alignment', 'speed'], truth['timestamp'])
+    tasks.set_recording('cam', False)
+
+    # A fresh session, as in python -m benchmarks.replay
+    _init_sessions()
+    replayed = 0
+    for camera_id, record in records(str(tmp_path)):
+        assert camera_id == 'cam'
+        if record['kind'] == 'config':
+            tasks.configure(camera_id, record['config'])
+            continue
+        result = replay_record(camera_id, record, None)
+        assert differences(record['result'], result, 1e-6) == []
+        replayed += 1
+    assert replayed == len(frames)
+
+
+def test_record_header_layout_is_stable():
+    assert RECORD_HEADER.size == 12
@@ -0,0 +1,53 @@
+import pytest
+
+from app.reorder import CaptureClock, StaleFrameError, capture_order
+
+
+def test_frames_in_capture_order_are_admitted():
+    clock = CaptureClock()
+    assert clock.admit(1.0, 0.25)
+    assert clock.admit(1.1, 0.25)
+    assert clock.newest == 1.1
+
+
+def test_late_frame_within_window_is_admitted_as_late():
+    clock = CaptureClock()
+    clock.admit(2.0, 0.25)
+    assert clock.admit(1.9, 0.25) is False
+    assert clock.late == 1
+    # A late frame does not move the clock back
+    assert clock.newest == 2.0
+
+
+def test_frame_older_than_window_is_stale():
+    clock = CaptureClock()
+    clock.admit(2.0, 0.25)
+    with pytest.raises(StaleFrameError):
+        clock.admit(1.5, 0.25)
+    assert clock.stale == 1
+
+
+def test_repeated_timestamp_counts_as_late():
+    clock = CaptureClock()
+    clock.admit(2.0, 0.25)
+    assert clock.admit(2.0, 0.25) is False
+
+
+def test_frames_without_timestamp_are_always_in_order():
+    clock = CaptureClock()
+    clock.admit(5.0, 0.25)
+    assert clock.admit(None, 0.25)
+    assert clock.newest == 5.0
+
+
+def test_reset_starts_a_new_timeline():
+    clock = CaptureClock()
+    clock.admit(5.0, 0.25)
+    clock.reset()
+    assert clock.admit(1.0, 0.25)
+
+
+def test_capture_order_sorts_timed_frames_and_keeps_untimed_in_place():
+    assert capture_order([3.0, 1.0, 2.0]) == [1, 2, 0]
+    assert capture_order([2.0, None, 1.0]) == [2, 1, 0]
+    assert capture_order([]) == []
@@ -0,0 +1,83 @@
+import time
+from functools import partial
+
+import pytest
+
+from app.models.belt_monitor import BeltMonitor
+from app.sessions import CameraConfig, SessionRegistry
+from benchmarks.synthetic import BeltScene, frame_sequence
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return [image for image, _ in frame_sequence(BeltScene(width=320, height=240), 2, travel_px=4)]
+
+
+def _registry(**kwargs):
+    return SessionRegistry(partial(BeltMonitor), **kwargs)
+
+
+def _process(registry, camera_id, frames):
+    for image in frames:
+        registry.session(camera_id).monitor.analyze_frame(image, time.time())
+        registry.touch(camera_id)
+
+
+def test_least_recently_used_session_is_evicted_at_the_session_limit():
+    registry = _registry(max_sessions=2)
+    registry.session('a')
+    registry.session('b')
+    registry.session('a')
+    registry.session('c')
+    assert 'b' not in registry
+    assert 'a' in registry and 'c' in registry
+    assert registry.evictions == 1
+
+
+def test_idle_sessions_are_evicted():
+    registry = _registry(idle_ttl_seconds=60)
+    registry.session('a').last_used -= 120
+    registry.session('b')
+    assert 'a' not in registry
+
+
+def test_memory_cap_evicts_other_sessions_but_never_the_current_one(frames):
+    registry = _registry(max_memory_mb=0.05)
+    _process(registry, 'a', frames)
+    _process(registry, 'b', frames)
+    assert 'b' in registry
+    assert 'a' not in registry
+    # The current camera alone may exceed the cap
+    assert registry.memory_bytes() > registry.max_memory_bytes
+
+
+def test_tracked_memory_matches_the_sessions(frames):
+    registry = _registry()
+    for camera_id in ('a', 'b', 'c'):
+        _process(registry, camera_id, frames)
+
+    def actual():
+        return sum(registry.session(c).memory_bytes() for c in ('a', 'b', 'c') if c in registry)
+
+    assert registry.memory_bytes() == actual() > 0
+    registry.reset('a')
+    assert registry.memory_bytes() == actual()
+    registry.remove('b')
+    assert registry.memory_bytes() == actual()
+    assert registry.stats()['cameras']['c']['memory_bytes'] == registry.session('c').memory_bytes()
+
+
+def test_configs_outlive_evicted_sessions():
+    registry = _registry(max_sessions=1)
+    registry.configure('a', speed_mode='phase')
+    registry.session('a')
+    registry.session('b')
+    assert 'a' not in registry
+    assert registry.session('a').config.speed_mode == 'phase'
+
+
+def test_invalid_config_is_rejected():
+    registry = _registry()
+    with pytest.raises(ValueError):
+        registry.configure('a', speed_mode='sonar')
+    assert registry.config('a') == CameraConfig()
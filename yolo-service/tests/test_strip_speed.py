@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from app.models.belt_monitor import BeltMonitor
+from app.models.frame_context import to_gray
+from app.models.strip_speed import StripDisplacementEstimator
+from benchmarks.synthetic import BeltScene, edges_at, frame_sequence
+
+
+def _sequence(orientation, travel_px, count=6):
+    scene = BeltScene(width=640, height=360, orientation=orientation)
+    left, right = edges_at(scene, scene.height // 2)
+    frames = list(frame_sequence(scene, count, travel_px=travel_px))
+    return frames, (int(left), int(right))
+
+
+@pytest.mark.parametrize('orientation', ['vertical', 'horizontal'])
+@pytest.mark.parametrize('travel_px', [0, 3, 7])
+def test_strip_shift_follows_belt_travel(orientation, travel_px):
+    frames, band = _sequence(orientation, travel_px)
+    estimator = StripDisplacementEstimator(orientation=orientation)
+    shifts = [estimator.displacement(to_gray(image), band) for image, _ in frames]
+    assert shifts[0] is None
+    np.testing.assert_allclose(shifts[1:], travel_px, atol=0.5)
+
+
+def test_frame_size_change_starts_over():
+    frames, band = _sequence('vertical', 4)
+    estimator = StripDisplacementEstimator(orientation='vertical')
+    estimator.displacement(to_gray(frames[0][0]), band)
+    assert estimator.displacement(to_gray(frames[1][0])[:, :320], None) is None
+    assert estimator.prev_strip.shape[0] == 360
+
+
+def test_unknown_orientation_is_rejected():
+    with pytest.raises(ValueError):
+        StripDisplacementEstimator(orientation='diagonal')
+
+
+@pytest.mark.parametrize('orientation', ['vertical', 'horizontal'])
+def test_monitor_phase_mode_measures_belt_speed(orientation):
+    frames, _ = _sequence(orientation, 7)
+    monitor = BeltMonitor(speed_mode='phase', belt_orientation=orientation)
+    for image, truth in frames:
+        status = monitor.analyze_frame(image, truth['timestamp'])
+    assert status.speed_mps == pytest.approx(truth['speed_mps'], rel=0.05)
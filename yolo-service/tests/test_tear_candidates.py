@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from app.models.belt_tear import BeltTearDetector
+from benchmarks.synthetic import BeltScene, Tear, frame_sequence, pixels_per_meter, tear_boxes
+from benchmarks.tear_candidates import contour_candidates, same_candidates
+
+
+def _scene(dirt):
+    tears = [Tear(across=0.25 + 0.25 * i, along_px=90 * (i + 1), length_px=90, width_px=4, angle_deg=5 * i)
+             for i in range(3)]
+    return BeltScene(width=640, height=360, texture_contrast=35, tears=tears, dirt=dirt)
+
+
+def _edge_images(scene, count=3):
+    detector = BeltTearDetector(pixel_to_mm=1000 / pixels_per_meter(scene))
+    images = [detector.detect_edges(detector.preprocess_image(image))
+              for image, _ in frame_sequence(scene, count, travel_px=5)]
+    return images, detector
+
+
+@pytest.mark.parametrize('dirt', [0, 600, 2000])
+def test_vectorized_candidates_match_the_per_contour_reference(dirt):
+    images, detector = _edge_images(_scene(dirt))
+    for edges in images:
+        reference, contours = contour_candidates(detector, edges)
+        assert contours > 0
+        assert same_candidates(reference, detector.find_tear_candidates(edges))
+
+
+def test_rendered_tears_are_among_the_candidates():
+    scene = _scene(0)
+    images, detector = _edge_images(scene, count=1)
+    centers = [candidate['center'] for candidate in detector.find_tear_candidates(images[0])]
+    for x, y, w, h in tear_boxes(scene, 0):
+        assert any(x <= cx <= x + w and y <= cy <= y + h for cx, cy in centers)
+
+
+def test_blank_edge_image_has_no_candidates():
+    detector = BeltTearDetector()
+    assert detector.find_tear_candidates(np.zeros((120, 160), np.uint8)) == []
+
+
+def test_single_point_and_line_contours_match_the_reference():
+    # Degenerate contours: zero-area specks and one-pixel-wide lines
+    edges = np.zeros((200, 200), np.uint8)
+    edges[10, 10] = 255
+    edges[50, 20:180] = 255
+    edges[60:190, 100] = 255
+    edges[120:130, 30:40] = 255
+    detector = BeltTearDetector(pixel_to_mm=0.5)
+    reference, _ = contour_candidates(detector, edges)
+    assert same_candidates(reference, detector.find_tear_candidates(edges))
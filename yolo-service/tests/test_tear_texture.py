@@ -0,0 +1,79 @@
+import copy
+
+import numpy as np
+import pytest
+
+from app.models.belt_tear import BeltTearDetector, _gradient_magnitude
+from benchmarks.tear_texture import region_confirmation
+
+
+def _image(shape=(240, 320)):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, shape, dtype=np.uint8)
+
+
+def _per_box(image, boxes):
+    """Statistics of each box computed directly, gradient with one pixel of real neighbours"""
+    height, width = image.shape
+    results = []
+    for x, y, w, h in boxes:
+        x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, width), min(y + h, height)
+        px0, py0, px1, py1 = max(x0 - 1, 0), max(y0 - 1, 0), min(x1 + 1, width), min(y1 + 1, height)
+        region = image[y0:y1, x0:x1].astype(np.float64)
+        magnitude = _gradient_magnitude(image[py0:py1, px0:px1])[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+        results.append((region.mean(), region.std(), magnitude.astype(np.float64).mean()))
+    return np.array(results).T
+
+
+@pytest.mark.parametrize('boxes', [
+    # Overlapping boxes: integral images over their enclosing box
+    [[40, 30, 120, 20], [60, 35, 100, 40], [50, 25, 90, 60], [45, 40, 110, 30]],
+    # Scattered small boxes: each box filtered on its own
+    [[0, 0, 10, 30], [300, 200, 20, 40], [150, 5, 8, 8]],
+    # Boxes touching and crossing the frame border
+    [[-5, 100, 40, 30], [300, -3, 30, 60], [0, 0, 320, 240]],
+])
+def test_texture_statistics_match_per_box_statistics(boxes):
+    image = _image()
+    means, stds, gradients = BeltTearDetector().texture_statistics(image, np.array(boxes, dtype=np.int64))
+    expected_means, expected_stds, expected_gradients = _per_box(image, boxes)
+    np.testing.assert_allclose(means, expected_means, rtol=1e-9)
+    np.testing.assert_allclose(stds, expected_stds, rtol=1e-6)
+    np.testing.assert_allclose(gradients, expected_gradients, rtol=1e-5)
+
+
+def test_integral_and_per_box_paths_agree():
+    image = _image()
+    boxes = np.array([[40, 30, 120, 20], [60, 35, 100, 40]], dtype=np.int64)
+    detector = BeltTearDetector()
+    together = detector.texture_statistics(image, boxes)
+    # A distant box makes the enclosing box too large, so every box is filtered on its own
+    apart = detector.texture_statistics(image, np.vstack([boxes, [[300, 220, 5, 5]]]))
+    for integral, per_box in zip(together, apart):
+        np.testing.assert_allclose(integral, per_box[:2], rtol=1e-6)
+
+
+def test_confirmation_agrees_with_the_per_region_reference():
+    image = np.full((240, 320), 120, np.uint8)
+    image[50:60, 40:200] = 30  # Dark tear
+    image[150:190, 100:140] = _image((40, 40))  # Rough patch
+    regions = [
+        {'bbox': (35, 45, 170, 20)},
+        {'bbox': (100, 150, 40, 40)},
+        {'bbox': (220, 100, 60, 20)},  # Plain belt
+    ]
+    detector = BeltTearDetector()
+    detector.analyze_texture_anomaly(image, [])
+
+    reference = region_confirmation(detector, image, copy.deepcopy(regions))
+    result = detector.analyze_texture_anomaly(image, copy.deepcopy(regions))
+    assert [tear['bbox'] for tear in result] == [tear['bbox'] for tear in reference] == [
+        (35, 45, 170, 20), (100, 150, 40, 40)]
+    for ours, theirs in zip(result, reference):
+        assert ours['intensity_diff'] == pytest.approx(theirs['intensity_diff'])
+
+
+def test_empty_boxes_are_never_confirmed():
+    detector = BeltTearDetector()
+    detector.analyze_texture_anomaly(_image(), [])
+    assert detector.analyze_texture_anomaly(_image(), [{'bbox': (10, 10, 0, 5)}]) == []